@@ -1,9 +1,18 @@
 import tkinter as tk 
-from tkinter import ttk, messagebox, scrolledtext, simpledialog
-from collections import defaultdict, deque
-import random
+from tkinter import ttk, messagebox, scrolledtext, simpledialog, filedialog
 from PIL import Image, ImageTk
 import os
+from engine import DeadlockEngine, UNAVAILABLE, UNSAFE
+from scenarios import FAMILIES
+from workspace import save_workspace, load_workspace
+from matrix_import import import_matrices
+from waitfor import cycle_edges
+from edge_renderer import EdgeRenderer
+from redraw import RedrawScheduler
+from spatial import SpatialHash
+from viewport import Viewport
+from worker import AlgorithmWorker, PROGRESS, FAILED
+from layout import ITERATIONS, engine_graph, force_layout
 #------------------------------------------Vaishnavi-GUI------------------------------------------#
 class Phase2DeadlockSimulator(tk.Tk):
     """
@@ -17,24 +26,38 @@ class Phase2DeadlockSimulator(tk.Tk):
         self.configure(bg="#2c3e50")
         self.minsize(1000, 700)
         
-        # State
-        self.processes = []
-        self.resources = []
-        self.resource_instances = []
-        self.available = []
-        self.allocation = defaultdict(list)
-        self.max_need = defaultdict(list)
-        self.request = defaultdict(list)
+        # State - matrices and algorithms live in the headless engine
+        self.engine = DeadlockEngine()
         self.process_descriptions = {}
+        self.available_labels = {}  # resource id -> value shown in its "Available" caption
         self.cli_history = []
         self.history_index = -1
 
+        # Background algorithm runs; generation counts engine mutations so
+        # results computed on an older state can be told apart
+        self.worker = AlgorithmWorker()
+        self.generation = 0
+        self.run_callbacks = {}  # run name -> callback(result) on the Tk thread
+        self.progress_callbacks = {}  # run name -> callback(done, total, data) on the Tk thread
+        self.layout_frame = {}  # latest streamed auto-layout positions, drawn once per frame
+        self.polling_worker = False
+
         # Drag state
         self.dragging = False
         self.drag_item = None
         self.drag_type = None
         self.drag_start_x = 0
         self.drag_start_y = 0
+        self.drag_group = ()
+
+        # Nodes live in world coordinates: a spatial hash of their boxes for
+        # hit-testing and culling, and canvas items only for the visible ones
+        self.nodes = SpatialHash()
+        self.node_types = {}  # node id -> "process" or "resource"
+        self.node_items = {}  # visible node id -> canvas item ids
+        self.viewport = Viewport()
+        self.pan_x = 0
+        self.pan_y = 0
 
         # NPC images and toggle state - CRITICAL: Keep references to prevent garbage collection
         self.npc_images = {}
@@ -53,6 +76,19 @@ class Phase2DeadlockSimulator(tk.Tk):
         self.create_toolbox()
         self.create_main_panels()
         self.create_status_bar()
+        # Edge lines are updated incrementally from the engine's change events,
+        # and all drawing is batched into at most one pass per frame
+        self.edges = EdgeRenderer(self.canvas, self.viewport)
+        self.highlight = set()
+        self.npc_request = ("sad", False)
+        self.redraw = RedrawScheduler(self)
+        self.redraw.add("view", lambda changes: self.render_view(full="zoom" in changes))
+        self.redraw.add("labels", lambda resources: self.update_available_resources())
+        self.redraw.add("edges", lambda processes: self.edges.sync(self.engine, self.highlight))
+        self.redraw.add("npc", lambda states: self._render_npc())
+        self.redraw.add("layout", lambda frames: self._render_layout())
+        self.engine.add_listener(self.edges.engine_changed)
+        self.engine.add_listener(self.engine_changed)
         self.load_npc_images()
 
         self.cli_print("Welcome to the Phase 2 Deadlock Simulator! Type 'help' in the CLI.")
@@ -160,14 +196,24 @@ class Phase2DeadlockSimulator(tk.Tk):
         config_frame.pack(fill=tk.X, padx=10, pady=5)
         tk.Button(config_frame, text="Configure All", command=self.configure_all,
                 bg="#2ecc71", fg="white").pack(fill=tk.X, pady=2)
-        tk.Button(config_frame, text="Random State", command=self.generate_random_state,
+        tk.Button(config_frame, text="Random State", command=self.random_state_dialog,
                 bg="#9b59b6", fg="white").pack(fill=tk.X, pady=2)
-        tk.Button(config_frame, text="Run Banker's", command=self.check_safe_state,
-                bg="#3498db", fg="white").pack(fill=tk.X, pady=2)
-        tk.Button(config_frame, text="Detect Deadlock", command=self.detect_deadlock,
-                bg="#e74c3c", fg="white").pack(fill=tk.X, pady=2)
-        tk.Button(config_frame, text="Recover", command=self.recover_from_deadlock,
-                bg="#f39c12", fg="white").pack(fill=tk.X, pady=2)
+        # Algorithm buttons turn into cancel buttons while their run is in the background
+        self.run_buttons = {}
+        for name, text, command, color in (("banker", "Run Banker's", self.check_safe_state, "#3498db"),
+                                           ("detect", "Detect Deadlock", self.detect_deadlock, "#e74c3c"),
+                                           ("recover", "Recover", self.recover_from_deadlock, "#f39c12"),
+                                           ("layout", "Auto Layout", self.auto_layout, "#1abc9c")):
+            button = tk.Button(config_frame, text=text, command=command, bg=color, fg="white")
+            button.pack(fill=tk.X, pady=2)
+            self.run_buttons[name] = (button, text, command, color)
+        tk.Button(config_frame, text="Save Workspace", command=self.save_workspace,
+                bg="#16a085", fg="white").pack(fill=tk.X, pady=2)
+        tk.Button(config_frame, text="Open Workspace", command=self.open_workspace,
+                bg="#16a085", fg="white").pack(fill=tk.X, pady=2)
+        button = tk.Button(config_frame, text="Import CSV", command=self.import_dialog, bg="#16a085", fg="white")
+        button.pack(fill=tk.X, pady=2)
+        self.run_buttons["import"] = (button, "Import CSV", self.import_dialog, "#16a085")
 
         # NPC Image Display Area - FIXED: Proper structure
         ttk.Separator(self.toolbox, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
@@ -244,6 +290,19 @@ class Phase2DeadlockSimulator(tk.Tk):
         else:
             print(f"Warning: Cannot update NPC display. State: {state}, Label exists: {self.npc_label is not None}") 
 
+    def set_npc_status(self, state, toggle=False):
+        """Show an NPC state on the next frame; with toggle it alternates with "sad" """
+        self.npc_request = (state, toggle)
+        self.redraw.mark("npc", state)
+
+    def _render_npc(self):
+        state, toggle = self.npc_request
+        if toggle:
+            self.start_toggling(state)
+        else:
+            self.stop_toggling()
+            self.update_npc_display(state)
+
     def create_main_panels(self):#_______________________________________________________________________________________A
         main_frame = tk.Frame(self, bg="#2c3e50")
         main_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -260,6 +319,13 @@ class Phase2DeadlockSimulator(tk.Tk):
         self.canvas.bind("<ButtonRelease-1>", self.canvas_release)
         self.canvas.bind("<Double-Button-1>", self.canvas_double_click)
         self.canvas.bind("<Button-3>", self.canvas_right_click)
+        # Zoom with the wheel (Button-4/5 on X11), pan by dragging with the middle button
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom_view(1.2 if e.delta > 0 else 1 / 1.2, e.x, e.y))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom_view(1.2, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom_view(1 / 1.2, e.x, e.y))
+        self.canvas.bind("<ButtonPress-2>", self.start_pan)
+        self.canvas.bind("<B2-Motion>", self.pan_view)
+        self.canvas.bind("<Configure>", self.canvas_resized)
         
         # CLI
         self.cli_frame = tk.LabelFrame(main_frame, text="Command Line Interface", font=("Helvetica", 10, "bold"),
@@ -300,31 +366,26 @@ class Phase2DeadlockSimulator(tk.Tk):
         self.drag_start_y = event.y_root
         self.cli_print(f"Dragging {item_type} from toolbox")
 
+    def node_at(self, x, y):
+        """(item type, node id) of the topmost node within 5 pixels of screen (x, y), or None"""
+        node = self.nodes.pick(*self.viewport.to_world(x, y), 5 / self.viewport.scale)
+        if node is None:
+            return None
+        return self.node_types[node], node
+
     def canvas_click(self, event):
-        items = self.canvas.find_overlapping(event.x-5, event.y-5, event.x+5, event.y+5)
-        if items:
-            item = items[-1]
-            tags = self.canvas.gettags(item)
-            for tag in tags:
-                if tag.startswith("process_"):
-                    self.dragging = True
-                    self.drag_item = tag
-                    self.drag_type = "process"
-                    self.drag_start_x = event.x
-                    self.drag_start_y = event.y
-                    return
-                elif tag.startswith("resource_"):
-                    self.dragging = True
-                    self.drag_item = tag
-                    self.drag_type = "resource"
-                    self.drag_start_x = event.x
-                    self.drag_start_y = event.y
-                    return
+        hit = self.node_at(event.x, event.y)
+        if hit:
+            self.dragging = True
+            self.drag_type, self.drag_item = hit
+            self.drag_group = self.node_items.get(self.drag_item, ())
+            self.drag_start_x = event.x
+            self.drag_start_y = event.y
 
     def canvas_drag(self, event):
         if self.dragging:
-            self.canvas.delete("drag_preview")
             if self.drag_item is None and self.drag_type:
+                self.canvas.delete("drag_preview")
                 if self.drag_type == "process":
                     self.canvas.create_oval(event.x-20, event.y-20, event.x+20, event.y+20,
                                            fill="#3498db", outline="#2980b9", width=2, tags="drag_preview")
@@ -332,16 +393,14 @@ class Phase2DeadlockSimulator(tk.Tk):
                     self.canvas.create_rectangle(event.x-15, event.y-15, event.x+15, event.y+15,
                                                 fill="#e67e22", outline="#d35400", width=2, tags="drag_preview")
             elif self.drag_item:
+                # Move the node's own items and only the edges incident to it
                 dx = event.x - self.drag_start_x
                 dy = event.y - self.drag_start_y
-                item_parts = self.canvas.find_withtag(self.drag_item)
-                for part in item_parts:
-                    self.canvas.move(part, dx, dy)
-                if self.drag_type == "resource":
-                    resource_id = self.drag_item.split("_")[1]
-                    text_tag = f"resource_{resource_id}_text"
-                    if self.canvas.find_withtag(text_tag):
-                        self.canvas.move(text_tag, dx, dy)
+                for item in self.drag_group:
+                    self.canvas.move(item, dx, dy)
+                scale = self.viewport.scale
+                self.nodes.move(self.drag_item, dx / scale, dy / scale)
+                self.edges.move_node(self.drag_item, dx / scale, dy / scale)
                 self.drag_start_x = event.x
                 self.drag_start_y = event.y
 
@@ -356,119 +415,103 @@ class Phase2DeadlockSimulator(tk.Tk):
             self.dragging = False
             self.drag_item = None
             self.drag_type = None
+            self.drag_group = ()
 
     def canvas_double_click(self, event):
-        items = self.canvas.find_overlapping(event.x-5, event.y-5, event.x+5, event.y+5)
-        if items:
-            item = items[-1]
-            tags = self.canvas.gettags(item)
-            for tag in tags:
-                if tag.startswith("process_"):
-                    process_id = tag.split("_")[1]
-                    self.configure_process(process_id)
-                    return
-                elif tag.startswith("resource_"):
-                    resource_id = tag.split("_")[1]
-                    self.configure_resource(resource_id)
-                    return
+        hit = self.node_at(event.x, event.y)
+        if hit:
+            item_type, node = hit
+            if item_type == "process":
+                self.configure_process(node)
+            else:
+                self.configure_resource(node)
 
     def canvas_right_click(self, event):
-        items = self.canvas.find_overlapping(event.x - 5, event.y - 5, event.x + 5, event.y + 5)
-        if items:
-            item = items[-1]
-            tags = self.canvas.gettags(item)
-            for tag in tags:
-                if tag.startswith("process_"):
-                    process_id = tag.split("_")[1]
-                    menu = tk.Menu(self, tearoff=0)
-                    menu.add_command(label=f"Request Resource", command=lambda: self.request_resource(process_id))
-                    menu.add_command(label=f"Release Resources", command=lambda: self.release_resources(process_id))
-                    menu.add_command(label=f"Delete {process_id}", command=lambda: self.delete_item(process_id, "process"))
-                    menu.post(event.x_root, event.y_root)
-                    return
-                elif tag.startswith("resource_"):
-                    resource_id = tag.split("_")[1]
-                    menu = tk.Menu(self, tearoff=0)
-                    menu.add_command(label=f"Delete {resource_id}", command=lambda: self.delete_item(resource_id, "resource"))
-                    menu.post(event.x_root, event.y_root)
-                    return
+        hit = self.node_at(event.x, event.y)
+        if not hit:
+            return
+        item_type, node = hit
+        menu = tk.Menu(self, tearoff=0)
+        if item_type == "process":
+            menu.add_command(label=f"Request Resource", command=lambda: self.request_resource(node))
+            menu.add_command(label=f"Release Resources", command=lambda: self.release_resources(node))
+        menu.add_command(label=f"Delete {node}", command=lambda: self.delete_item(node, item_type))
+        menu.post(event.x_root, event.y_root)
                 
     # === Process/Resource Management ===
     def create_process(self, x, y):#_______________________________________________________________________________________P
-        process_id = f"P{len(self.processes)}"
-        self.processes.append(process_id)
-        # Initialize with zeros for all existing resources
-        self.allocation[process_id] = [0] * len(self.resources)
-        self.max_need[process_id] = [0] * len(self.resources)
-        self.request[process_id] = [0] * len(self.resources)
+        process_id = self.engine.add_process()
         self.process_descriptions[process_id] = f"Process {process_id}"
-        
-        self.canvas.create_oval(x-20, y-20, x+20, y+20, fill="#3498db",
-                               outline="#2980b9", width=2, tags=f"process_{process_id}")
-        self.canvas.create_text(x, y, text=process_id, font=("Helvetica", 10, "bold"),
-                               fill="white", tags=f"process_{process_id}")
+        self.draw_process(process_id, *self.viewport.to_world(x, y))
         
         self.cli_print(f"Created {process_id} at ({x}, {y})")
         self.message_box.config(text=f"Created {process_id}. Double-click to configure.", fg="#2ecc71")
 
     def create_resource(self, x, y):#_______________________________________________________________________________________P
-        resource_id = f"R{len(self.resources)}"
-        self.resources.append(resource_id)
-        self.resource_instances.append(1)
-        self.available.append(1)
-        
-        # Add a new resource column to all existing processes
-        for process_id in self.processes:
-            self.allocation[process_id].append(0)
-            self.max_need[process_id].append(0)
-            self.request[process_id].append(0)
-            
-        self.canvas.create_rectangle(x-15, y-15, x+15, y+15, fill="#e67e22",
-                                   outline="#d35400", width=2, tags=f"resource_{resource_id}")
-        self.canvas.create_text(x, y, text=resource_id, font=("Helvetica", 10, "bold"),
-                               fill="white", tags=f"resource_{resource_id}")
-        self.canvas.create_text(x, y+30, text=f"Available: 1", font=("Helvetica", 8),
-                               fill="#7f8c8d", tags=f"resource_{resource_id}_text")
+        resource_id = self.engine.add_resource(1)
+        self.draw_resource(resource_id, *self.viewport.to_world(x, y))
         
         self.cli_print(f"Created {resource_id} at ({x}, {y})")
         self.message_box.config(text=f"Created {resource_id}. Double-click to configure.", fg="#2ecc71")
 
+    def draw_process(self, process_id, x, y):
+        """Place a process at world (x, y); its canvas items appear once it is in view"""
+        self.node_types[process_id] = "process"
+        self.nodes.insert(process_id, x, y, 20)
+        self.edges.place_node(process_id, x, y)
+        self.redraw.mark("view")
+
+    def draw_resource(self, resource_id, x, y):
+        """Place a resource at world (x, y); its canvas items appear once it is in view"""
+        self.available_labels[resource_id] = self.engine.available_of(resource_id)
+        self.node_types[resource_id] = "resource"
+        self.nodes.insert(resource_id, x, y, 15)
+        self.edges.place_node(resource_id, x, y)
+        self.redraw.mark("view")
+
+    def _materialize(self, node):
+        """Create a visible node's canvas items at the current zoom and level of detail"""
+        x, y = self.viewport.to_screen(*self.nodes.centre(node))
+        scale = self.viewport.scale
+        detailed = self.viewport.detailed
+        if self.node_types[node] == "process":
+            r = 20 * scale
+            items = [self.canvas.create_oval(x-r, y-r, x+r, y+r, fill="#3498db",
+                                            outline="#2980b9", width=2, tags=f"process_{node}")]
+        else:
+            r = 15 * scale
+            items = [self.canvas.create_rectangle(x-r, y-r, x+r, y+r, fill="#e67e22",
+                                                 outline="#d35400", width=2, tags=f"resource_{node}")]
+        if detailed:
+            items.append(self.canvas.create_text(x, y, text=node, font=("Helvetica", 10, "bold"),
+                                                 fill="white", tags=f"{self.node_types[node]}_{node}"))
+        if detailed and self.node_types[node] == "resource":
+            items.append(self.canvas.create_text(x, y + 30 * scale, text=f"Available: {self.available_labels[node]}",
+                                                 font=("Helvetica", 8), fill="#7f8c8d", tags=f"resource_{node}_text"))
+        self.node_items[node] = tuple(items)
+
+    def _dematerialize(self, node):
+        for item in self.node_items.pop(node, ()):
+            self.canvas.delete(item)
+
     def delete_item(self, item_id, item_type):#_______________________________________________________________________________________A
         if messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete {item_id}?"):
             if item_type == "process":
-                if item_id in self.processes:
-                    self.processes.remove(item_id)
-                if item_id in self.allocation:
-                    del self.allocation[item_id]
-                if item_id in self.max_need:
-                    del self.max_need[item_id]
-                if item_id in self.request:
-                    del self.request[item_id]
+                self.engine.remove_process(item_id)
                 if item_id in self.process_descriptions:
                     del self.process_descriptions[item_id]
             elif item_type == "resource":
-                if item_id in self.resources:
-                    idx = self.resources.index(item_id)
-                    self.resources.pop(idx)
-                    self.available.pop(idx)
-                    self.resource_instances.pop(idx)
-                    for p in self.processes:
-                        if p in self.allocation and len(self.allocation[p]) > idx:
-                            self.allocation[p].pop(idx)
-                        if p in self.max_need and len(self.max_need[p]) > idx:
-                            self.max_need[p].pop(idx)
-                        if p in self.request and len(self.request[p]) > idx:
-                            self.request[p].pop(idx)
-                    
-            self.canvas.delete(f"{item_type}_{item_id}")
-            self.canvas.delete(f"{item_type}_{item_id}_text")
+                self.engine.remove_resource(item_id)
+                self.available_labels.pop(item_id, None)
+
+            self._dematerialize(item_id)
+            self.nodes.remove(item_id)
+            del self.node_types[item_id]
             self.cli_print(f"Deleted {item_id}")
             self.message_box.config(text=f"Deleted {item_id}", fg="#e74c3c")
-            self.update_available_resources()
-            self.draw_resource_graph()
 
     def configure_process(self, process_id):
-        if process_id not in self.processes:
+        if process_id not in self.engine.processes:
             messagebox.showerror("Error", f"Process {process_id} not found.")
             return
             
@@ -486,53 +529,50 @@ class Phase2DeadlockSimulator(tk.Tk):
         desc_entry.insert(0, self.process_descriptions.get(process_id, ""))
         desc_entry.grid(row=0, column=1, sticky="ew", pady=5, padx=5)
         
-        if self.resources:
+        if self.engine.resources:
             tk.Label(frame, text="Resource", relief=tk.GROOVE).grid(row=1, column=0, sticky="ew", pady=2)
             tk.Label(frame, text="Allocation", relief=tk.GROOVE).grid(row=1, column=1, sticky="ew", pady=2)
             tk.Label(frame, text="Max Need", relief=tk.GROOVE).grid(row=1, column=2, sticky="ew", pady=2)
         
         alloc_entries = {}
         max_entries = {}
+        allocation = self.engine.allocation_of(process_id)
+        max_need = self.engine.max_need_of(process_id)
         
-        for i, resource_id in enumerate(self.resources):
+        for i, resource_id in enumerate(self.engine.resources):
             tk.Label(frame, text=resource_id).grid(row=i+2, column=0, sticky="w", pady=2)
+            instances = self.engine.instances_of(resource_id)
             
-            alloc_var = tk.StringVar(value=str(self.allocation[process_id][i]))
-            alloc_entry = tk.Spinbox(frame, from_=0, to=self.resource_instances[i],
+            alloc_var = tk.StringVar(value=str(allocation[i]))
+            alloc_entry = tk.Spinbox(frame, from_=0, to=instances,
                                      textvariable=alloc_var, width=5)
             alloc_entry.grid(row=i+2, column=1, pady=2, padx=2)
             alloc_entries[resource_id] = alloc_var
             
-            max_var = tk.StringVar(value=str(self.max_need[process_id][i]))
-            max_entry = tk.Spinbox(frame, from_=0, to=self.resource_instances[i],
+            max_var = tk.StringVar(value=str(max_need[i]))
+            max_entry = tk.Spinbox(frame, from_=0, to=instances,
                                    textvariable=max_var, width=5)
             max_entry.grid(row=i+2, column=2, pady=2, padx=2)
             max_entries[resource_id] = max_var
 
         def save_config():
-            self.process_descriptions[process_id] = desc_entry.get()
-            for i, resource_id in enumerate(self.resources):
+            new_alloc = []
+            new_max = []
+            for resource_id in self.engine.resources:
                 try:
-                    alloc = int(alloc_entries[resource_id].get())
-                    max_need = int(max_entries[resource_id].get())
+                    new_alloc.append(int(alloc_entries[resource_id].get()))
+                    new_max.append(int(max_entries[resource_id].get()))
                 except ValueError:
                     messagebox.showerror("Error", f"Invalid number for {resource_id}")
                     return
-                    
-                if alloc > max_need:
-                    messagebox.showerror("Error", f"Allocation cannot exceed max need for {resource_id}")
-                    return
-                    
-                if alloc > self.resource_instances[i]:
-                    messagebox.showerror("Error", f"Allocation cannot exceed total instances for {resource_id}")
-                    return
-                    
-                self.allocation[process_id][i] = alloc
-                self.max_need[process_id][i] = max_need
-                self.request[process_id][i] = max(0, max_need - alloc)
-                
-            self.update_available_resources()
-            self.draw_resource_graph()
+
+            try:
+                self.engine.configure_process(process_id, new_alloc, new_max)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+
+            self.process_descriptions[process_id] = desc_entry.get()
             popup.destroy()
             self.cli_print(f"Updated configuration for {process_id}")
             self.message_box.config(text=f"Updated {process_id}", fg="#2ecc71")
@@ -540,7 +580,7 @@ class Phase2DeadlockSimulator(tk.Tk):
         tk.Button(popup, text="Save", command=save_config).pack(pady=10)
 
     def configure_resource(self, resource_id):
-        if resource_id not in self.resources:
+        if resource_id not in self.engine.resources:
             messagebox.showerror("Error", f"Resource {resource_id} not found.")
             return
             
@@ -553,9 +593,8 @@ class Phase2DeadlockSimulator(tk.Tk):
         frame = tk.Frame(popup)
         frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        idx = self.resources.index(resource_id)
         tk.Label(frame, text="Number of instances:").grid(row=0, column=0, sticky="w", pady=5)
-        instances_var = tk.StringVar(value=str(self.resource_instances[idx]))
+        instances_var = tk.StringVar(value=str(self.engine.instances_of(resource_id)))
         instances_entry = tk.Spinbox(frame, from_=1, to=10, textvariable=instances_var, width=5)
         instances_entry.grid(row=0, column=1, sticky="w", pady=5, padx=5)
 
@@ -566,16 +605,12 @@ class Phase2DeadlockSimulator(tk.Tk):
                 messagebox.showerror("Error", "Please enter a valid number")
                 return
                 
-            old_instances = self.resource_instances[idx]
-            
-            if new_instances < sum(self.allocation[p][idx] for p in self.processes):
-                messagebox.showerror("Error", "New instances cannot be less than total allocated instances.")
+            try:
+                self.engine.set_instances(resource_id, new_instances)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
-                
-            self.resource_instances[idx] = new_instances
-            self.available[idx] += (new_instances - old_instances)
-            self.update_available_resources()
-            self.draw_resource_graph()
+
             popup.destroy()
             self.cli_print(f"Updated {resource_id} to {new_instances} instances")
             self.message_box.config(text=f"Updated {resource_id}", fg="#2ecc71")
@@ -583,7 +618,7 @@ class Phase2DeadlockSimulator(tk.Tk):
         tk.Button(popup, text="Save", command=save_config).pack(pady=10)
 
     def configure_all(self):
-        if not self.processes:
+        if not self.engine.processes:
             messagebox.showinfo("Info", "No processes to configure. Add processes first.")
             return
             
@@ -597,7 +632,7 @@ class Phase2DeadlockSimulator(tk.Tk):
         notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         frames = {}
-        for process_id in self.processes:
+        for process_id in self.engine.processes:
             frame = ttk.Frame(notebook)
             notebook.add(frame, text=process_id)
             
@@ -606,25 +641,28 @@ class Phase2DeadlockSimulator(tk.Tk):
             desc_entry.insert(0, self.process_descriptions.get(process_id, ""))
             desc_entry.grid(row=0, column=1, sticky="ew", pady=5, padx=5, columnspan=2)
             
-            if self.resources:
+            if self.engine.resources:
                 tk.Label(frame, text="Resource", relief=tk.GROOVE).grid(row=1, column=0, sticky="ew", pady=2)
                 tk.Label(frame, text="Allocation", relief=tk.GROOVE).grid(row=1, column=1, sticky="ew", pady=2)
                 tk.Label(frame, text="Max Need", relief=tk.GROOVE).grid(row=1, column=2, sticky="ew", pady=2)
             
             alloc_entries = {}
             max_entries = {}
+            allocation = self.engine.allocation_of(process_id)
+            max_need = self.engine.max_need_of(process_id)
             
-            for i, resource_id in enumerate(self.resources):
+            for i, resource_id in enumerate(self.engine.resources):
                 tk.Label(frame, text=resource_id).grid(row=i+2, column=0, sticky="w", pady=2)
+                instances = self.engine.instances_of(resource_id)
                 
-                alloc_var = tk.StringVar(value=str(self.allocation[process_id][i]))
-                alloc_entry = tk.Spinbox(frame, from_=0, to=self.resource_instances[i],
+                alloc_var = tk.StringVar(value=str(allocation[i]))
+                alloc_entry = tk.Spinbox(frame, from_=0, to=instances,
                                          textvariable=alloc_var, width=5)
                 alloc_entry.grid(row=i+2, column=1, pady=2, padx=2)
                 alloc_entries[resource_id] = alloc_var
                 
-                max_var = tk.StringVar(value=str(self.max_need[process_id][i]))
-                max_entry = tk.Spinbox(frame, from_=0, to=self.resource_instances[i],
+                max_var = tk.StringVar(value=str(max_need[i]))
+                max_entry = tk.Spinbox(frame, from_=0, to=instances,
                                        textvariable=max_var, width=5)
                 max_entry.grid(row=i+2, column=2, pady=2, padx=2)
                 max_entries[resource_id] = max_var
@@ -635,33 +673,25 @@ class Phase2DeadlockSimulator(tk.Tk):
             frames[process_id] = frame
 
         def save_all_config():#_______________________________________________________________________________________A
-            for process_id in self.processes:
+            for process_id in self.engine.processes:
                 frame = frames[process_id]
                 self.process_descriptions[process_id] = frame.desc_entry.get()
-                for i, resource_id in enumerate(self.resources):
+                new_alloc = []
+                new_max = []
+                for resource_id in self.engine.resources:
                     try:
-                        alloc = int(frame.alloc_entries[resource_id].get())
-                        max_need = int(frame.max_entries[resource_id].get())
+                        new_alloc.append(int(frame.alloc_entries[resource_id].get()))
+                        new_max.append(int(frame.max_entries[resource_id].get()))
                     except ValueError:
                         messagebox.showerror("Error", f"Invalid number for {process_id} on {resource_id}")
                         return
-                        
-                    if alloc > max_need:
-                        messagebox.showerror("Error",
-                                            f"Allocation cannot exceed max need for {process_id} on {resource_id}")
-                        return
-                        
-                    if alloc > self.resource_instances[i]:
-                        messagebox.showerror("Error",
-                                            f"Allocation cannot exceed total instances for {process_id} on {resource_id}")
-                        return
-                        
-                    self.allocation[process_id][i] = alloc
-                    self.max_need[process_id][i] = max_need
-                    self.request[process_id][i] = max(0, max_need - alloc)
-                    
-            self.update_available_resources()
-            self.draw_resource_graph()
+
+                try:
+                    self.engine.configure_process(process_id, new_alloc, new_max)
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+
             popup.destroy()
             self.cli_print("Updated configuration for all processes")
             self.message_box.config(text="Updated all processes", fg="#2ecc71")
@@ -669,65 +699,34 @@ class Phase2DeadlockSimulator(tk.Tk):
         tk.Button(popup, text="Save All", command=save_all_config).pack(pady=10)
 
     def update_available_resources(self):
-        if not self.resources:
-            return
-            
-        for i in range(len(self.resources)):
-            total_allocated = sum(self.allocation[process_id][i] for process_id in self.processes)
-            self.available[i] = self.resource_instances[i] - total_allocated
-            resource_id = self.resources[i]
-            
-            self.canvas.delete(f"resource_{resource_id}_text")
-            coords = self.canvas.coords(f"resource_{resource_id}")
-            if coords:
-                x = (coords[0] + coords[2]) / 2
-                y = (coords[1] + coords[3]) / 2
-                self.canvas.create_text(
-                    x, y + 30,
-                    text=f"Available: {self.available[i]}", font=("Helvetica", 8),
-                    fill="#7f8c8d", tags=f"resource_{resource_id}_text"
-                )
+        """Refresh the "Available" captions of resources whose count changed"""
+        for resource_id, available in self.engine.pop_available_changes().items():
+            if self.available_labels.get(resource_id) == available:
+                continue
+            self.available_labels[resource_id] = available
+            # Only visible resources drawn in detail have a caption
+            items = self.node_items.get(resource_id, ())
+            if len(items) == 3:
+                self.canvas.itemconfigure(items[2], text=f"Available: {available}")
 
     def draw_resource_graph(self, highlight_path=None):
-        self.canvas.delete("graph_arrow")
-        if highlight_path is None:
-            highlight_path = []
-            
-        # Allocation arrows (Resource -> Process)
-        for p_id in self.processes:
-            p_coords = self.canvas.coords(f"process_{p_id}")
-            if not p_coords: continue
-            p_x, p_y = (p_coords[0] + p_coords[2]) / 2, (p_coords[1] + p_coords[3]) / 2
-            for r_idx, r_id in enumerate(self.resources):
-                if self.allocation[p_id][r_idx] > 0:
-                    r_coords = self.canvas.coords(f"resource_{r_id}")
-                    if not r_coords: continue
-                    r_x, r_y = (r_coords[0] + r_coords[2]) / 2, (r_coords[1] + r_coords[3]) / 2
-                    fill_color = "#2ecc71"
-                    if (r_id, p_id) in highlight_path:
-                        fill_color = "#e74c3c"
-                    self.canvas.create_line(r_x, r_y, p_x, p_y, arrow=tk.LAST,
-                                            fill=fill_color, width=2, tags="graph_arrow")
-                                            
-        # Request arrows (Process -> Resource)
-        for p_id in self.processes:
-            p_coords = self.canvas.coords(f"process_{p_id}")
-            if not p_coords: continue
-            p_x, p_y = (p_coords[0] + p_coords[2]) / 2, (p_coords[1] + p_coords[3]) / 2
-            for r_idx, r_id in enumerate(self.resources):
-                if self.request[p_id][r_idx] > 0:
-                    r_coords = self.canvas.coords(f"resource_{r_id}")
-                    if not r_coords: continue
-                    r_x, r_y = (r_coords[0] + r_coords[2]) / 2, (r_coords[1] + r_coords[3]) / 2
-                    fill_color = "#f39c12"
-                    if (p_id, r_id) in highlight_path:
-                        fill_color = "#e74c3c"
-                    self.canvas.create_line(p_x, p_y, r_x, r_y, arrow=tk.LAST,
-                                            fill=fill_color, width=2, tags="graph_arrow")
+        """Schedule an edge update; highlight_path edges are drawn red until the next change"""
+        self.highlight = set(highlight_path or ())
+        self.redraw.mark("edges")
+
+    def engine_changed(self, event, process_id=None, resource_id=None):
+        """
+        Engine listener: a change clears any highlight, marks labels and edges
+        dirty and cancels runs still working on the previous state
+        """
+        self.invalidate_runs("cancelled: the state changed while it ran")
+        self.highlight = set()
+        self.redraw.mark("labels", resource_id)
+        self.redraw.mark("edges", process_id)
 
     def request_resource(self, process_id):#_______________________________________________________________________________________P
         """Process requests a resource"""
-        if not self.resources:
+        if not self.engine.resources:
             messagebox.showinfo("Info", "No resources available to request.")
             return
             
@@ -743,7 +742,7 @@ class Phase2DeadlockSimulator(tk.Tk):
         tk.Label(frame, text="Select Resource:").pack(pady=5)
         resource_var = tk.StringVar()
         resource_menu = ttk.Combobox(frame, textvariable=resource_var, 
-                                    values=self.resources, state="readonly")
+                                    values=self.engine.resources, state="readonly")
         resource_menu.pack(pady=5)
         
         tk.Label(frame, text="Number of instances:").pack(pady=5)
@@ -763,169 +762,117 @@ class Phase2DeadlockSimulator(tk.Tk):
                 messagebox.showerror("Error", "Please enter a valid number")
                 return
                 
-            r_idx = self.resources.index(resource_id)
-            current_request = self.request[process_id][r_idx]
-            max_need = self.max_need[process_id][r_idx]
-            current_alloc = self.allocation[process_id][r_idx]
-            
-            if current_alloc + instances > max_need:
-                messagebox.showerror("Error", f"Cannot exceed max need of {max_need} for {resource_id}")
+            available = self.engine.available_of(resource_id)
+            try:
+                outcome = self.engine.admit_request(process_id, resource_id, instances)
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
                 return
                 
-            if instances > self.available[r_idx]:
-                self.cli_print(f"Request denied: {process_id} requests {instances} of {resource_id} but only {self.available[r_idx]} available")
+            if outcome in (UNAVAILABLE, UNSAFE):
+                if outcome == UNAVAILABLE:
+                    self.cli_print(f"Request denied: {process_id} requests {instances} of {resource_id} but only {available} available")
+                else:
+                    self.cli_print(f"Request denied: granting {instances} of {resource_id} to {process_id} would leave the system unsafe")
                 self.message_box.config(text=f"Request denied for {process_id}", fg="#e74c3c")
-                self.start_toggling("conflict")
+                self.set_npc_status("conflict", toggle=True)
                 popup.destroy()
                 return
                 
-            # Simulate granting the request
-            self.allocation[process_id][r_idx] += instances
-            self.request[process_id][r_idx] = max(0, max_need - self.allocation[process_id][r_idx])
-            self.available[r_idx] -= instances
-            
-            self.update_available_resources()
-            self.draw_resource_graph()
             self.cli_print(f"Request granted: {process_id} allocated {instances} of {resource_id}")
             self.message_box.config(text=f"Request granted for {process_id}", fg="#2ecc71")
-            self.stop_toggling()
-            self.update_npc_display("normal")
+            self.set_npc_status("normal")
             popup.destroy()
 
         tk.Button(popup, text="Request", command=make_request).pack(pady=10)
 
     def release_resources(self, process_id):#_______________________________________________________________________________________A
         """Process releases all its resources"""
-        if not self.resources:
+        if not self.engine.resources:
             messagebox.showinfo("Info", "No resources to release.")
             return
             
-        resources_to_release = []
-        for r_idx, r_id in enumerate(self.resources):
-            if self.allocation[process_id][r_idx] > 0:
-                resources_to_release.append((r_id, self.allocation[process_id][r_idx]))
-                
-        if not resources_to_release:
+        released = self.engine.release_resources(process_id)
+        if not released:
             messagebox.showinfo("Info", f"{process_id} has no allocated resources to release.")
             return
             
-        for r_id, count in resources_to_release:
-            r_idx = self.resources.index(r_id)
-            self.available[r_idx] += count
-            self.allocation[process_id][r_idx] = 0
-            self.request[process_id][r_idx] = self.max_need[process_id][r_idx]
-            
-        self.update_available_resources()
-        self.draw_resource_graph()
         self.cli_print(f"{process_id} released all resources")
         self.message_box.config(text=f"{process_id} released resources", fg="#2ecc71")
-        self.stop_toggling()
-        self.update_npc_display("normal")
+        self.set_npc_status("normal")
 
 #------------------------------------------Priyancy-ALGO------------------------------------------#
 
     # === Algorithm Implementations ===
     def check_safe_state(self):
-        """Banker's Algorithm for deadlock avoidance"""
-        if not self.processes or not self.resources:
+        """Banker's Algorithm for deadlock avoidance, run in the background"""
+        if not self.engine.processes or not self.engine.resources:
             messagebox.showinfo("Info", "Add processes and resources first.")
             return
-            
-        work = self.available.copy()
-        finish = {p: False for p in self.processes}
-        need = {p: [self.max_need[p][i] - self.allocation[p][i] for i in range(len(self.resources))]
-                for p in self.processes}
-        safe_sequence = []
-        
-        while len(safe_sequence) < len(self.processes):
-            found = False
-            for p in self.processes:
-                if not finish[p]:
-                    # Check if need[p] <= work
-                    can_allocate = True
-                    for i in range(len(self.resources)):
-                        if need[p][i] > work[i]:
-                            can_allocate = False
-                            break
-                            
-                    if can_allocate:
-                        # Simulate allocation
-                        for i in range(len(self.resources)):
-                            work[i] += self.allocation[p][i]
-                        finish[p] = True
-                        safe_sequence.append(p)
-                        found = True
-                        break
-                        
-            if not found:
-                break
-                
-        if len(safe_sequence) == len(self.processes):
+
+        self.run_in_background("banker", lambda engine, run: engine.check_safe_state(progress=run.progress),
+                               self.show_safety_result)
+
+    def show_safety_result(self, result):
+        is_safe, safe_sequence = result
+        if is_safe:
             result = f"System is in a safe state.\nSafe sequence: {' -> '.join(safe_sequence)}"
             self.last_banker_result = True
-            self.stop_toggling()
-            self.update_npc_display("normal")
+            self.set_npc_status("normal")
         else:
             result = "System is in an unsafe state (potential deadlock)."
             self.last_banker_result = False
-            self.start_toggling("conflict")
+            self.set_npc_status("conflict", toggle=True)
             
         self.cli_print("=== Banker's Algorithm Result ===")
         self.cli_print(result)
         self.message_box.config(text="Banker's algorithm executed", fg="#2ecc71" if self.last_banker_result else "#e74c3c")
-        
-        return len(safe_sequence) == len(self.processes)
 
-    def detect_deadlock(self):
-        """Deadlock detection algorithm"""
-        if not self.processes or not self.resources:
+    @staticmethod
+    def run_detection(engine, run):
+        """Deadlocked processes plus, for single-instance resources, the wait-for cycles to show"""
+        single_instance = engine.is_single_instance()
+        method = "wait_for" if single_instance else "worklist"
+        deadlocked_processes = engine.detect_deadlock(method, progress=run.progress)
+        cycles = engine.find_deadlock_cycles() if single_instance and deadlocked_processes else []
+        return deadlocked_processes, cycles
+
+    def detect_deadlock(self, name="detect", then=None):
+        """Deadlock detection in the background; then(deadlocked_processes) runs after the result is shown"""
+        if not self.engine.processes or not self.engine.resources:
             messagebox.showinfo("Info", "Add processes and resources first.")
             return
-            
-        work = self.available.copy()
-        finish = {p: sum(self.allocation[p]) == 0 for p in self.processes}
-        deadlocked_processes = []
-        
-        while True:
-            found = False
-            for p in self.processes:
-                if not finish[p]:
-                    can_finish = True
-                    for i in range(len(self.resources)):
-                        if self.request[p][i] > work[i]:
-                            can_finish = False
-                            break
-                            
-                    if can_finish:
-                        for i in range(len(self.resources)):
-                            work[i] += self.allocation[p][i]
-                        finish[p] = True
-                        found = True
-                        
-            if not found:
-                break
-                
-        deadlocked_processes = [p for p in self.processes if not finish[p]]
-        
+
+        def done(result):
+            self.show_detection_result(*result)
+            if then:
+                then(result[0])
+
+        self.run_in_background(name, self.run_detection, done)
+
+    def show_detection_result(self, deadlocked_processes, cycles):
         if deadlocked_processes:
             result = f"Deadlock detected! Deadlocked processes: {', '.join(deadlocked_processes)}"
+            for cycle in cycles:
+                steps = [f"{p_id} -> {r_id}" for p_id, r_id in cycle]
+                result += f"\nCycle: {' -> '.join(steps)} -> {cycle[0][0]}"
             self.last_detection_result = True
-            self.start_toggling("deadlock")
+            self.set_npc_status("deadlock", toggle=True)
         else:
             result = "No deadlock detected."
             self.last_detection_result = False
-            self.stop_toggling()
-            self.update_npc_display("normal")
+            self.set_npc_status("normal")
             
         self.cli_print("=== Deadlock Detection Result ===")
         self.cli_print(result)
         self.message_box.config(text="Deadlock detection executed", fg="#e74c3c" if deadlocked_processes else "#2ecc71")
-        
-        return deadlocked_processes
+        self.draw_resource_graph(highlight_path={edge for cycle in cycles for edge in cycle_edges(cycle)})
 
     def recover_from_deadlock(self):
         """Deadlock recovery by terminating processes"""
-        deadlocked_processes = self.detect_deadlock()
+        self.detect_deadlock("recover", then=self.recovery_dialog)
+
+    def recovery_dialog(self, deadlocked_processes):
         if not deadlocked_processes:
             messagebox.showinfo("Info", "No deadlock to recover from.")
             return
@@ -952,41 +899,359 @@ class Phase2DeadlockSimulator(tk.Tk):
                 return
                 
             # Release all resources held by the process
-            for r_idx, r_id in enumerate(self.resources):
-                self.available[r_idx] += self.allocation[process_id][r_idx]
-                self.allocation[process_id][r_idx] = 0
-                self.max_need[process_id][r_idx] = 0
-                self.request[process_id][r_idx] = 0
+            self.engine.terminate_process(process_id)
                 
-            self.update_available_resources()
-            self.draw_resource_graph()
             self.cli_print(f"Terminated {process_id} to recover from deadlock")
             self.message_box.config(text=f"Terminated {process_id} for recovery", fg="#f39c12")
-            self.stop_toggling()
-            self.update_npc_display("normal")
+            self.set_npc_status("normal")
             popup.destroy()
             
         tk.Button(popup, text="Terminate Process", command=terminate_process).pack(pady=10)
 
-    def generate_random_state(self):
-        """Generate a random system state for testing"""
-        if not self.processes or not self.resources:
+    # === Background runs ===
+    def run_in_background(self, name, function, on_done, on_progress=None):
+        """
+        Run function(engine snapshot, run) on a worker thread and pass its
+        result to on_done on the Tk thread, and its progress reports to
+        on_progress(done, total, data) if given. The snapshot is taken on the
+        worker thread too; a Banker's verdict it computed is handed back to
+        the engine if the state has not changed since.
+        """
+        engine = self.engine
+
+        def work(run):
+            snapshot = engine.snapshot()
+            run.check()
+            return function(snapshot, run), snapshot
+
+        def done(payload):
+            result, snapshot = payload
+            engine.adopt_safety(snapshot)
+            on_done(result)
+
+        self.submit_run(name, work, done, on_progress, self.generation)
+
+    def submit_run(self, name, function, on_done, on_progress=None, generation=None):
+        """
+        Run function(run) on a worker thread; on_done gets its result on the
+        Tk thread. generation=None marks a run that does not depend on the
+        engine state, so mutations do not cancel it. The run's button becomes
+        a cancel button meanwhile; starting the same run again replaces it.
+        """
+        self.run_callbacks[name] = on_done
+        self.progress_callbacks[name] = on_progress
+        self.worker.submit(name, function, generation)
+        self.set_run_button(name, running=True)
+        self.message_box.config(text=f"Running {self.run_buttons[name][1]}...", fg="#3498db")
+        if not self.polling_worker:
+            self.polling_worker = True
+            self.after(50, self.poll_worker)
+
+    def cancel_run(self, name, reason="cancelled"):
+        if self.worker.cancel(name):
+            self.set_run_button(name, running=False)
+            self.cli_print(f"{self.run_buttons[name][1]} {reason}")
+            self.message_box.config(text=f"{self.run_buttons[name][1]} {reason}", fg="#95a5a6")
+
+    def invalidate_runs(self, reason):
+        """Start a new state generation; runs on the old one are cancelled and their results dropped"""
+        self.generation += 1
+        for name, run in list(self.worker.runs.items()):
+            if run.generation is not None:
+                self.cancel_run(name, reason)
+
+    def set_run_button(self, name, running):
+        button, text, command, color = self.run_buttons[name]
+        if running:
+            button.config(text="Running... click to cancel", bg="#7f8c8d", command=lambda: self.cancel_run(name))
+        else:
+            button.config(text=text, bg=color, command=command)
+
+    def poll_worker(self):
+        """Hand progress and results from the worker to the GUI; keeps polling while runs are active"""
+        for kind, run, payload in self.worker.poll():
+            label = self.run_buttons[run.name][1]
+            if kind == PROGRESS:
+                done, total, data = payload
+                if self.progress_callbacks.get(run.name):
+                    self.progress_callbacks[run.name](done, total, data)
+                else:
+                    self.message_box.config(text=f"{label}: {done}/{total} processes", fg="#3498db")
+                continue
+            self.set_run_button(run.name, running=False)
+            if kind == FAILED:
+                messagebox.showerror("Error", f"{label} failed: {payload}")
+            elif run.generation in (None, self.generation):
+                self.run_callbacks.pop(run.name)(payload)
+        if self.worker.busy():
+            self.after(50, self.poll_worker)
+        else:
+            self.polling_worker = False
+
+    def random_state_dialog(self):
+        """Pick a scenario family and seed for generate_random_state"""
+        if not self.engine.processes or not self.engine.resources:
             messagebox.showinfo("Info", "Add processes and resources first.")
             return
-            
-        for p in self.processes:
-            for r_idx in range(len(self.resources)):
-                max_instances = self.resource_instances[r_idx]
-                alloc = random.randint(0, max_instances)
-                max_need = random.randint(alloc, max_instances)
-                self.allocation[p][r_idx] = alloc
-                self.max_need[p][r_idx] = max_need
-                self.request[p][r_idx] = max_need - alloc
-                
-        self.update_available_resources()
+
+        popup = tk.Toplevel(self)
+        popup.title("Random State")
+        popup.geometry("300x200")
+        popup.transient(self)
+        popup.grab_set()
+
+        frame = tk.Frame(popup)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        tk.Label(frame, text="Scenario family:").pack(pady=5)
+        family_var = tk.StringVar(value=FAMILIES[0])
+        ttk.Combobox(frame, textvariable=family_var, values=FAMILIES, state="readonly").pack(pady=5)
+
+        tk.Label(frame, text="Seed (number or name, blank for random):").pack(pady=5)
+        seed_var = tk.StringVar()
+        tk.Entry(frame, textvariable=seed_var).pack(pady=5)
+
+        def generate():
+            seed = seed_var.get().strip() or None
+            if seed is not None and seed.isdigit():
+                seed = int(seed)
+            if self.generate_random_state(family_var.get(), seed):
+                popup.destroy()
+
+        tk.Button(popup, text="Generate", command=generate).pack(pady=10)
+
+    def generate_random_state(self, family="uniform", seed=None):
+        """Generate a random system state from a scenario family; returns True on success"""
+        if not self.engine.processes or not self.engine.resources:
+            messagebox.showinfo("Info", "Add processes and resources first.")
+            return False
+
+        try:
+            self.engine.randomize(family, seed)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return False
+
+        seed_text = f" (seed {seed})" if seed is not None else ""
+        self.cli_print(f"Generated random {family} state{seed_text}")
+        self.message_box.config(text=f"Generated random {family} state", fg="#9b59b6")
+        return True
+
+
+    # === Zoom, pan and culling ===
+    def render_view(self, full=False):
+        """
+        Materialize the nodes in view and drop the ones that left it, then
+        tell the edge renderer which nodes are visible. A full pass (after a
+        zoom) recreates everything at the new scale and level of detail.
+        """
+        if full:
+            self.canvas.delete("all")
+            self.node_items = {}
+        visible = self.nodes.query(*self.viewport.visible_box())
+        for node in self.node_items.keys() - visible:
+            self._dematerialize(node)
+        for node in visible - self.node_items.keys():
+            self._materialize(node)
+        self.edges.set_visible(visible, redraw=full)
+
+    def zoom_view(self, factor, x=None, y=None):
+        """Zoom by factor about screen (x, y), the canvas centre by default"""
+        if x is None:
+            x, y = self.viewport.width / 2, self.viewport.height / 2
+        if self.viewport.zoom(factor, x, y):
+            self.redraw.mark("view", "zoom")
+
+    def fit_view(self):
+        """Zoom and pan so every node is in view"""
+        if not self.nodes.boxes:
+            return
+        boxes = list(self.nodes.boxes.values())
+        self.viewport.fit((min(b[0] for b in boxes), min(b[1] for b in boxes),
+                           max(b[2] for b in boxes), max(b[3] for b in boxes)))
+        self.redraw.mark("view", "zoom")
+
+    def start_pan(self, event):
+        self.pan_x, self.pan_y = event.x, event.y
+
+    def pan_view(self, event):
+        # Items already on the canvas move in one call; culling catches up once per frame
+        dx, dy = event.x - self.pan_x, event.y - self.pan_y
+        self.pan_x, self.pan_y = event.x, event.y
+        self.viewport.pan(dx, dy)
+        self.canvas.move("all", dx, dy)
+        self.redraw.mark("view")
+
+    def canvas_resized(self, event):
+        self.viewport.width, self.viewport.height = event.width, event.height
+        self.redraw.mark("view")
+
+    # === Auto layout ===
+    def auto_layout(self, iterations=ITERATIONS):
+        """Force-directed layout of every node in the background, streaming frames to the canvas"""
+        if not self.node_types:
+            messagebox.showinfo("Info", "Add processes and resources first.")
+            return
+        positions = self.node_positions()
+
+        def layout(engine, run):
+            nodes, edges = engine_graph(engine)
+            placed = {}
+            for iteration, xy in force_layout(edges, [positions[node] for node in nodes], iterations):
+                placed = dict(zip(nodes, map(tuple, xy.tolist())))
+                run.progress(iteration, iterations, placed)
+            return placed
+
+        self.run_in_background("layout", layout, self.finish_layout, self.show_layout_frame)
+
+    def show_layout_frame(self, done, total, positions):
+        # Frames can arrive faster than the canvas redraws; only the latest is drawn
+        self.layout_frame = positions
+        self.redraw.mark("layout")
+        self.message_box.config(text=f"Auto Layout: {done}/{total} iterations", fg="#1abc9c")
+
+    def _render_layout(self):
+        # A frame left over from a cancelled run must not move the nodes of a newer state
+        if self.worker.busy("layout"):
+            self.apply_positions(self.layout_frame)
+
+    def finish_layout(self, positions):
+        self.layout_frame = {}
+        self.apply_positions(positions)
+        self.cli_print(f"Laid out {len(positions)} nodes")
+        self.message_box.config(text="Auto layout finished", fg="#1abc9c")
+
+    def apply_positions(self, positions):
+        """Move nodes to world positions {node: (x, y)} and fit them in view"""
+        for node, (x, y) in positions.items():
+            if node in self.nodes:
+                cx, cy = self.nodes.centre(node)
+                self.nodes.move(node, x - cx, y - cy)
+        self.edges.set_centres(positions)
+        if positions:
+            self.fit_view()
+
+    # === Workspace ===
+    def node_positions(self):
+        """World centre of every process and resource"""
+        return {node: self.nodes.centre(node) for node in self.node_types}
+
+    def show_engine(self, engine, positions=None, descriptions=None):
+        """Replace the engine and redraw every node; nodes without a position go on a grid"""
+        self.invalidate_runs("cancelled: a new state was loaded")
+        for listener in (self.edges.engine_changed, self.engine_changed):
+            self.engine.remove_listener(listener)
+            engine.add_listener(listener)
+        self.engine = engine
+        descriptions = descriptions or {}
+        positions = positions or {}
+        self.process_descriptions = {p: descriptions.get(p, f"Process {p}") for p in engine.processes}
+        self.available_labels = {}
+        self.canvas.delete("all")
+        self.edges.clear()
+        self.nodes.clear()
+        self.node_types = {}
+        self.node_items = {}
+        for k, process_id in enumerate(engine.processes):
+            x, y = positions.get(process_id, (60 + 80 * (k % 10), 60 + 80 * (k // 10)))
+            self.draw_process(process_id, x, y)
+        for k, resource_id in enumerate(engine.resources):
+            x, y = positions.get(resource_id, (60 + 80 * (k % 10), 400 + 80 * (k // 10)))
+            self.draw_resource(resource_id, x, y)
+        engine.pop_available_changes()
         self.draw_resource_graph()
-        self.cli_print("Generated random system state")
-        self.message_box.config(text="Generated random state", fg="#9b59b6")
+
+    def save_workspace(self, path=None):
+        if path is None:
+            # A workspace is a directory, picked the same way as when opening one
+            path = filedialog.askdirectory(title="Save Workspace", mustexist=False)
+            if not path:
+                return
+        try:
+            save_workspace(path, self.engine, self.node_positions(), self.process_descriptions)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save workspace: {e}")
+            return
+        self.cli_print(f"Saved workspace to {path}")
+        self.message_box.config(text="Workspace saved", fg="#16a085")
+
+    def open_workspace(self, path=None):
+        if path is None:
+            path = filedialog.askdirectory(title="Open Workspace")
+            if not path:
+                return
+        try:
+            engine, header = load_workspace(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not open workspace: {e}")
+            return
+
+        self.show_engine(engine, header["positions"], header["descriptions"])
+        self.cli_print(f"Opened workspace {path}: {len(engine.processes)} processes, {len(engine.resources)} resources")
+        self.message_box.config(text="Workspace opened", fg="#16a085")
+
+    def import_dialog(self):
+        """Pick the Allocation, Max and Available CSV files for import_csv"""
+        popup = tk.Toplevel(self)
+        popup.title("Import CSV")
+        popup.geometry("420x260")
+        popup.transient(self)
+        popup.grab_set()
+
+        frame = tk.Frame(popup)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        path_vars = []
+        for row, name in enumerate(("Allocation", "Max", "Available")):
+            tk.Label(frame, text=f"{name}:").grid(row=row, column=0, sticky="w", pady=5)
+            var = tk.StringVar()
+            tk.Entry(frame, textvariable=var, width=32).grid(row=row, column=1, pady=5)
+
+            def browse(var=var, name=name):
+                path = filedialog.askopenfilename(title=f"{name} matrix", parent=popup,
+                                                  filetypes=[("CSV", "*.csv *.csv.gz"), ("All files", "*")])
+                if path:
+                    var.set(path)
+
+            tk.Button(frame, text="Browse", command=browse).grid(row=row, column=2, padx=5)
+            path_vars.append(var)
+
+        instances_var = tk.BooleanVar()
+        tk.Checkbutton(frame, text="Third file holds total instances", variable=instances_var).grid(
+            row=3, column=0, columnspan=3, sticky="w", pady=5)
+
+        def start():
+            paths = [var.get().strip() for var in path_vars]
+            if not all(paths):
+                messagebox.showerror("Error", "Choose all three files.", parent=popup)
+                return
+            popup.destroy()
+            self.import_csv(*paths, instances=instances_var.get())
+
+        tk.Button(popup, text="Import", command=start).pack(pady=10)
+
+    def import_csv(self, allocation_path, max_path, vector_path, instances=False):
+        """
+        Read and validate the matrices on a worker thread so a large import
+        does not freeze the window; the engine is swapped in once it is done.
+        """
+        self.submit_run("import", lambda run: import_matrices(allocation_path, max_path, vector_path, instances),
+                        self._finish_import)
+        self.cli_print(f"Importing {allocation_path}, {max_path}, {vector_path}...")
+
+    def _finish_import(self, result):
+        engine, violations = result
+        if violations:
+            for violation in violations:
+                self.cli_print(f"  {violation}")
+            messagebox.showerror("Import failed", f"{len(violations)} problem(s), listed in the CLI output.\n\n"
+                                 + "\n".join(violations[:5]))
+            self.message_box.config(text="Import failed", fg="#e74c3c")
+            return
+
+        self.show_engine(engine)
+        self.cli_print(f"Imported {len(engine.processes)} processes, {len(engine.resources)} resources")
+        self.message_box.config(text="Matrices imported", fg="#16a085")
 
 
 #------------------------------------------Aarti-CLI------------------------------------------#
@@ -1020,7 +1285,14 @@ class Phase2DeadlockSimulator(tk.Tk):
             self.cli_print("  banker - Run Banker's algorithm")
             self.cli_print("  detect - Detect deadlock")
             self.cli_print("  recover - Recover from deadlock")
-            self.cli_print("  random - Generate random state")
+            self.cli_print("  random [family] [seed] - Generate random state")
+            self.cli_print("    families: " + ", ".join(FAMILIES))
+            self.cli_print("  save <path> - Save the workspace")
+            self.cli_print("  load <path> - Open a saved workspace")
+            self.cli_print("  import <allocation> <max> <available> [--instances] - Import CSV matrices")
+            self.cli_print("  zoom <factor> - Zoom the workspace (e.g. 2 or 0.5)")
+            self.cli_print("  fit - Zoom and pan to show every node")
+            self.cli_print("  layout [iterations] - Auto-layout the graph in the background")
             self.cli_print("  clear - Clear CLI output")
             
         elif cmd == "add":
@@ -1035,8 +1307,8 @@ class Phase2DeadlockSimulator(tk.Tk):
                 self.cli_print("Usage: add [process|resource]")
                 
         elif cmd == "list":
-            self.cli_print("Processes: " + ", ".join(self.processes))
-            self.cli_print("Resources: " + ", ".join(self.resources))
+            self.cli_print("Processes: " + ", ".join(self.engine.processes))
+            self.cli_print("Resources: " + ", ".join(self.engine.resources))
             
         elif cmd == "banker":
             self.check_safe_state()
@@ -1048,8 +1320,58 @@ class Phase2DeadlockSimulator(tk.Tk):
             self.recover_from_deadlock()
             
         elif cmd == "random":
-            self.generate_random_state()
+            family = parts[1] if len(parts) > 1 else "uniform"
+            seed = parts[2] if len(parts) > 2 else None
+            if seed is not None and seed.isdigit():
+                seed = int(seed)
+            if family not in FAMILIES:
+                self.cli_print("Usage: random [" + "|".join(FAMILIES) + "] [seed]")
+            else:
+                self.generate_random_state(family, seed)
             
+        elif cmd in ("save", "load"):
+            # Paths keep their case, so take them from the raw command
+            path = command.split(maxsplit=1)[1] if len(parts) > 1 else None
+            if path is None:
+                self.cli_print(f"Usage: {cmd} <path>")
+            elif cmd == "save":
+                self.save_workspace(path)
+            else:
+                self.open_workspace(path)
+
+        elif cmd == "import":
+            # Paths keep their case, so take them from the raw command
+            args = command.split()[1:]
+            instances = "--instances" in args
+            paths = [arg for arg in args if arg != "--instances"]
+            if len(paths) != 3:
+                self.cli_print("Usage: import <allocation.csv> <max.csv> <available.csv> [--instances]")
+            else:
+                self.import_csv(*paths, instances=instances)
+
+        elif cmd == "zoom":
+            try:
+                factor = float(parts[1])
+            except (IndexError, ValueError):
+                factor = 0
+            if factor <= 0:
+                self.cli_print("Usage: zoom <factor>")
+            else:
+                self.zoom_view(factor)
+
+        elif cmd == "fit":
+            self.fit_view()
+
+        elif cmd == "layout":
+            try:
+                iterations = int(parts[1]) if len(parts) > 1 else ITERATIONS
+            except ValueError:
+                iterations = 0
+            if iterations <= 0:
+                self.cli_print("Usage: layout [iterations]")
+            else:
+                self.auto_layout(iterations)
+
         elif cmd == "clear":
             self.cli_output.config(state=tk.NORMAL)
             self.cli_output.delete(1.0, tk.END)
@@ -0,0 +1,72 @@
+"""
+Scaling benchmark: loop-based vs NumPy-vectorized Banker's safety check.
+
+Usage:
+    python bench_safety.py [--sizes 500 1000 2000 4000] [--resources 20] [--seed 0]
+"""
+import argparse
+import random
+import time
+
+from engine import bankers_safe_sequence, bankers_safe_sequence_vectorized
+
+
+def make_state(n, m, rng, tiers=8):
+    """
+    Safe random state built in tiers: the highest-numbered processes can finish
+    first and each finished tier frees enough work for the next one, so the
+    loop has to rescan many blocked processes on every round.
+    """
+    step = max(1, n // (4 * tiers))
+    allocation = [[rng.randint(0, 1) for _ in range(m)] for _ in range(n)]
+    need = []
+    for p in range(n):
+        tier = (n - 1 - p) * tiers // n
+        need.append([rng.randint(0, 1) + tier * step for _ in range(m)])
+    available = [1] * m
+    return available, allocation, need
+
+
+def is_valid_safe_sequence(available, allocation, need, sequence):
+    if sorted(sequence) != list(range(len(allocation))):
+        return False
+    work = list(available)
+    for p in sequence:
+        if any(need[p][i] > work[i] for i in range(len(work))):
+            return False
+        for i in range(len(work)):
+            work[i] += allocation[p][i]
+    return True
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--resources", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'processes':>10} {'loop (s)':>10} {'vector (s)':>11} {'speedup':>8}  verdict")
+    for n in args.sizes:
+        available, allocation, need = make_state(n, args.resources, rng)
+        loop_seq, loop_time = time_call(bankers_safe_sequence, available, allocation, need)
+        vec_seq, vec_time = time_call(bankers_safe_sequence_vectorized, available, allocation, need)
+
+        if (loop_seq is None) != (vec_seq is None):
+            raise SystemExit(f"Verdict mismatch at n={n}")
+        if vec_seq is not None and not is_valid_safe_sequence(available, allocation, need, vec_seq):
+            raise SystemExit(f"Invalid safe sequence at n={n}")
+
+        verdict = "safe" if vec_seq is not None else "unsafe"
+        print(f"{n:>10} {loop_time:>10.4f} {vec_time:>11.4f} {loop_time / max(vec_time, 1e-9):>7.1f}x  {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Bitset engine for single-instance (lock-style) resources.
+
+When every resource has exactly one instance, allocation, request and max
+need are boolean matrices. Here each process keeps its held, requested and
+claimed resources as Python big-int bitsets (bit i = resource column i), so
+"can this process finish" is a single `requested & ~work == 0` test and a
+release is one OR into the free set. One bit per cell instead of a list slot
+per cell is what lets workloads with tens of thousands of locks fit.
+"""
+from collections import deque
+
+import numpy as np
+
+
+def _row_bits(matrix):
+    """Pack each row of a boolean matrix into a Python int (bit i = column i)"""
+    matrix = np.asarray(matrix, dtype=bool)
+    packed = np.packbits(matrix, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+def _bits(bitset):
+    """Indices of the set bits, lowest first, one big-int step per set bit"""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class BitsetEngine:
+    """
+    Single-instance counterpart of DeadlockEngine. A denied request leaves
+    the process waiting on the resource, as a lock acquisition would.
+    """
+
+    def __init__(self):
+        self.processes = []         # row -> process id
+        self.resources = []         # bit -> resource id
+        self._process_index = {}
+        self._resource_index = {}
+        self._next_process = 0
+        self._next_resource = 0
+        self.held = []              # row -> bitset of resources held
+        self.requested = []         # row -> bitset of resources waited on
+        self.claim = []             # row -> bitset of resources it may ever need
+        self.free = 0               # bitset of unheld resources
+
+    @classmethod
+    def from_engine(cls, engine):
+        """Build a bitset engine from a DeadlockEngine whose resources are all single-instance"""
+        if not engine.is_single_instance():
+            raise ValueError("Bitset engine needs single-instance resources")
+        bitset = cls()
+        bitset.processes = list(engine.processes)
+        bitset.resources = list(engine.resources)
+        bitset._process_index = {p: row for row, p in enumerate(bitset.processes)}
+        bitset._resource_index = {r: bit for bit, r in enumerate(bitset.resources)}
+        bitset._next_process = engine._next_process
+        bitset._next_resource = engine._next_resource
+        m = len(engine.resources)
+        bitset.held = _row_bits(engine.allocation > 0) if m else [0] * len(engine.processes)
+        bitset.requested = _row_bits(engine.request > 0) if m else [0] * len(engine.processes)
+        bitset.claim = _row_bits(engine.max_need > 0) if m else [0] * len(engine.processes)
+        bitset.free = _row_bits([engine.available > 0])[0] if m else 0
+        return bitset
+
+    # === Structure ===
+    def add_process(self):
+        process_id = f"P{self._next_process}"
+        self._next_process += 1
+        self._process_index[process_id] = len(self.processes)
+        self.processes.append(process_id)
+        self.held.append(0)
+        self.requested.append(0)
+        self.claim.append(0)
+        return process_id
+
+    def add_resource(self):
+        resource_id = f"R{self._next_resource}"
+        self._next_resource += 1
+        bit = len(self.resources)
+        self._resource_index[resource_id] = bit
+        self.resources.append(resource_id)
+        self.free |= 1 << bit
+        return resource_id
+
+    def remove_process(self, process_id):
+        """Remove a process, freeing what it holds; the last row takes its slot"""
+        row = self._process_index.pop(process_id)
+        self.free |= self.held[row]
+        last = len(self.processes) - 1
+        if row != last:
+            moved = self.processes[last]
+            self.processes[row] = moved
+            self._process_index[moved] = row
+            for bitsets in (self.held, self.requested, self.claim):
+                bitsets[row] = bitsets[last]
+        for bitsets in (self.processes, self.held, self.requested, self.claim):
+            bitsets.pop()
+
+    def remove_resource(self, resource_id):
+        """Remove a resource; the last bit is moved into its position"""
+        bit = self._resource_index.pop(resource_id)
+        last = len(self.resources) - 1
+        if bit != last:
+            moved = self.resources[last]
+            self.resources[bit] = moved
+            self._resource_index[moved] = bit
+        self.resources.pop()
+
+        def compact(bits):
+            bits &= ~(1 << bit)
+            if bit != last and bits >> last & 1:
+                bits |= 1 << bit
+            return bits & ~(1 << last)
+
+        for bitsets in (self.held, self.requested, self.claim):
+            bitsets[:] = [compact(bits) for bits in bitsets]
+        self.free = compact(self.free)
+
+    def _bit(self, resource_id):
+        return 1 << self._resource_index[resource_id]
+
+    # === Claims, requests and releases ===
+    def set_claim(self, process_id, resource_ids):
+        """Declare the resources a process may ever need (its max need row)"""
+        claim = 0
+        for resource_id in resource_ids:
+            claim |= self._bit(resource_id)
+        row = self._process_index[process_id]
+        self.claim[row] = claim | self.held[row]
+
+    def request_resource(self, process_id, resource_id):
+        """Acquire a resource if free (returns True), otherwise wait on it (False)"""
+        row = self._process_index[process_id]
+        bit = self._bit(resource_id)
+        self.claim[row] |= bit
+        if self.free & bit:
+            self.free &= ~bit
+            self.held[row] |= bit
+            self.requested[row] &= ~bit
+            return True
+        self.requested[row] |= bit
+        return False
+
+    def release_resources(self, process_id):
+        """
+        Release everything the process holds; returns the released resource
+        ids. As in DeadlockEngine, the released resources are still claimed,
+        so they become requested again.
+        """
+        row = self._process_index[process_id]
+        released = self.held[row]
+        self.free |= released
+        self.held[row] = 0
+        self.requested[row] |= released
+        return [self.resources[bit] for bit in _bits(released)]
+
+    def terminate_process(self, process_id):
+        row = self._process_index[process_id]
+        self.free |= self.held[row]
+        self.held[row] = self.requested[row] = self.claim[row] = 0
+
+    # === Algorithms ===
+    def _reduce(self, rows, blocked_on):
+        """
+        Worklist reduction: each row counts the bits of its blocking set
+        missing from work and waits on those bits; a finishing process ORs
+        its held set into work and only the waiters on the newly set bits
+        are rechecked. Returns (finish order, stuck rows).
+        """
+        work = self.free
+        held = self.held
+        missing = {}
+        waiters = {}
+        ready = deque()
+        for row in rows:
+            count = 0
+            for bit in _bits(blocked_on[row] & ~work):
+                waiters.setdefault(bit, []).append(row)
+                count += 1
+            missing[row] = count
+            if not count:
+                ready.append(row)
+
+        order = []
+        while ready:
+            row = ready.popleft()
+            order.append(row)
+            gained = held[row] & ~work
+            work |= gained
+            for bit in _bits(gained):
+                for waiter in waiters.pop(bit, ()):
+                    missing[waiter] -= 1
+                    if not missing[waiter]:
+                        ready.append(waiter)
+        return order, [row for row in rows if missing[row]]
+
+    def detect_deadlock(self):
+        """Deadlocked process ids: holders whose requests can never be satisfied"""
+        rows = [row for row, bits in enumerate(self.held) if bits]
+        _, stuck = self._reduce(rows, self.requested)
+        return [self.processes[row] for row in stuck]
+
+    def check_safe_state(self):
+        """Banker's safety check on claims; returns (is_safe, safe_sequence)"""
+        need = [claim & ~held for claim, held in zip(self.claim, self.held)]
+        order, stuck = self._reduce(list(range(len(self.processes))), need)
+        if stuck:
+            return False, []
+        return True, [self.processes[row] for row in order]
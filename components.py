@@ -0,0 +1,197 @@
+"""
+Connected-component partitioning of the process-resource graph.
+
+Large scenarios usually split into independent clusters: a process only
+interacts with the resources it holds or requests. Deadlock detection and
+the Banker's safety check both decompose over those clusters, so the
+tracker below keeps the components of a DeadlockEngine up to date and
+re-runs the algorithms only on components touched since the last query,
+optionally fanning them out to worker processes. DeadlockEngine creates
+one on demand for its "components" detection and safety methods.
+"""
+import numpy as np
+
+from engine import (ADD_PROCESS, ADD_RESOURCE, CONFIGURE, GRANT, RELEASE, SET_INSTANCES,
+                    bankers_safe_sequence_vectorized, find_deadlocked_worklist)
+
+
+def evaluate_component(payload):
+    """
+    Run detection and the safety check on one component's submatrices.
+    Top-level so it can be shipped to a process pool. Returns
+    (deadlocked rows, safe sequence rows or None).
+    """
+    available, allocation, max_need, request = payload
+    deadlocked = find_deadlocked_worklist(available, allocation, request)
+    order = bankers_safe_sequence_vectorized(available, allocation, max_need - allocation)
+    return deadlocked, order
+
+
+class ComponentTracker:
+    """
+    Keeps the connected components of an engine's process-resource graph
+    (an edge wherever allocation or request is nonzero) with a dirty flag
+    per component.
+
+    Edges only change through configuration: the tracker diffs the
+    reconfigured process's row against the edges it recorded, unions the
+    new ones with union-find and schedules a full rebuild on the next query
+    only when an edge disappeared, since that can split a component.
+    Terminations, removals and bulk rewrites schedule a rebuild as well.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._parent = {}
+        self._edges = {}            # process id -> set of resource ids it has an edge to
+        self._stale = True          # structure must be rebuilt before use
+        self._all_dirty = True      # every component needs re-evaluation
+        self._dirty = set()         # node ids touched since the last evaluation
+        # frozenset of member ids -> (deadlocked ids, is_safe, safe sequence ids)
+        self._results = {}
+        engine.add_listener(self._on_change)
+
+    def close(self):
+        self.engine.remove_listener(self._on_change)
+
+    # === Union-find ===
+    def _find(self, node):
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, a, b):
+        root_a = self._find(a)
+        root_b = self._find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+    def _rebuild(self):
+        engine = self.engine
+        self._parent = {node: node for node in engine.processes}
+        self._parent.update((node, node) for node in engine.resources)
+        self._edges = {node: set() for node in engine.processes}
+        rows, cols = np.nonzero((engine.allocation > 0) | (engine.request > 0))
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            process_id, resource_id = engine.processes[row], engine.resources[col]
+            self._edges[process_id].add(resource_id)
+            self._union(process_id, resource_id)
+        self._stale = False
+
+    def _reconfigured(self, process_id):
+        """Union a reconfigured process's new edges; go stale only if one of its edges was dropped"""
+        engine = self.engine
+        row = engine.row_of(process_id)
+        cols = np.flatnonzero((engine.allocation[row] > 0) | (engine.request[row] > 0))
+        edges = {engine.resources[col] for col in cols.tolist()}
+        old = self._edges[process_id]
+        self._edges[process_id] = edges
+        if old - edges:
+            self._stale = True
+            return
+        for resource_id in edges - old:
+            self._union(process_id, resource_id)
+
+    def _on_change(self, event, process_id, resource_id):
+        if event in (ADD_PROCESS, ADD_RESOURCE):
+            node = process_id or resource_id
+            if not self._stale:
+                self._parent[node] = node
+                if process_id:
+                    self._edges[node] = set()
+        elif event == CONFIGURE:
+            if not self._stale:
+                self._reconfigured(process_id)
+            self._dirty.add(process_id)
+        elif event in (GRANT, RELEASE):
+            # Grants and releases move units along existing edges
+            self._dirty.add(process_id)
+        elif event == SET_INSTANCES:
+            self._dirty.add(resource_id)
+        else:
+            self._stale = True
+            self._all_dirty = True
+
+    # === Queries ===
+    def components(self):
+        """Return [(process_ids, resource_ids)] for every component"""
+        if self._stale:
+            self._rebuild()
+        groups = {}
+        for node in self.engine.processes:
+            groups.setdefault(self._find(node), ([], []))[0].append(node)
+        for node in self.engine.resources:
+            groups.setdefault(self._find(node), ([], []))[1].append(node)
+        return list(groups.values())
+
+    def dirty_components(self):
+        return [group for group in self.components() if self._needs_evaluation(group)]
+
+    def _needs_evaluation(self, group):
+        key = frozenset(group[0]).union(group[1])
+        return self._all_dirty or key not in self._results or not self._dirty.isdisjoint(key)
+
+    def _payload(self, process_ids, resource_ids):
+        engine = self.engine
+        rows = [engine.row_of(p) for p in process_ids]
+        cols = [engine.column_of(r) for r in resource_ids]
+        block = np.ix_(rows, cols)
+        return (engine.available[cols], engine.allocation[block],
+                engine.max_need[block], engine.request[block])
+
+    def evaluate(self, executor=None):
+        """
+        Bring every component's cached result up to date, re-running only the
+        dirty ones. With a concurrent.futures executor (e.g. a
+        ProcessPoolExecutor) the dirty components are evaluated in parallel.
+        Returns the number of components that were re-evaluated.
+        """
+        results = {}
+        pending = []
+        for process_ids, resource_ids in self.components():
+            key = frozenset(process_ids).union(resource_ids)
+            if not self._needs_evaluation((process_ids, resource_ids)):
+                results[key] = self._results[key]
+            elif not resource_ids or not process_ids:
+                # Isolated node: nothing to wait for
+                results[key] = ([], True, list(process_ids))
+            else:
+                pending.append((key, process_ids, resource_ids))
+
+        payloads = [self._payload(process_ids, resource_ids) for _, process_ids, resource_ids in pending]
+        if executor is not None and len(payloads) > 1:
+            outcomes = executor.map(evaluate_component, payloads)
+        else:
+            outcomes = map(evaluate_component, payloads)
+
+        for (key, process_ids, _), (deadlocked, order) in zip(pending, outcomes):
+            sequence = [process_ids[row] for row in order] if order is not None else []
+            results[key] = ([process_ids[row] for row in deadlocked], order is not None, sequence)
+
+        self._results = results
+        self._dirty.clear()
+        self._all_dirty = False
+        return len(pending)
+
+    def detect_deadlock(self, executor=None):
+        """Deadlocked process ids across all components, in engine row order"""
+        self.evaluate(executor)
+        deadlocked = set()
+        for component_deadlocked, _, _ in self._results.values():
+            deadlocked.update(component_deadlocked)
+        return [p for p in self.engine.processes if p in deadlocked]
+
+    def check_safe_state(self, executor=None):
+        """
+        (is_safe, safe_sequence) for the whole system. Components do not share
+        resources, so concatenating their safe sequences gives a global one.
+        """
+        self.evaluate(executor)
+        sequence = []
+        for _, is_safe, component_sequence in self._results.values():
+            if not is_safe:
+                return False, []
+            sequence.extend(component_sequence)
+        return True, sequence
@@ -0,0 +1,256 @@
+"""
+Incremental, culled drawing of the resource-allocation graph's edges on a
+Tk canvas.
+
+The renderer keeps the edge set as (process, resource, kind) keys, indexed
+by node, plus node centres in world coordinates. Registered as an engine
+listener it learns which processes changed, so a redraw only diffs those
+rows. Only edges with at least one endpoint in the visible set are
+materialized as canvas lines, and a map from drawn key to line lets it
+create, delete, recolour or move exactly the lines that changed. Dragging a
+node moves just the lines attached to it. No canvas.coords lookups happen
+per edge.
+
+kind is ALLOCATION (drawn resource -> process) or REQUEST (process ->
+resource). At the viewport's low level of detail both edges of a pair are
+drawn as one plain AGGREGATE line.
+"""
+import tkinter as tk
+
+import numpy as np
+
+from engine import ADD_PROCESS, ADD_RESOURCE, REMOVE_PROCESS, REMOVE_RESOURCE, SET_INSTANCES
+from viewport import Viewport
+
+ALLOCATION = "allocation"
+REQUEST = "request"
+AGGREGATE = "aggregate"
+COLORS = {ALLOCATION: "#2ecc71", REQUEST: "#f39c12", AGGREGATE: "#7f8c8d"}
+HIGHLIGHT = "#e74c3c"
+TAG = "graph_arrow"
+
+
+def highlight_pair(key):
+    """The pair used for an edge in a highlight path, as produced by waitfor.cycle_edges"""
+    process, resource, kind = key
+    return (resource, process) if kind == ALLOCATION else (process, resource)
+
+
+class EdgeRenderer:
+    """Edge lines of one canvas, kept in step with an engine by diffing changed rows only"""
+
+    def __init__(self, canvas, viewport=None):
+        self.canvas = canvas
+        self.viewport = viewport or Viewport()
+        self.keys = set()        # every edge in the engine, as (process, resource, kind)
+        self.node_edges = {}     # node id -> set of edge keys touching it
+        self.centres = {}        # node id -> world (x, y)
+        self.visible = None      # nodes whose edges are drawn (None: all of them)
+        self.items = {}          # drawn (process, resource, kind) -> canvas item id
+        self.item_colors = {}    # drawn key -> current fill
+        self.highlight = set()   # highlight pairs currently drawn in HIGHLIGHT
+        self.dirty = set()       # processes whose rows changed since the last sync
+        self.removed = set()     # nodes removed from the engine since the last sync
+        self.dirty_all = True
+
+    def clear(self):
+        """Forget every line and node, e.g. when the engine is replaced"""
+        self.canvas.delete(TAG)
+        self.keys.clear()
+        self.node_edges.clear()
+        self.centres.clear()
+        self.visible = None
+        self.items.clear()
+        self.item_colors.clear()
+        self.highlight = set()
+        self.dirty.clear()
+        self.removed.clear()
+        self.dirty_all = True
+
+    # === Engine listener ===
+    def engine_changed(self, event, process_id=None, resource_id=None):
+        """Engine listener: remember what a mutation touched until the next sync"""
+        if event in (ADD_PROCESS, ADD_RESOURCE, SET_INSTANCES):
+            return
+        if event in (REMOVE_PROCESS, REMOVE_RESOURCE):
+            node = process_id if event == REMOVE_PROCESS else resource_id
+            self.removed.add(node)
+            self.dirty.discard(node)
+        elif process_id is not None:
+            self.dirty.add(process_id)
+        else:
+            self.dirty_all = True
+
+    # === Nodes ===
+    def _pairs(self, node):
+        return {(process, resource) for process, resource, _ in self.node_edges.get(node, ())}
+
+    def place_node(self, node, x, y):
+        """Record a node's world centre and move the lines attached to it there"""
+        placed = node in self.centres
+        self.centres[node] = (x, y)
+        for process, resource in self._pairs(node):
+            if not placed:
+                self._refresh(process, resource)
+                continue
+            for kind in (ALLOCATION, REQUEST, AGGREGATE):
+                item = self.items.get((process, resource, kind))
+                if item is not None:
+                    self.canvas.coords(item, *self._endpoints((process, resource, kind)))
+
+    def set_centres(self, centres):
+        """Record many node centres at once without touching lines; follow with redraw()"""
+        self.centres.update((node, centre) for node, centre in centres.items() if node in self.centres)
+
+    def move_node(self, node, dx, dy):
+        x, y = self.centres[node]
+        self.place_node(node, x + dx, y + dy)
+
+    def remove_node(self, node):
+        """Drop a node with its edges; returns the number of lines deleted"""
+        self.centres.pop(node, None)
+        pairs = self._pairs(node)
+        for key in list(self.node_edges.get(node, ())):
+            self._forget(key)
+        self.node_edges.pop(node, None)
+        if self.visible is not None:
+            self.visible.discard(node)
+        return sum(self._refresh(process, resource) for process, resource in pairs)
+
+    def set_visible(self, nodes, redraw=False):
+        """
+        Draw only edges touching these nodes (None: all). Lines are created
+        or deleted just for the nodes entering or leaving the set; with
+        redraw every line is recreated instead, e.g. after a zoom.
+        """
+        nodes = None if nodes is None else set(nodes)
+        if redraw:
+            self.visible = nodes
+            self.redraw()
+            return
+        if self.visible is None or nodes is None:
+            changed = set(self.centres)
+        else:
+            changed = self.visible ^ nodes
+        self.visible = nodes
+        pairs = set()
+        for node in changed:
+            pairs |= self._pairs(node)
+        for process, resource in pairs:
+            self._refresh(process, resource)
+
+    def redraw(self):
+        """Recreate every drawn line, e.g. after a zoom or a level-of-detail change"""
+        self.canvas.delete(TAG)
+        self.items.clear()
+        self.item_colors.clear()
+        nodes = self.centres if self.visible is None else self.visible
+        pairs = set()
+        for node in nodes:
+            pairs |= self._pairs(node)
+        for process, resource in pairs:
+            self._refresh(process, resource)
+
+    # === Edges ===
+    def _remember(self, key):
+        self.keys.add(key)
+        self.node_edges.setdefault(key[0], set()).add(key)
+        self.node_edges.setdefault(key[1], set()).add(key)
+
+    def _forget(self, key):
+        self.keys.discard(key)
+        for node in key[:2]:
+            edges = self.node_edges.get(node)
+            if edges is not None:
+                edges.discard(key)
+
+    def _endpoints(self, key):
+        process, resource, kind = key
+        px, py = self.viewport.to_screen(*self.centres[process])
+        rx, ry = self.viewport.to_screen(*self.centres[resource])
+        return (px, py, rx, ry) if kind == REQUEST else (rx, ry, px, py)
+
+    def _shown(self, node):
+        return node in self.centres and (self.visible is None or node in self.visible)
+
+    def _wanted_lines(self, process, resource):
+        """{drawn key: colour} this pair should have on the canvas right now"""
+        kinds = [kind for kind in (ALLOCATION, REQUEST) if (process, resource, kind) in self.keys]
+        if (not kinds or process not in self.centres or resource not in self.centres
+                or not (self._shown(process) or self._shown(resource))):
+            return {}
+        hot = {kind for kind in kinds if highlight_pair((process, resource, kind)) in self.highlight}
+        if not self.viewport.detailed:
+            color = HIGHLIGHT if hot else COLORS[kinds[0] if len(kinds) == 1 else AGGREGATE]
+            return {(process, resource, AGGREGATE): color}
+        return {(process, resource, kind): HIGHLIGHT if kind in hot else COLORS[kind] for kind in kinds}
+
+    def _refresh(self, process, resource):
+        """Bring one pair's lines in step; returns the number of canvas calls made"""
+        wanted = self._wanted_lines(process, resource)
+        calls = 0
+        for kind in (ALLOCATION, REQUEST, AGGREGATE):
+            key = (process, resource, kind)
+            if key in self.items and key not in wanted:
+                self.canvas.delete(self.items.pop(key))
+                del self.item_colors[key]
+                calls += 1
+        for key, color in wanted.items():
+            if key not in self.items:
+                if key[2] == AGGREGATE:
+                    options = {"width": 1}
+                else:
+                    options = {"width": 2, "arrow": tk.LAST}
+                self.items[key] = self.canvas.create_line(*self._endpoints(key), fill=color, tags=TAG, **options)
+            elif self.item_colors[key] != color:
+                self.canvas.itemconfigure(self.items[key], fill=color)
+            else:
+                continue
+            self.item_colors[key] = color
+            calls += 1
+        return calls
+
+    def _wanted(self, engine, rows):
+        """Edge keys present in the given rows (an index array) of the engine's matrices"""
+        keys = set()
+        for kind, matrix in ((ALLOCATION, engine.allocation), (REQUEST, engine.request)):
+            sub_rows, cols = np.nonzero(matrix[rows])
+            for row, col in zip(rows[sub_rows].tolist(), cols.tolist()):
+                keys.add((engine.processes[row], engine.resources[col], kind))
+        return keys
+
+    def sync(self, engine, highlight=()):
+        """
+        Bring the edges in step with the engine, diffing only the rows of
+        processes changed since the last sync (every row after a bulk
+        change), and draw the given highlight pairs in red. Returns the
+        number of canvas calls made.
+        """
+        calls = 0
+        for node in self.removed:
+            calls += self.remove_node(node)
+        self.removed.clear()
+
+        if self.dirty_all:
+            current = set(self.keys)
+            wanted = self._wanted(engine, np.arange(len(engine.processes)))
+        else:
+            rows = np.array([engine.row_of(p) for p in self.dirty], dtype=np.intp)
+            current = {key for p in self.dirty for key in self.node_edges.get(p, ()) if key[0] == p}
+            wanted = self._wanted(engine, rows)
+        self.dirty.clear()
+        self.dirty_all = False
+
+        pairs = set()
+        for key in current - wanted:
+            self._forget(key)
+            pairs.add(key[:2])
+        for key in wanted - current:
+            self._remember(key)
+            pairs.add(key[:2])
+        old_highlight, self.highlight = self.highlight, set(highlight)
+        for a, b in old_highlight ^ self.highlight:
+            pairs.update(((b, a), (a, b)))
+        for process, resource in pairs:
+            calls += self._refresh(process, resource)
+        return calls
@@ -0,0 +1,796 @@
+"""
+Headless deadlock engine used by the Phase 2 Deadlock Simulator.
+
+Holds the system state (processes, resources, allocation, max need, request
+and available vectors) and runs Banker's safety check and deadlock detection
+without any Tk dependency, so it can be driven from the GUI, the CLI, batch
+jobs and benchmarks alike.
+"""
+from collections import deque
+
+import numpy as np
+
+import scenarios
+import waitfor
+
+# Outcomes of DeadlockEngine.admit_request
+GRANTED = "granted"
+UNAVAILABLE = "unavailable"
+UNSAFE = "unsafe"
+
+# Mutation events passed to engine listeners (see DeadlockEngine.add_listener)
+ADD_PROCESS = "add_process"
+ADD_RESOURCE = "add_resource"
+REMOVE_PROCESS = "remove_process"
+REMOVE_RESOURCE = "remove_resource"
+CONFIGURE = "configure"
+SET_INSTANCES = "set_instances"
+GRANT = "grant"
+RELEASE = "release"
+TERMINATE = "terminate"
+BULK = "bulk"
+
+# Matrix element type and the initial row/column capacity of the dense store
+DTYPE = np.int32
+PROGRESS_EVERY = 4096
+INITIAL_CAPACITY = 8
+
+
+# === Algorithms on plain matrices ===
+def bankers_safe_sequence(available, allocation, need):
+    """Banker's safety check; returns the safe sequence (row indices) or None"""
+    n = len(allocation)
+    m = len(available)
+    work = list(available)
+    finish = [False] * n
+    safe_sequence = []
+
+    while len(safe_sequence) < n:
+        found = False
+        for p in range(n):
+            if not finish[p]:
+                # Check if need[p] <= work
+                can_allocate = True
+                for i in range(m):
+                    if need[p][i] > work[i]:
+                        can_allocate = False
+                        break
+
+                if can_allocate:
+                    # Simulate allocation
+                    for i in range(m):
+                        work[i] += allocation[p][i]
+                    finish[p] = True
+                    safe_sequence.append(p)
+                    found = True
+                    break
+
+        if not found:
+            return None
+
+    return safe_sequence
+
+
+def bankers_safe_sequence_vectorized(available, allocation, need, progress=None):
+    """
+    Array-backed Banker's safety check. Each round compares need <= work for
+    every unfinished process at once and releases all eligible processes
+    together, so the number of interpreted iterations is the number of rounds
+    rather than n^2. Returns the safe sequence (row indices) or None.
+    progress(done, n), if given, is called after every round; an exception
+    it raises aborts the check.
+    """
+    n = len(allocation)
+    m = len(available)
+    work = np.array(available, dtype=np.int64).reshape(m)
+    allocation = np.asarray(allocation, dtype=np.int64).reshape(n, m)
+    need = np.asarray(need, dtype=np.int64).reshape(n, m)
+    pending = np.arange(n)
+    safe_sequence = []
+
+    while pending.size:
+        eligible = (need[pending] <= work).all(axis=1)
+        if not eligible.any():
+            return None
+        done = pending[eligible]
+        # Every eligible process could run with the current work vector, so
+        # releasing them in index order is a valid piece of the safe sequence
+        work += allocation[done].sum(axis=0)
+        safe_sequence.extend(done.tolist())
+        pending = pending[~eligible]
+        if progress:
+            progress(len(safe_sequence), n)
+
+    return safe_sequence
+
+
+def find_deadlocked(available, allocation, request):
+    """Deadlock detection; returns the row indices of deadlocked processes"""
+    n = len(allocation)
+    m = len(available)
+    work = list(available)
+    finish = [sum(allocation[p]) == 0 for p in range(n)]
+
+    while True:
+        found = False
+        for p in range(n):
+            if not finish[p]:
+                can_finish = True
+                for i in range(m):
+                    if request[p][i] > work[i]:
+                        can_finish = False
+                        break
+
+                if can_finish:
+                    for i in range(m):
+                        work[i] += allocation[p][i]
+                    finish[p] = True
+                    found = True
+
+        if not found:
+            break
+
+    return [p for p in range(n) if not finish[p]]
+
+
+def find_deadlocked_worklist(available, allocation, request, progress=None):
+    """
+    Counter-based deadlock detection in O(n*m + edges log edges).
+
+    Each blocked process keeps a count of resources it is still short on and
+    waits in a per-resource queue sorted by how much it requests. When a
+    process finishes, only the queues of the resources it returns to work are
+    advanced, instead of rescanning every process. Returns the row indices of
+    deadlocked processes. progress(finished, n), if given, is called every
+    PROGRESS_EVERY finished processes; an exception it raises aborts the run.
+    """
+    m = len(available)
+    allocation = np.asarray(allocation).reshape(len(allocation), m)
+    request = np.asarray(request).reshape(len(request), m)
+    n = allocation.shape[0]
+    work = np.array(available, dtype=np.int64).reshape(m)
+
+    # Processes holding nothing cannot be part of a deadlock
+    finish = ~allocation.any(axis=1)
+    blocked = (request > work) & ~finish[:, None]
+    short = blocked.sum(axis=1)
+    ready = deque(np.flatnonzero(~finish & (short == 0)).tolist())
+    if not ready:
+        # Nothing can make progress, so every process holding resources is stuck
+        return np.flatnonzero(~finish).tolist()
+    short = short.tolist()
+
+    # Per-resource waiter queues sorted by requested amount, stored as one
+    # array ordered by (resource, amount) plus a start offset per resource
+    rows, cols = np.nonzero(blocked)
+    amounts = request[rows, cols]
+    order = np.lexsort((amounts, cols))
+    waiter_rows = rows[order].tolist()
+    waiter_amounts = amounts[order].tolist()
+    heads = np.searchsorted(cols[order], np.arange(m + 1)).tolist()
+    ends = heads[1:]
+
+    work = work.tolist()
+    finish = finish.tolist()
+    finished = 0
+
+    while ready:
+        p = ready.popleft()
+        finish[p] = True
+        finished += 1
+        if progress and finished % PROGRESS_EVERY == 0:
+            progress(finished, n)
+        held = allocation[p]
+        cols = np.flatnonzero(held)
+        for i, count in zip(cols.tolist(), held[cols].tolist()):
+            work[i] += count
+            h = heads[i]
+            end = ends[i]
+            while h < end and waiter_amounts[h] <= work[i]:
+                waiter = waiter_rows[h]
+                short[waiter] -= 1
+                if short[waiter] == 0:
+                    ready.append(waiter)
+                h += 1
+            heads[i] = h
+
+    return [p for p in range(n) if not finish[p]]
+
+
+def _finish_batch(work, allocation, demand, finished):
+    """
+    Batched reduction: in every round each unfinished process whose demand
+    fits in its state's work vector finishes and returns its allocation.
+    Returns the finished mask once no state makes progress.
+    """
+    work = work.astype(np.int64)
+    finished = finished.copy()
+    while True:
+        ready = ~finished & (demand <= work[:, None, :]).all(axis=2)
+        if not ready.any():
+            return finished
+        work += (allocation * ready[..., None]).sum(axis=1)
+        finished |= ready
+
+
+def bankers_safe_batch(available, allocation, need):
+    """
+    Banker's safety check over a batch of states: available is (batch, m),
+    allocation and need are (batch, n, m). Returns a (batch,) mask of the
+    safe states.
+    """
+    everyone = np.zeros(allocation.shape[:2], dtype=bool)
+    return _finish_batch(available, allocation, need, everyone).all(axis=1)
+
+
+def find_deadlocked_batch(available, allocation, request):
+    """Deadlock detection over a batch of states; returns a (batch, n) mask of deadlocked processes"""
+    # Processes holding nothing cannot be part of a deadlock
+    idle = ~allocation.any(axis=2)
+    return ~_finish_batch(available, allocation, request, idle)
+
+
+# === Engine ===
+class DeadlockEngine:
+    """
+    Resource-allocation state plus the operations the simulator performs on it.
+
+    Matrices are dense 2-D integer arrays indexed by row (process) and column
+    (resource). External ids stay stable: they are never reissued, and
+    deletion swaps the last row/column into the freed slot in O(1) rows.
+    """
+
+    def __init__(self, debug=False):
+        # In debug mode every mutation re-derives the running counters from
+        # the full matrices and raises if they have drifted
+        self.debug = debug
+        self.processes = []         # row -> process id
+        self.resources = []         # column -> resource id
+        self._process_index = {}    # process id -> row
+        self._resource_index = {}   # resource id -> column
+        self._next_process = 0
+        self._next_resource = 0
+
+        self._allocation = np.zeros((INITIAL_CAPACITY, INITIAL_CAPACITY), dtype=DTYPE)
+        self._max_need = np.zeros_like(self._allocation)
+        self._request = np.zeros_like(self._allocation)
+        self._instances = np.zeros(INITIAL_CAPACITY, dtype=DTYPE)
+        self._available = np.zeros(INITIAL_CAPACITY, dtype=DTYPE)
+        # Running per-resource allocated totals, kept in step with _available
+        self._allocated = np.zeros(INITIAL_CAPACITY, dtype=DTYPE)
+        # Resources whose available count changed since pop_available_changes
+        self._changed_available = set()
+        # Callbacks run after every mutation as callback(event, process_id, resource_id)
+        self._listeners = []
+
+        # Last Banker's verdict for the current state: None when stale,
+        # otherwise (is_safe, safe sequence of rows, position of each row in it)
+        self._safety_cache = None
+        # ComponentTracker behind the "components" methods, created on first use
+        self._components = None
+
+    @classmethod
+    def from_arrays(cls, processes, resources, instances, allocation, max_need, request,
+                    allocated=None, next_process=None, next_resource=None, debug=False):
+        """
+        Build an engine around existing (n, m) matrices without copying them,
+        e.g. memory-mapped ones: they become the backing store, so the first
+        growth is the first full copy. allocated (the per-resource running
+        totals) defaults to the column sums of allocation.
+        """
+        engine = cls(debug)
+        n, m = len(processes), len(resources)
+        matrices = [np.asarray(matrix, dtype=DTYPE) for matrix in (allocation, max_need, request)]
+        for matrix in matrices:
+            if matrix.shape != (n, m):
+                raise ValueError(f"Expected a {n}x{m} matrix, got {matrix.shape[0]}x{matrix.shape[1]}")
+        engine._allocation, engine._max_need, engine._request = matrices
+
+        engine.processes = list(processes)
+        engine.resources = list(resources)
+        engine._process_index = {p: row for row, p in enumerate(engine.processes)}
+        engine._resource_index = {r: col for col, r in enumerate(engine.resources)}
+        engine._next_process = next_process if next_process is not None else n
+        engine._next_resource = next_resource if next_resource is not None else m
+
+        engine._instances = np.array(instances, dtype=DTYPE).reshape(m)
+        if allocated is None:
+            allocated = engine._allocation.sum(axis=0)
+        engine._allocated = np.array(allocated, dtype=DTYPE).reshape(m)
+        engine._available = engine._instances - engine._allocated
+        engine._changed_available = set(engine.resources)
+        if debug:
+            engine.verify_counters()
+        return engine
+
+    def snapshot(self):
+        """
+        Independent copy of the current state (without listeners), e.g. for
+        an algorithm run on another thread while this engine keeps changing
+        """
+        engine = DeadlockEngine.from_arrays(
+            self.processes, self.resources, self.resource_instances,
+            self.allocation.copy(), self.max_need.copy(), self.request.copy(),
+            allocated=self._allocated[:len(self.resources)],
+            next_process=self._next_process, next_resource=self._next_resource, debug=self.debug)
+        # Cached verdicts hold arrays that are replaced, never modified, so sharing is safe
+        engine._safety_cache = self._safety_cache
+        return engine
+
+    def adopt_safety(self, snapshot):
+        """
+        Take over the Banker's verdict a snapshot of this engine computed,
+        e.g. on a worker thread. Only valid while this engine is unchanged
+        since the snapshot was taken; the caller checks that.
+        """
+        if self._safety_cache is None:
+            self._safety_cache = snapshot._safety_cache
+
+    # === Matrix views ===
+    @property
+    def allocation(self):
+        return self._allocation[:len(self.processes), :len(self.resources)]
+
+    @property
+    def max_need(self):
+        return self._max_need[:len(self.processes), :len(self.resources)]
+
+    @property
+    def request(self):
+        return self._request[:len(self.processes), :len(self.resources)]
+
+    @property
+    def resource_instances(self):
+        return self._instances[:len(self.resources)]
+
+    @property
+    def available(self):
+        return self._available[:len(self.resources)]
+
+    def _ensure_capacity(self, rows, cols):
+        """Grow the backing arrays geometrically so appends stay amortized O(1)"""
+        cap_rows, cap_cols = self._allocation.shape
+        if rows <= cap_rows and cols <= cap_cols:
+            return
+        new_rows = max(rows, cap_rows * 2 if rows > cap_rows else cap_rows)
+        new_cols = max(cols, cap_cols * 2 if cols > cap_cols else cap_cols)
+        for name in ("_allocation", "_max_need", "_request"):
+            old = getattr(self, name)
+            grown = np.zeros((new_rows, new_cols), dtype=DTYPE)
+            grown[:cap_rows, :cap_cols] = old
+            setattr(self, name, grown)
+        for name in ("_instances", "_available", "_allocated"):
+            old = getattr(self, name)
+            grown = np.zeros(new_cols, dtype=DTYPE)
+            grown[:cap_cols] = old
+            setattr(self, name, grown)
+
+    # === Running counters ===
+    def _adjust_allocated(self, cols, delta):
+        """Apply a per-column allocation delta to the allocated and available counters"""
+        self._allocated[cols] += delta
+        self._available[cols] -= delta
+        for col in np.atleast_1d(cols).tolist():
+            self._changed_available.add(self.resources[col])
+
+    def pop_available_changes(self):
+        """Return {resource_id: available} for resources changed since the last call"""
+        changed = {r_id: int(self._available[self._resource_index[r_id]])
+                   for r_id in self._changed_available if r_id in self._resource_index}
+        self._changed_available.clear()
+        return changed
+
+    def verify_counters(self):
+        """Check the running counters against full column sums; raises on drift"""
+        allocated = self.allocation.sum(axis=0)
+        expected = self.resource_instances - allocated
+        bad = np.flatnonzero((allocated != self._allocated[:len(self.resources)])
+                             | (expected != self.available))
+        if bad.size:
+            details = ", ".join(f"{self.resources[col]} (available {self.available[col]}, expected {expected[col]})"
+                                for col in bad.tolist())
+            raise RuntimeError(f"Available counters out of sync: {details}")
+
+    # === Listeners ===
+    def add_listener(self, callback):
+        """Call callback(event, process_id, resource_id) after every mutation"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _mutated(self, event, process_id=None, resource_id=None):
+        if self.debug:
+            self.verify_counters()
+        for callback in self._listeners:
+            callback(event, process_id, resource_id)
+
+    # === Structure ===
+    def add_process(self):
+        """Add a process with zero allocation and return its id"""
+        process_id = f"P{self._next_process}"
+        self._next_process += 1
+        row = len(self.processes)
+        self._ensure_capacity(row + 1, len(self.resources))
+        self.processes.append(process_id)
+        self._process_index[process_id] = row
+        if self._safety_cache and self._safety_cache[0]:
+            # Zero need, so it can always run last
+            _, sequence, position = self._safety_cache
+            self._safety_cache = (True, np.append(sequence, row), np.append(position, len(sequence)))
+        self._mutated(ADD_PROCESS, process_id=process_id)
+        return process_id
+
+    def add_resource(self, instances=1):
+        """Add a resource with the given number of instances and return its id"""
+        resource_id = f"R{self._next_resource}"
+        self._next_resource += 1
+        col = len(self.resources)
+        self._ensure_capacity(len(self.processes), col + 1)
+        self.resources.append(resource_id)
+        self._resource_index[resource_id] = col
+        self._instances[col] = instances
+        self._available[col] = instances
+        self._allocated[col] = 0
+        self._changed_available.add(resource_id)
+        # A fresh, fully available column cannot break a safe sequence
+        if self._safety_cache and not self._safety_cache[0]:
+            self._safety_cache = None
+        self._mutated(ADD_RESOURCE, resource_id=resource_id)
+        return resource_id
+
+    def remove_process(self, process_id):
+        if process_id not in self._process_index:
+            return
+        row = self._process_index.pop(process_id)
+        last = len(self.processes) - 1
+        m = len(self.resources)
+        held = self._allocation[row, :m]
+        cols = np.flatnonzero(held)
+        self._adjust_allocated(cols, -held[cols])
+        if row != last:
+            moved = self.processes[last]
+            self.processes[row] = moved
+            self._process_index[moved] = row
+            for matrix in (self._allocation, self._max_need, self._request):
+                matrix[row] = matrix[last]
+        for matrix in (self._allocation, self._max_need, self._request):
+            matrix[last] = 0
+        self.processes.pop()
+        self._safety_cache = None
+        self._mutated(REMOVE_PROCESS, process_id=process_id)
+
+    def remove_resource(self, resource_id):
+        if resource_id not in self._resource_index:
+            return
+        col = self._resource_index.pop(resource_id)
+        last = len(self.resources) - 1
+        if col != last:
+            moved = self.resources[last]
+            self.resources[col] = moved
+            self._resource_index[moved] = col
+            for matrix in (self._allocation, self._max_need, self._request):
+                matrix[:, col] = matrix[:, last]
+            for counter in (self._instances, self._available, self._allocated):
+                counter[col] = counter[last]
+        for matrix in (self._allocation, self._max_need, self._request):
+            matrix[:, last] = 0
+        for counter in (self._instances, self._available, self._allocated):
+            counter[last] = 0
+        self.resources.pop()
+        self._changed_available.discard(resource_id)
+        self._safety_cache = None
+        self._mutated(REMOVE_RESOURCE, resource_id=resource_id)
+
+    # === Accessors ===
+    def row_of(self, process_id):
+        return self._process_index[process_id]
+
+    def column_of(self, resource_id):
+        return self._resource_index[resource_id]
+
+    def allocation_of(self, process_id):
+        return self._allocation[self._process_index[process_id], :len(self.resources)].tolist()
+
+    def max_need_of(self, process_id):
+        return self._max_need[self._process_index[process_id], :len(self.resources)].tolist()
+
+    def request_of(self, process_id):
+        return self._request[self._process_index[process_id], :len(self.resources)].tolist()
+
+    def instances_of(self, resource_id):
+        return int(self._instances[self._resource_index[resource_id]])
+
+    def available_of(self, resource_id):
+        return int(self._available[self._resource_index[resource_id]])
+
+    def _edges(self, matrix):
+        rows, cols = np.nonzero(matrix)
+        counts = matrix[rows, cols].tolist()
+        for row, col, count in zip(rows.tolist(), cols.tolist(), counts):
+            yield self.processes[row], self.resources[col], count
+
+    def allocation_edges(self):
+        """Yield (process_id, resource_id, count) for every nonzero allocation"""
+        return self._edges(self.allocation)
+
+    def request_edges(self):
+        """Yield (process_id, resource_id, count) for every outstanding request"""
+        return self._edges(self.request)
+
+    # === Configuration ===
+    def configure_process(self, process_id, allocation, max_need):
+        """Replace a process's allocation and max need rows after validating them"""
+        if process_id not in self._process_index:
+            raise KeyError(f"Process {process_id} not found.")
+        m = len(self.resources)
+        allocation = np.asarray(allocation, dtype=DTYPE).reshape(m)
+        max_need = np.asarray(max_need, dtype=DTYPE).reshape(m)
+        over_max = np.flatnonzero(allocation > max_need)
+        if over_max.size:
+            resource_id = self.resources[over_max[0]]
+            raise ValueError(f"Allocation cannot exceed max need for {process_id} on {resource_id}")
+        over_instances = np.flatnonzero(allocation > self.resource_instances)
+        if over_instances.size:
+            resource_id = self.resources[over_instances[0]]
+            raise ValueError(f"Allocation cannot exceed total instances for {process_id} on {resource_id}")
+
+        row = self._process_index[process_id]
+        delta = allocation - self._allocation[row, :m]
+        self._allocation[row, :m] = allocation
+        self._max_need[row, :m] = max_need
+        self._request[row, :m] = np.maximum(0, max_need - allocation)
+        cols = np.flatnonzero(delta)
+        self._adjust_allocated(cols, delta[cols])
+        self._safety_cache = None
+        self._mutated(CONFIGURE, process_id=process_id)
+
+    def set_instances(self, resource_id, instances):
+        """Change the instance count of a resource"""
+        col = self._resource_index[resource_id]
+        if instances < self._allocated[col]:
+            raise ValueError("New instances cannot be less than total allocated instances.")
+        self._available[col] += instances - self._instances[col]
+        self._instances[col] = instances
+        self._changed_available.add(resource_id)
+        self._safety_cache = None
+        self._mutated(SET_INSTANCES, resource_id=resource_id)
+
+    def recompute_available(self):
+        """
+        Rebuild the allocated and available counters from full column sums.
+        Only needed after bulk matrix rewrites; single mutations apply deltas.
+        """
+        m = len(self.resources)
+        self._allocated[:m] = self.allocation.sum(axis=0)
+        self._available[:m] = self._instances[:m] - self._allocated[:m]
+        self._changed_available.update(self.resources)
+
+    def randomize(self, family="uniform", seed=None, **params):
+        """
+        Replace allocation and max need with a generated scenario (see
+        scenarios.FAMILIES); seed may be an int or a name for reproducible states
+        """
+        allocation, max_need = scenarios.generate(family, self.resource_instances,
+                                                  len(self.processes), seed, **params)
+        shape = self.allocation.shape
+        self.allocation[:] = allocation.reshape(shape)
+        self.max_need[:] = max_need.reshape(shape)
+        self.request[:] = self.max_need - self.allocation
+        self._safety_cache = None
+        self.recompute_available()
+        self._mutated(BULK)
+
+    # === Requests and releases ===
+    def request_resource(self, process_id, resource_id, instances):
+        """
+        Grant a request if it fits in available. Returns True when granted,
+        False when denied; raises ValueError if it would exceed max need.
+        """
+        row, col = self._check_request(process_id, resource_id, instances)
+        if instances > self._available[col]:
+            return False
+
+        self._apply_grant(row, col, instances)
+        self._revalidate_after_grant(row, col)
+        self._mutated(GRANT, process_id, resource_id)
+        return True
+
+    def admit_request(self, process_id, resource_id, instances):
+        """
+        Banker's resource-request algorithm: tentatively grant the request,
+        keep it only if the resulting state is safe, otherwise roll it back.
+        Returns GRANTED, UNAVAILABLE or UNSAFE; raises ValueError if the
+        request would exceed max need.
+
+        When the cached safe sequence leaves enough slack in the requested
+        column, the grant is provably safe and no safety check runs at all.
+        """
+        row, col = self._check_request(process_id, resource_id, instances)
+        if instances > self._available[col]:
+            return UNAVAILABLE
+
+        previous_cache = self._safety_cache
+        if previous_cache and previous_cache[0] and instances <= self._grant_slack(row, col):
+            # Fast path: the cached sequence remains valid as is
+            self._apply_grant(row, col, instances)
+            self._mutated(GRANT, process_id, resource_id)
+            return GRANTED
+
+        self._apply_grant(row, col, instances)
+        self._safety_cache = None
+        is_safe, _ = self.check_safe_state("vectorized")
+        if not is_safe:
+            self._apply_grant(row, col, -instances)
+            self._safety_cache = previous_cache
+            return UNSAFE
+        self._mutated(GRANT, process_id, resource_id)
+        return GRANTED
+
+    def _check_request(self, process_id, resource_id, instances):
+        """Validate a request and return its (row, column)"""
+        row = self._process_index[process_id]
+        col = self._resource_index[resource_id]
+        max_need = int(self._max_need[row, col])
+        if instances < 0:
+            raise ValueError("Number of instances cannot be negative")
+        if self._allocation[row, col] + instances > max_need:
+            raise ValueError(f"Cannot exceed max need of {max_need} for {resource_id}")
+        return row, col
+
+    def _apply_grant(self, row, col, instances):
+        """Move instances of a resource from available to the process (negative undoes)"""
+        self._allocation[row, col] += instances
+        self._request[row, col] = max(0, self._max_need[row, col] - self._allocation[row, col])
+        self._adjust_allocated(col, instances)
+
+    def release_resources(self, process_id):
+        """Release everything a process holds; returns [(resource_id, count)]"""
+        row = self._process_index[process_id]
+        m = len(self.resources)
+        held = self._allocation[row, :m]
+        cols = np.flatnonzero(held)
+        released = [(self.resources[col], int(held[col])) for col in cols.tolist()]
+        self._adjust_allocated(cols, -held[cols])
+        self._request[row, cols] = self._max_need[row, cols]
+        self._allocation[row, cols] = 0
+        if released:
+            self._keep_safety_after_release()
+        self._mutated(RELEASE, process_id=process_id)
+        return released
+
+    def terminate_process(self, process_id):
+        """Release a process's resources and clear its claims (deadlock recovery)"""
+        row = self._process_index[process_id]
+        m = len(self.resources)
+        held = self._allocation[row, :m]
+        cols = np.flatnonzero(held)
+        self._adjust_allocated(cols, -held[cols])
+        self._allocation[row] = 0
+        self._max_need[row] = 0
+        self._request[row] = 0
+        self._keep_safety_after_release()
+        self._mutated(TERMINATE, process_id=process_id)
+
+    # === Incremental safety ===
+    def _grant_slack(self, row, col):
+        """
+        How many more units of column col the process in row could be granted
+        without invalidating the cached safe sequence. A grant only shrinks
+        the work vector at positions before that process (its own extra
+        allocation is returned right after it runs), and only in column col,
+        so the slack is the smallest work - need over that prefix.
+        """
+        _, sequence, position = self._safety_cache
+        prefix = sequence[:position[row]]
+        available = int(self._available[col])
+        if not prefix.size:
+            return available
+        held = self._allocation[prefix, col].astype(np.int64)
+        need = self._max_need[prefix, col] - held
+        work = available + np.cumsum(held) - held
+        return min(available, int((work - need).min()))
+
+    def _revalidate_after_grant(self, row, col):
+        """
+        Keep the cached safe sequence after the process in row was granted
+        units of column col if the prefix it affects still checks out,
+        otherwise drop the cache.
+        """
+        if not self._safety_cache or not self._safety_cache[0]:
+            self._safety_cache = None
+            return
+        if self._grant_slack(row, col) < 0:
+            self._safety_cache = None
+
+    def _keep_safety_after_release(self):
+        """
+        A release or termination only adds to the work vector at and before
+        the releasing process's position and never raises anyone's need above
+        what that position could already cover, so a safe sequence stays
+        safe. An unsafe verdict, however, may no longer hold.
+        """
+        if self._safety_cache and not self._safety_cache[0]:
+            self._safety_cache = None
+
+    # === Algorithms ===
+    def check_safe_state(self, method="incremental", progress=None):
+        """
+        Banker's Algorithm; returns (is_safe, safe_sequence). method is
+        "incremental" (default: reuse the cached verdict, maintained across
+        grants and releases, else run "vectorized"), "vectorized" (NumPy,
+        from scratch), "components" (re-check only the connected components
+        changed since the last call) or "loop" (reference implementation).
+        progress is passed on to the vectorized check.
+        """
+        if method == "incremental":
+            if self._safety_cache is not None:
+                is_safe, sequence, _ = self._safety_cache
+                return is_safe, [self.processes[row] for row in sequence.tolist()]
+            method = "vectorized"
+
+        if method == "components":
+            is_safe, sequence = self.component_tracker().check_safe_state()
+            order = [self.row_of(p) for p in sequence] if is_safe else None
+        elif method == "vectorized":
+            order = bankers_safe_sequence_vectorized(self.available, self.allocation,
+                                                     self.max_need - self.allocation, progress)
+        elif method == "loop":
+            need = self.max_need - self.allocation
+            order = bankers_safe_sequence(self.available.tolist(), self.allocation.tolist(), need.tolist())
+        else:
+            raise ValueError(f"Unknown safety check method: {method}")
+        if order is None:
+            self._safety_cache = (False, np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+            return False, []
+        sequence = np.asarray(order, dtype=np.intp)
+        position = np.empty(len(order), dtype=np.intp)
+        position[sequence] = np.arange(len(order))
+        self._safety_cache = (True, sequence, position)
+        return True, [self.processes[row] for row in order]
+
+    def component_tracker(self):
+        """The ComponentTracker following this engine, created on first use"""
+        if self._components is None:
+            from components import ComponentTracker
+            self._components = ComponentTracker(self)
+        return self._components
+
+    def is_single_instance(self):
+        return bool((self.resource_instances == 1).all())
+
+    def detect_deadlock(self, method="worklist", progress=None):
+        """
+        Deadlock detection; returns the list of deadlocked process ids. method
+        is "worklist" (counter-based, default), "loop" (repeated full passes),
+        "components" (worklist on the connected components changed since the
+        last call only) or "wait_for" (Tarjan SCC on the wait-for graph,
+        single-instance resources only). progress is passed on to the
+        worklist detector.
+        """
+        if method == "components":
+            return self.component_tracker().detect_deadlock()
+        if method == "wait_for":
+            if not self.is_single_instance():
+                raise ValueError("Wait-for graph detection needs single-instance resources")
+            deadlocked = waitfor.deadlocked_processes(self.available, self.allocation, self.request)
+        elif method == "worklist":
+            deadlocked = find_deadlocked_worklist(self.available, self.allocation, self.request, progress)
+        elif method == "loop":
+            deadlocked = find_deadlocked(self.available.tolist(), self.allocation.tolist(),
+                                         self.request.tolist())
+        else:
+            raise ValueError(f"Unknown detection method: {method}")
+        return [self.processes[row] for row in deadlocked]
+
+    def find_deadlock_cycles(self):
+        """
+        For single-instance resources, return one wait-for cycle per deadlocked
+        set as a list of (process_id, resource_id) steps: each process waits on
+        the resource, which the next process in the list holds.
+        """
+        if not self.is_single_instance():
+            raise ValueError("Wait-for graph detection needs single-instance resources")
+        cycles = waitfor.deadlock_cycles(self.available, self.allocation, self.request)
+        return [[(self.processes[row], self.resources[col]) for row, col in cycle] for cycle in cycles]
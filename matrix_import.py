@@ -0,0 +1,243 @@
+"""
+Streaming import of Allocation / Max / Available matrices from CSV.
+
+Usage:
+    python matrix_import.py ALLOCATION.csv MAX.csv AVAILABLE.csv [--instances]
+                            [--chunk-rows 4096] [--workspace out.lockspace]
+
+Allocation and Max are process x resource matrices. A first row with
+non-numeric cells is taken as resource ids and a first column with
+non-numeric cells as process ids. The third file is one row (or column) of
+available counts, or of total instances with --instances. Files are read
+in chunks of rows and each chunk is validated with array operations, so
+every violation of the constraints configure_all enforces is collected and
+reported together instead of stopping at the first one.
+"""
+import argparse
+import csv
+import re
+
+import numpy as np
+
+from engine import DeadlockEngine
+from streams import read_lines
+
+CHUNK_ROWS = 4096
+MAX_REPORTED = 50
+
+
+def _is_number(text):
+    try:
+        int(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _rows(path):
+    """
+    Yield (line number, line, cells) for every non-blank line. Lines with
+    quotes are split by the csv module, so quoted labels may contain commas.
+    """
+    for line_number, line in enumerate(read_lines(path), 1):
+        if line.strip():
+            yield line_number, line, next(csv.reader([line])) if '"' in line else line.split(",")
+
+
+def _parse_chunk(path, chunk, width, skip, violations):
+    """
+    Convert a chunk of (line number, line, cells) rows, skipping the first
+    skip cells (the label) of each. When every row has exactly width data
+    cells, np.loadtxt converts the chunk in one C-level pass; checking the
+    widths first keeps ragged rows from being truncated or re-flowed. Any
+    other chunk, or one loadtxt rejects, is re-read row by row to pinpoint
+    ragged rows and bad cells.
+    """
+    if width and all(len(cells) == skip + width for _, _, cells in chunk):
+        try:
+            return np.loadtxt([line for _, line, _ in chunk], dtype=np.int64, delimiter=",", quotechar='"',
+                              usecols=range(skip, skip + width), ndmin=2)
+        except ValueError:
+            pass
+
+    values = np.zeros((len(chunk), width), dtype=np.int64)
+    for k, (line_number, _, cells) in enumerate(chunk):
+        row = [cell.strip() for cell in cells[skip:]]
+        if len(row) != width:
+            violations.append(f"{path} line {line_number}: expected {width} values, got {len(row)}")
+        for col, cell in enumerate(row[:width]):
+            try:
+                values[k, col] = int(cell)
+            except (ValueError, OverflowError):
+                violations.append(f"{path} line {line_number}, column {col + 1}: {cell!r} is not an integer")
+    return values
+
+
+def read_matrix(path, chunk_rows=CHUNK_ROWS, violations=None):
+    """
+    Stream a CSV matrix in chunks of rows. Returns (matrix, row labels or
+    None, column labels or None). Unparseable cells and ragged rows are
+    appended to violations (when given) instead of raising one at a time.
+    """
+    violations = violations if violations is not None else []
+    rows = _rows(path)
+    first = next(rows, None)
+    if first is None:
+        return np.zeros((0, 0), dtype=np.int64), None, None
+
+    cells = [cell.strip() for cell in first[2]]
+    header = None
+    if not all(_is_number(cell) for cell in cells[1:]) or (len(cells) == 1 and not _is_number(cells[0])):
+        header = cells
+    else:
+        rows = _chain([first], rows)
+
+    labelled = None
+    labels = []
+    chunks = []
+    chunk = []
+    width = None
+    for row in rows:
+        cells = row[2]
+        if labelled is None:
+            labelled = not _is_number(cells[0].strip())
+            if header is not None and labelled:
+                header = header[1:]
+            width = len(header) if header is not None else len(cells) - labelled
+        if labelled:
+            labels.append(cells[0].strip())
+        chunk.append(row)
+        if len(chunk) >= chunk_rows:
+            chunks.append(_parse_chunk(path, chunk, width, int(labelled), violations))
+            chunk = []
+    if chunk:
+        chunks.append(_parse_chunk(path, chunk, width, int(labelled), violations))
+
+    if width is None:
+        width = len(header) if header is not None else 0
+    matrix = np.concatenate(chunks) if chunks else np.zeros((0, width), dtype=np.int64)
+    return matrix, (labels or None), header
+
+
+def _chain(first, rest):
+    yield from first
+    yield from rest
+
+
+def read_vector(path, violations=None):
+    """A single row or single column of integers (labels allowed, as for matrices)"""
+    matrix, row_labels, col_labels = read_matrix(path, violations=violations)
+    if matrix.shape[0] == 1:
+        return matrix[0], col_labels
+    if matrix.shape[1] == 1:
+        return matrix[:, 0], row_labels
+    raise ValueError(f"{path} must hold a single row or column, got {matrix.shape[0]}x{matrix.shape[1]}")
+
+
+def _report(violations, mask, describe, limit=MAX_REPORTED):
+    """Describe up to `limit` violating cells of a boolean mask; returns the count"""
+    found = np.argwhere(mask)
+    for index in found[:max(0, limit - len(violations))]:
+        violations.append(describe(*index.tolist()))
+    return len(found)
+
+
+def validate(allocation, max_need, instances, processes, resources):
+    """
+    Vectorized checks of configure_all's constraints over whole matrices.
+    Returns a list of violation messages (capped at MAX_REPORTED entries,
+    followed by a count of the rest).
+    """
+    violations = []
+    total = 0
+    label = lambda row, col: f"{processes[row]} on {resources[col]}"
+    total += _report(violations, allocation < 0,
+                     lambda r, c: f"{label(r, c)}: negative allocation {allocation[r, c]}")
+    total += _report(violations, max_need < 0,
+                     lambda r, c: f"{label(r, c)}: negative max need {max_need[r, c]}")
+    total += _report(violations, allocation > max_need,
+                     lambda r, c: f"{label(r, c)}: allocation {allocation[r, c]} exceeds max need {max_need[r, c]}")
+    total += _report(violations, allocation > instances,
+                     lambda r, c: f"{label(r, c)}: allocation {allocation[r, c]} exceeds {instances[c]} instances")
+    total += _report(violations, max_need > instances,
+                     lambda r, c: f"{label(r, c)}: max need {max_need[r, c]} exceeds {instances[c]} instances")
+    column_sums = allocation.sum(axis=0)
+    total += _report(violations, (column_sums > instances)[None, :],
+                     lambda _, c: f"{resources[c]}: {column_sums[c]} allocated but only {instances[c]} instances")
+    total += _report(violations, (instances < 0)[None, :],
+                     lambda _, c: f"{resources[c]}: negative instance count {instances[c]}")
+    if total > len(violations):
+        violations.append(f"... and {total - len(violations)} more violations")
+    return violations
+
+
+def _next_id(ids, prefix):
+    """First counter value past every "<prefix><number>" id, so new ids never collide"""
+    numbers = [int(match.group(1)) for match in map(re.compile(rf"{prefix}(\d+)$").match, ids) if match]
+    return max(numbers, default=-1) + 1
+
+
+def import_matrices(allocation_path, max_path, vector_path, vector_is_instances=False,
+                    chunk_rows=CHUNK_ROWS):
+    """
+    Read and validate the three CSV files. Returns (engine, violations): the
+    engine is None whenever there is at least one violation, and violations
+    lists every problem found.
+    """
+    violations = []
+    allocation, alloc_processes, alloc_resources = read_matrix(allocation_path, chunk_rows, violations)
+    max_need, max_processes, max_resources = read_matrix(max_path, chunk_rows, violations)
+    vector, vector_resources = read_vector(vector_path, violations)
+
+    n, m = allocation.shape
+    if max_need.shape != (n, m):
+        violations.append(f"Max is {max_need.shape[0]}x{max_need.shape[1]} but Allocation is {n}x{m}")
+    if vector.shape != (m,):
+        violations.append(f"{vector_path} has {vector.size} values but Allocation has {m} resources")
+    if violations:
+        return None, violations
+
+    processes = alloc_processes or max_processes or [f"P{k}" for k in range(n)]
+    resources = alloc_resources or max_resources or vector_resources or [f"R{k}" for k in range(m)]
+    for name, ids, expected in (("process", processes, n), ("resource", resources, m)):
+        if len(set(ids)) != expected:
+            violations.append(f"Duplicate {name} ids")
+    instances = vector if vector_is_instances else vector + allocation.sum(axis=0)
+    violations.extend(validate(allocation, max_need, instances, processes, resources))
+    if violations:
+        return None, violations
+
+    engine = DeadlockEngine.from_arrays(processes, resources, instances, allocation, max_need,
+                                        np.maximum(0, max_need - allocation),
+                                        next_process=max(n, _next_id(processes, "P")),
+                                        next_resource=max(m, _next_id(resources, "R")))
+    return engine, []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("allocation")
+    parser.add_argument("max")
+    parser.add_argument("available")
+    parser.add_argument("--instances", action="store_true",
+                        help="the third file holds total instances instead of available counts")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workspace", help="save the imported state as a workspace")
+    args = parser.parse_args()
+
+    engine, violations = import_matrices(args.allocation, args.max, args.available,
+                                         args.instances, args.chunk_rows)
+    if violations:
+        print(f"{len(violations)} problem(s):")
+        for violation in violations:
+            print(f"  {violation}")
+        raise SystemExit(1)
+    print(f"OK: {len(engine.processes)} processes, {len(engine.resources)} resources")
+    if args.workspace:
+        from workspace import save_workspace
+        save_workspace(args.workspace, engine)
+        print(f"Saved workspace to {args.workspace}")
+
+
+if __name__ == "__main__":
+    main()
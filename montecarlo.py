@@ -0,0 +1,142 @@
+"""
+Monte Carlo estimate of how often random states are unsafe or deadlocked.
+
+Usage:
+    python montecarlo.py [--states 1000000] [--processes 5] [--resources 3]
+                         [--instances 1 10] [--load 0.7] [--claim 0.5] [--demand 0.5]
+                         [--skew 0.0] [--batch 20000] [--workers N] [--seed 0]
+
+States are generated in batches as (batch, processes, resources) arrays by
+scenarios.random_batch, and each batch is evaluated at once with the
+engine's batched Banker's safety check and deadlock detection, one
+vectorized round per step. Requests are drawn from the remaining need with
+probability --demand; at 1.0 request equals need and the two estimates
+coincide. Batches are spread over a process pool; every batch gets its own
+child seed, so results do not depend on the number of workers.
+"""
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import scenarios
+from engine import bankers_safe_batch, find_deadlocked_batch
+
+Z_95 = 1.959963984540054
+
+
+def random_states(rng, batch, processes, resources, instances=(1, 10), load=0.7,
+                  claim=0.5, demand=0.5, skew=0.0):
+    """
+    Generate a batch of consistent states with scenarios.random_batch.
+    Returns (available, allocation, max_need, request) with shapes
+    (batch, m), (batch, n, m), (batch, n, m), (batch, n, m).
+
+    - instances: inclusive (low, high) range of instances per resource
+    - load: probability that each instance is held rather than free; holders
+      are drawn with weights proportional to 1 / (rank + 1) ** skew
+    - claim: probability that a process claims part of what it does not hold
+    - demand: probability that each unit of remaining need is currently
+      requested. At 1.0 request equals need, so the unsafe and deadlocked
+      fractions coincide; they only differ for demand < 1.
+    """
+    available, allocation, max_need = scenarios.random_batch(rng, batch, processes, resources,
+                                                             instances, load, claim, skew)
+    return available, allocation, max_need, scenarios.sample_request(rng, max_need - allocation, demand)
+
+
+def evaluate_states(available, allocation, max_need, request):
+    """Return (unsafe, deadlocked) boolean arrays, one entry per state"""
+    unsafe = ~bankers_safe_batch(available, allocation, max_need - allocation)
+    deadlocked = find_deadlocked_batch(available, allocation, request).any(axis=1)
+    return unsafe, deadlocked
+
+
+def evaluate_batch(job):
+    """
+    Generate and evaluate one batch; top-level so it can run in a process
+    pool. Returns (states, unsafe count, deadlocked count).
+    """
+    seed, size, processes, resources, params = job
+    rng = np.random.default_rng(seed)
+    unsafe, deadlocked = evaluate_states(*random_states(rng, size, processes, resources, **params))
+    return size, int(unsafe.sum()), int(deadlocked.sum())
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    """Wilson score confidence interval for a binomial proportion"""
+    if not trials:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def estimate(states, processes, resources, batch=20000, workers=None, seed=None, **params):
+    """
+    Estimate the fraction of unsafe and deadlocked states. Returns a dict
+    with the counts, fractions and 95% Wilson intervals. workers=None uses
+    every core; workers=1 runs in this process.
+    """
+    sizes = [batch] * (states // batch)
+    if states % batch:
+        sizes.append(states % batch)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(s, size, processes, resources, params) for s, size in zip(seeds, sizes)]
+
+    if workers == 1 or len(jobs) == 1:
+        results = map(evaluate_batch, jobs)
+        return _summarize(results)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _summarize(executor.map(evaluate_batch, jobs))
+
+
+def _summarize(results):
+    total = unsafe = deadlocked = 0
+    for size, batch_unsafe, batch_deadlocked in results:
+        total += size
+        unsafe += batch_unsafe
+        deadlocked += batch_deadlocked
+    return {
+        "states": total,
+        "unsafe": unsafe,
+        "deadlocked": deadlocked,
+        "unsafe_fraction": unsafe / total if total else 0.0,
+        "unsafe_interval": wilson_interval(unsafe, total),
+        "deadlocked_fraction": deadlocked / total if total else 0.0,
+        "deadlocked_interval": wilson_interval(deadlocked, total),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--states", type=int, default=1000000)
+    parser.add_argument("--processes", type=int, default=5)
+    parser.add_argument("--resources", type=int, default=3)
+    parser.add_argument("--instances", type=int, nargs=2, default=[1, 10], metavar=("LOW", "HIGH"))
+    parser.add_argument("--load", type=float, default=0.7)
+    parser.add_argument("--claim", type=float, default=0.5)
+    parser.add_argument("--demand", type=float, default=0.5,
+                        help="chance each unit of need is requested; at 1.0 unsafe == deadlocked")
+    parser.add_argument("--skew", type=float, default=0.0)
+    parser.add_argument("--batch", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = estimate(args.states, args.processes, args.resources, args.batch, args.workers,
+                      args.seed, instances=tuple(args.instances), load=args.load,
+                      claim=args.claim, demand=args.demand, skew=args.skew)
+    print(f"states: {result['states']}")
+    for name in ("unsafe", "deadlocked"):
+        low, high = result[f"{name}_interval"]
+        print(f"{name:>10}: {result[f'{name}_fraction']:.5f}  95% CI [{low:.5f}, {high:.5f}]"
+              f"  ({result[name]} states)")
+
+
+if __name__ == "__main__":
+    main()
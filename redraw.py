@@ -0,0 +1,57 @@
+"""
+Frame-coalesced redraws for the Tk GUI.
+
+Mutations mark what they invalidated in named dirty sets instead of drawing.
+The first mark schedules one render pass: with after_idle once the event
+queue drains, or with after() when the previous pass was less than a frame
+ago. That pass hands each renderer the items collected for it, so a burst of
+thousands of operations between two frames costs a single redraw.
+"""
+import time
+
+FRAME_MS = 16
+
+
+class RedrawScheduler:
+    """Named dirty sets plus at most one pending render pass on a Tk widget"""
+
+    def __init__(self, widget, frame_ms=FRAME_MS):
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.renderers = {}      # name -> callback(items), run in registration order
+        self.dirty = {}          # name -> items marked since the last pass
+        self.flagged = set()     # names marked since the last pass
+        self.frames = 0
+        self._pending = None
+        self._last_frame = float("-inf")
+
+    def add(self, name, render):
+        """Register render(items) to run in any pass after name is marked"""
+        self.renderers[name] = render
+        self.dirty[name] = set()
+
+    def mark(self, name, item=None):
+        """Mark a renderer dirty, optionally recording which item changed"""
+        self.flagged.add(name)
+        if item is not None:
+            self.dirty[name].add(item)
+        if self._pending is None:
+            wait = self.frame_ms - (time.perf_counter() - self._last_frame) * 1000
+            if wait > 0:
+                self._pending = self.widget.after(int(wait) + 1, self.render)
+            else:
+                self._pending = self.widget.after_idle(self.render)
+
+    def render(self):
+        """Run the renderers marked since the last pass (also safe to call directly)"""
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+        self._last_frame = time.perf_counter()
+        flagged, self.flagged = self.flagged, set()
+        if flagged:
+            self.frames += 1
+        for name, render in self.renderers.items():
+            if name in flagged:
+                items, self.dirty[name] = self.dirty[name], set()
+                render(items)
@@ -0,0 +1,443 @@
+"""
+Streaming replay of lock-acquisition traces with online deadlock detection.
+
+Usage:
+    python replay.py TRACE [--format jsonl|csv] [--every 1] [--instances 1]
+                           [--chunk-size 1048576] [--output incidents.jsonl]
+
+A trace is JSONL or CSV (optionally gzip-compressed) with one event per
+line/row and the fields time, event, process, resource and count. Events
+are request (start waiting), acquire, release (count omitted = everything
+held on that resource), exit, and resource (declare a resource with count
+instances; undeclared resources get --instances). Files are read in fixed
+size chunks and events flow through generators, and the replay state only
+keeps processes and resources that currently hold or wait on something, so
+memory stays bounded however long the trace is. Deadlock incidents are
+written as JSON lines.
+
+While every resource has a single instance, an incremental wait-for graph
+tracks the trace, so detection is skipped outright as long as the graph
+is acyclic; otherwise a worklist reduction finds the deadlocked processes.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import deque
+
+from streams import CHUNK_SIZE, read_lines
+from waitfor import IncrementalWaitForGraph
+
+REQUEST = "request"
+ACQUIRE = "acquire"
+RELEASE = "release"
+EXIT = "exit"
+DECLARE = "resource"
+
+FIELD_ALIASES = {
+    "timestamp": "time", "ts": "time",
+    "op": "event", "action": "event", "type": "event",
+    "pid": "process", "thread": "process",
+    "lock": "resource", "rid": "resource",
+    "units": "count", "instances": "count",
+}
+EVENT_ALIASES = {
+    "wait": REQUEST,
+    "grant": ACQUIRE, "acquired": ACQUIRE, "lock": ACQUIRE,
+    "unlock": RELEASE, "released": RELEASE,
+    "terminate": EXIT, "abort": EXIT,
+    "declare": DECLARE,
+}
+
+
+# === Parsing ===
+def _field(name):
+    name = name.strip().lower()
+    return FIELD_ALIASES.get(name, name)
+
+
+def _normalize(record):
+    """Map aliased field and event names onto the canonical ones and coerce types"""
+    event = {_field(key): value for key, value in record.items()}
+    kind = str(event.get("event", "")).strip().lower()
+    event["event"] = EVENT_ALIASES.get(kind, kind)
+    count = event.get("count")
+    event["count"] = int(count) if count not in (None, "") else None
+    time = event.get("time")
+    if isinstance(time, str):
+        try:
+            event["time"] = float(time)
+        except ValueError:
+            pass
+    return event
+
+
+def read_events(path, fmt=None, chunk_size=CHUNK_SIZE):
+    """Yield normalized events from a JSONL or CSV trace without loading it whole"""
+    if fmt is None:
+        name = path[:-3] if path.endswith(".gz") else path
+        fmt = "csv" if name.endswith(".csv") else "jsonl"
+    lines = read_lines(path, chunk_size)
+    if fmt == "csv":
+        rows = csv.DictReader(lines)
+        for row in rows:
+            yield _normalize(row)
+    elif fmt == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield _normalize(json.loads(line))
+    else:
+        raise ValueError(f"Unknown trace format: {fmt}")
+
+
+# === Replay state ===
+class LockGraph:
+    """
+    Wait-for edges of a replay whose resources all have one instance, kept
+    in an IncrementalWaitForGraph. An edge that would close a cycle is held
+    back and retried whenever an edge goes away, so a deadlock exists
+    exactly while some edge is held back or some process waits for more
+    than the one instance.
+    """
+
+    def __init__(self, held=(), waiting=()):
+        self.graph = IncrementalWaitForGraph()
+        self.holders = {}           # resource -> processes holding it
+        self.waiters = {}           # resource -> processes waiting on it
+        self.deferred = {}          # (waiter, holder) -> multiplicity of held-back edges
+        self.oversized = set()      # (process, resource) waits for more than one unit
+        self.closed = False         # an edge was held back since the last take_closed()
+        for process in held:
+            for resource in held[process]:
+                self.hold(process, resource)
+        for process in waiting:
+            for resource, amount in waiting[process].items():
+                self.wait(process, resource, amount)
+
+    @property
+    def deadlocked(self):
+        return bool(self.deferred or self.oversized)
+
+    def take_closed(self):
+        """Whether a cycle closed since the last call"""
+        closed, self.closed = self.closed, False
+        return closed
+
+    def _add(self, waiter, holder):
+        key = (waiter, holder)
+        if key in self.deferred:
+            self.deferred[key] += 1
+        elif self.graph.add_edge(waiter, holder) is not None:
+            self.deferred[key] = 1
+            self.closed = True
+
+    def _remove(self, waiter, holder):
+        key = (waiter, holder)
+        count = self.deferred.get(key)
+        if count is None:
+            self.graph.remove_edge(waiter, holder)
+        elif count > 1:
+            self.deferred[key] = count - 1
+        else:
+            del self.deferred[key]
+        # Adding edges never breaks a cycle, so one pass over the held-back edges suffices
+        for key, count in list(self.deferred.items()):
+            if self.graph.add_edge(*key) is None:
+                del self.deferred[key]
+                for _ in range(count - 1):
+                    self.graph.add_edge(*key)
+        self.graph.prune(waiter)
+        self.graph.prune(holder)
+
+    def wait(self, process, resource, amount=1):
+        """Record that process now waits for amount units of resource"""
+        if amount > 1:
+            self.oversized.add((process, resource))
+        else:
+            self.oversized.discard((process, resource))
+        waiters = self.waiters.setdefault(resource, set())
+        if process in waiters:
+            return
+        waiters.add(process)
+        for holder in self.holders.get(resource, ()):
+            self._add(process, holder)
+
+    def stop_waiting(self, process, resource):
+        self.oversized.discard((process, resource))
+        waiters = self.waiters[resource]
+        waiters.discard(process)
+        if not waiters:
+            del self.waiters[resource]
+        for holder in list(self.holders.get(resource, ())):
+            self._remove(process, holder)
+
+    def hold(self, process, resource):
+        holders = self.holders.setdefault(resource, set())
+        if process in holders:
+            return
+        holders.add(process)
+        for waiter in self.waiters.get(resource, ()):
+            self._add(waiter, process)
+
+    def unhold(self, process, resource):
+        holders = self.holders.get(resource)
+        if not holders or process not in holders:
+            return
+        holders.discard(process)
+        if not holders:
+            del self.holders[resource]
+        for waiter in list(self.waiters.get(resource, ())):
+            self._remove(waiter, process)
+
+
+class ReplayState:
+    """
+    Live allocation state keyed by the trace's own process and resource
+    names. Entries are dropped as soon as they go idle, so the state is
+    bounded by what is concurrently held or waited on.
+    """
+
+    def __init__(self, default_instances=1):
+        self.default_instances = default_instances
+        self.instances = {}         # declared resource -> instances
+        self.held = {}              # process -> {resource: count}
+        self.waiting = {}           # blocked process -> {resource: count}
+        self.blocked_held = {}      # resource -> units held by blocked processes
+        self.graph = LockGraph() if default_instances == 1 else None
+
+    def instances_of(self, resource):
+        return self.instances.get(resource, self.default_instances)
+
+    def _set_blocked(self, process, sign):
+        blocked_held = self.blocked_held
+        for resource, count in self.held.get(process, {}).items():
+            total = blocked_held.get(resource, 0) + sign * count
+            if total:
+                blocked_held[resource] = total
+            else:
+                blocked_held.pop(resource, None)
+
+    def _drop_if_idle(self, process):
+        if not self.held.get(process):
+            self.held.pop(process, None)
+
+    def apply(self, event):
+        """
+        Apply one normalized event. Returns True when it may have closed or
+        grown a deadlock: running processes will release what they hold, so
+        that needs a blocking request to exceed what the blocked processes
+        leave over, or a blocked process to take more units (a partial
+        grant). With the wait-for graph, it needs a cycle to close, or a
+        request like that while a deadlock already exists.
+        """
+        kind = event["event"]
+        process = event.get("process")
+        resource = event.get("resource")
+        count = event["count"]
+
+        if kind == REQUEST:
+            count = count or 1
+            waits = self.waiting.get(process)
+            if waits is None:
+                self._set_blocked(process, 1)
+                waits = self.waiting[process] = {}
+            waits[resource] = waits.get(resource, 0) + count
+            if self.graph is not None:
+                self.graph.wait(process, resource, waits[resource])
+            suspicious = waits[resource] > self.instances_of(resource) - self.blocked_held.get(resource, 0)
+            if self.graph is None:
+                return suspicious
+            return self.graph.take_closed() or (suspicious and self.graph.deadlocked)
+
+        if kind == ACQUIRE:
+            count = count or 1
+            waits = self.waiting.get(process)
+            if waits is not None and resource in waits:
+                left = waits[resource] - count
+                if left > 0:
+                    waits[resource] = left
+                    if self.graph is not None:
+                        self.graph.wait(process, resource, left)
+                else:
+                    del waits[resource]
+                    if self.graph is not None:
+                        self.graph.stop_waiting(process, resource)
+                    if not waits:
+                        self._set_blocked(process, -1)
+                        del self.waiting[process]
+            if self.graph is not None:
+                self.graph.hold(process, resource)
+            held = self.held.setdefault(process, {})
+            held[resource] = held.get(resource, 0) + count
+            if process in self.waiting:
+                self.blocked_held[resource] = self.blocked_held.get(resource, 0) + count
+                if self.graph is None:
+                    # Units taken by a blocked process stay out of reach of the other waiters
+                    return True
+
+        elif kind == RELEASE:
+            held = self.held.get(process, {})
+            current = held.get(resource, 0)
+            count = current if count is None else min(count, current)
+            if count:
+                if count == current:
+                    del held[resource]
+                    if self.graph is not None:
+                        self.graph.unhold(process, resource)
+                else:
+                    held[resource] = current - count
+                if process in self.waiting:
+                    total = self.blocked_held[resource] - count
+                    if total:
+                        self.blocked_held[resource] = total
+                    else:
+                        del self.blocked_held[resource]
+            self._drop_if_idle(process)
+
+        elif kind == EXIT:
+            if self.graph is not None:
+                for resource in self.waiting.get(process, ()):
+                    self.graph.stop_waiting(process, resource)
+                for resource in self.held.get(process, ()):
+                    self.graph.unhold(process, resource)
+            if process in self.waiting:
+                self._set_blocked(process, -1)
+                del self.waiting[process]
+            self.held.pop(process, None)
+
+        elif kind == DECLARE:
+            instances = count if count is not None else self.default_instances
+            if instances == self.default_instances:
+                self.instances.pop(resource, None)
+            else:
+                self.instances[resource] = instances
+            single_instance = self.default_instances == 1 and not self.instances
+            if single_instance != (self.graph is not None):
+                self.graph = LockGraph(self.held, self.waiting) if single_instance else None
+
+        else:
+            raise ValueError(f"Unknown trace event: {kind!r}")
+        return self.graph is not None and self.graph.take_closed()
+
+    def deadlocked(self):
+        """
+        Blocked processes that can never proceed. An acyclic wait-for graph
+        rules a deadlock out at once; otherwise a worklist reduction starts
+        from instances minus what blocked processes hold. Each blocked process
+        counts the resources it waits on beyond that and queues on them,
+        sorted by amount, and a finishing process only advances the queues of
+        what it holds, as in SparseEngine._reduce.
+        """
+        if self.graph is not None and not self.graph.deadlocked:
+            return []
+        work = {}
+
+        def free(resource):
+            if resource not in work:
+                work[resource] = self.instances_of(resource) - self.blocked_held.get(resource, 0)
+            return work[resource]
+
+        short = {}
+        waiters = {}
+        ready = deque()
+        for process, waits in self.waiting.items():
+            count = 0
+            for resource, amount in waits.items():
+                if amount > free(resource):
+                    count += 1
+                    waiters.setdefault(resource, []).append((amount, process))
+            short[process] = count
+            if not count:
+                ready.append(process)
+
+        for queue in waiters.values():
+            queue.sort(key=lambda entry: entry[0])
+        heads = dict.fromkeys(waiters, 0)
+        while ready:
+            process = ready.popleft()
+            for resource, count in self.held.get(process, {}).items():
+                work[resource] = free(resource) + count
+                queue = waiters.get(resource)
+                if not queue:
+                    continue
+                h = heads[resource]
+                while h < len(queue) and queue[h][0] <= work[resource]:
+                    waiter = queue[h][1]
+                    short[waiter] -= 1
+                    if not short[waiter]:
+                        ready.append(waiter)
+                    h += 1
+                heads[resource] = h
+        return [process for process in self.waiting if short[process]]
+
+
+def replay(events, every=1, default_instances=1, state=None):
+    """
+    Apply events and yield deadlock incidents as dicts with the event's time,
+    its index in the trace, the deadlocked processes and the resources they
+    wait on. With every=1 a deadlock is reported on the event that closes it;
+    with every=N detection runs once per N events (and at the end of the
+    trace), only if some request blocked since the last check. A deadlock is
+    reported once, and again only if new processes join it.
+    """
+    state = state if state is not None else ReplayState(default_instances)
+    reported = set()
+
+    def check(index, event):
+        stuck = state.deadlocked()
+        reported.intersection_update(stuck)
+        if stuck and not reported.issuperset(stuck):
+            reported.update(stuck)
+            resources = sorted({r for p in stuck for r in state.waiting[p]}, key=str)
+            return {"time": event.get("time"), "event_index": index,
+                    "processes": stuck, "resources": resources}
+        return None
+
+    pending_check = False
+    index = event = None
+    for index, event in enumerate(events):
+        suspicious = state.apply(event)
+        if every == 1:
+            if not suspicious:
+                continue
+        else:
+            pending_check = pending_check or suspicious or event["event"] == REQUEST
+            if not pending_check or (index + 1) % every:
+                continue
+            pending_check = False
+        incident = check(index, event)
+        if incident:
+            yield incident
+
+    # The trace may end between two periodic checks
+    if pending_check:
+        incident = check(index, event)
+        if incident:
+            yield incident
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trace")
+    parser.add_argument("--format", choices=("jsonl", "csv"))
+    parser.add_argument("--every", type=int, default=1, help="run detection every N events")
+    parser.add_argument("--instances", type=int, default=1, help="instances of undeclared resources")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--output", help="write incidents here instead of stdout")
+    args = parser.parse_args()
+
+    events = read_events(args.trace, args.format, args.chunk_size)
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        incidents = 0
+        for incident in replay(events, args.every, args.instances):
+            out.write(json.dumps(incident) + "\n")
+            incidents += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{incidents} deadlock incident(s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Vectorized, seedable generation of allocation/max-need states.
+
+Every family builds whole (processes x resources) matrices with NumPy and
+respects the instance counts: no column of the allocation ever exceeds its
+resource's instances, and max need never exceeds them either. Seeds can be
+integers or names ("demo-1"), so a scenario can be reproduced from the GUI,
+the CLI `random` command or a script alike.
+
+Families:
+- uniform: each instance is held by a random process with probability load
+- hot: a few hot resources are nearly fully held and widely claimed
+- chain: circular-wait chains of `length` processes, each holding a whole
+  resource (one with instances) and needing the next one in its chain
+- saturated: almost every instance is held, leaving `slack` free
+- safe: a uniform allocation with claims built along a random order so that
+  order is always a safe sequence
+- deadlocked: a uniform state with one circular-wait chain embedded
+"""
+import hashlib
+
+import numpy as np
+
+DTYPE = np.int32
+FAMILIES = ("uniform", "hot", "chain", "saturated", "safe", "deadlocked")
+
+
+def make_rng(seed=None):
+    """NumPy generator from None, an int or a name (hashed to a stable 64-bit seed)"""
+    if isinstance(seed, str):
+        seed = int.from_bytes(hashlib.sha256(seed.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed)
+
+
+def _allocate(rng, instances, processes, load):
+    """
+    Hand each instance to a uniformly chosen process with probability load
+    (a scalar or one value per resource). Works per instance, so the cost is
+    the number of instances rather than processes x resources.
+    """
+    m = len(instances)
+    columns = np.repeat(np.arange(m), instances)
+    load = np.broadcast_to(np.asarray(load, dtype=float), (m,))
+    held = rng.random(columns.size) < load[columns]
+    columns = columns[held]
+    holders = rng.integers(0, processes, size=columns.size)
+    cells = np.bincount(holders * m + columns, minlength=processes * m)
+    return cells.astype(DTYPE).reshape(processes, m)
+
+
+def _extra(rng, limit, claim):
+    """
+    With probability claim (scalar or per resource) draw an amount uniform in
+    1..limit, otherwise 0. A single uniform per cell decides both, which is
+    an order of magnitude faster than Generator.binomial on large grids.
+    """
+    u = rng.random(limit.shape, dtype=np.float32)
+    claim = np.asarray(claim, dtype=np.float32)
+    scaled = limit.astype(np.float32)
+    scaled *= u
+    # claim 0 (no extra claims) leaves the cell undivided; it is masked to 0 below
+    np.divide(scaled, claim, out=scaled, where=claim > 0)
+    amount = scaled.astype(DTYPE)
+    amount += 1
+    np.minimum(amount, limit, out=amount)
+    amount *= u < claim
+    return amount
+
+
+def _claims(rng, instances, allocation, claim):
+    """Max need: allocation plus, with probability claim, part of what the process does not hold"""
+    return allocation + _extra(rng, instances - allocation, claim)
+
+
+def _chains(instances, allocation, max_need, members, held, length):
+    """
+    Write circular-wait chains in place: members[i] holds all of held[i] and
+    needs all of the next resource in its chain of `length`. Nobody else
+    holds or claims those resources, and chain members claim nothing else.
+    """
+    following = np.roll(held.reshape(-1, length), -1, axis=1).ravel()
+    for matrix in (allocation, max_need):
+        matrix[members, :] = 0
+        matrix[:, held] = 0
+    allocation[members, held] = instances[held]
+    max_need[members, held] = instances[held]
+    max_need[members, following] = instances[following]
+
+
+def random_batch(rng, batch, processes, resources, instances=(1, 10), load=0.7, claim=0.5, skew=0.0):
+    """
+    A batch of independent states as (available, allocation, max_need) with
+    shapes (batch, m), (batch, n, m) and (batch, n, m): the uniform family,
+    with instance counts drawn per state and resource from the inclusive
+    (low, high) range and holders weighted by 1 / (rank + 1) ** skew.
+    """
+    low, high = instances
+    totals = rng.integers(low, high + 1, size=(batch, resources))
+    weights = 1.0 / np.arange(1, processes + 1) ** skew
+    pvals = np.append(load * weights / weights.sum(), 1.0 - load)
+    # Every instance goes to one process or stays free, so column sums never
+    # exceed the instance count
+    split = rng.multinomial(totals, pvals).astype(DTYPE)
+    allocation = split[..., :processes].transpose(0, 2, 1)
+    available = split[..., processes]
+    return available, allocation, _claims(rng, totals[:, None, :], allocation, claim)
+
+
+def sample_request(rng, need, demand):
+    """
+    Current requests drawn from the remaining need: each unit is requested
+    with probability demand. At 1.0 request equals need, as in the engine,
+    which makes every deadlocked state unsafe and every unsafe one deadlocked.
+    """
+    if demand >= 1.0:
+        return need.copy()
+    return rng.binomial(need, demand).astype(DTYPE)
+
+
+def generate(family, instances, processes, seed=None, load=0.5, claim=0.3, hot_fraction=0.1,
+             length=2, slack=0.05):
+    """
+    Generate (allocation, max_need) int32 matrices of shape
+    (processes, len(instances)) for the named family.
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown scenario family: {family}")
+    rng = make_rng(seed)
+    instances = np.asarray(instances, dtype=DTYPE)
+    m = len(instances)
+    if not processes or not m:
+        empty = np.zeros((processes, m), dtype=DTYPE)
+        return empty, empty.copy()
+
+    if family == "uniform":
+        allocation = _allocate(rng, instances, processes, load)
+        return allocation, _claims(rng, instances, allocation, claim)
+
+    if family == "hot":
+        hot = rng.random(m) < hot_fraction
+        allocation = _allocate(rng, instances, processes, np.where(hot, 0.95, load / 2))
+        return allocation, _claims(rng, instances, allocation, np.where(hot, 0.9, claim / 3))
+
+    if family == "saturated":
+        allocation = _allocate(rng, instances, processes, 1.0 - slack)
+        return allocation, _claims(rng, instances, allocation, claim)
+
+    if family == "safe":
+        allocation = _allocate(rng, instances, processes, load)
+        # Work available to each process if they finish in a random order:
+        # what is free plus everything returned by the processes before it
+        order = rng.permutation(processes)
+        ordered = allocation[order]
+        work = np.cumsum(ordered, axis=0, dtype=DTYPE)
+        work -= ordered
+        work += instances - allocation.sum(axis=0)
+        need = np.empty_like(allocation)
+        need[order] = _extra(rng, work, claim)
+        return allocation, allocation + need
+
+    # Chains are only built over resources that have instances to hold
+    usable = np.flatnonzero(instances > 0)
+    if min(processes, len(usable)) < length:
+        raise ValueError(f"A {family} scenario needs at least {length} processes "
+                         f"and {length} resources with instances")
+    if family == "chain":
+        count = min(processes, len(usable)) // length * length
+        allocation = np.zeros((processes, m), dtype=DTYPE)
+        max_need = np.zeros((processes, m), dtype=DTYPE)
+        _chains(instances, allocation, max_need, np.arange(count), usable[:count], length)
+        return allocation, max_need
+
+    # deadlocked: one chain on random processes and resources, uniform elsewhere
+    allocation = _allocate(rng, instances, processes, load)
+    max_need = _claims(rng, instances, allocation, claim)
+    members = rng.choice(processes, length, replace=False)
+    held = rng.choice(usable, length, replace=False)
+    _chains(instances, allocation, max_need, members, held, length)
+    return allocation, max_need
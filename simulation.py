@@ -0,0 +1,504 @@
+"""
+Discrete-event simulation of processes competing for resources over time.
+
+Usage:
+    python simulation.py [--processes 200] [--resources 50] [--instances 2]
+                         [--model random|phased|ordered] [--policy detect|periodic|avoid|none]
+                         [--events 1000000] [--seed 0]
+
+Each process repeatedly runs jobs drawn from a behavior model. A job
+acquires its resources one step at a time with think time between steps,
+holds them, releases everything and idles before the next job. Timestamped
+events live in a heap, and a policy deals with deadlock online: detection
+with recovery (abort a victim) on every block or periodically, or Banker's
+avoidance.
+"""
+import argparse
+import heapq
+from collections import deque
+import itertools
+import random
+import time
+
+START, ACQUIRE, RELEASE, DETECT = range(4)
+POLICIES = ("detect", "periodic", "avoid", "none")
+
+
+# === Behavior models ===
+class RandomModel:
+    """Each job acquires a few distinct random resources in random order"""
+
+    def __init__(self, instances, max_steps=3, max_units=1):
+        self.instances = instances
+        self.max_steps = max_steps
+        self.max_units = max_units
+
+    def job(self, process, rng):
+        instances = self.instances
+        k = rng.randint(1, min(self.max_steps, len(instances)))
+        return [(r, rng.randint(1, min(self.max_units, instances[r])))
+                for r in rng.sample(range(len(instances)), k)]
+
+
+class PhasedModel:
+    """
+    Resources are split into groups and every process moves to the next
+    group after jobs_per_phase jobs, so contention shifts over time.
+    """
+
+    def __init__(self, instances, phases=4, max_steps=3, max_units=1, jobs_per_phase=10):
+        self.instances = instances
+        self.max_steps = max_steps
+        self.max_units = max_units
+        self.jobs_per_phase = jobs_per_phase
+        m = len(instances)
+        self.groups = [list(range(g, m, phases)) for g in range(min(phases, m))]
+        self._jobs = {}
+
+    def job(self, process, rng):
+        done = self._jobs.get(process, 0)
+        self._jobs[process] = done + 1
+        group = self.groups[(process + done // self.jobs_per_phase) % len(self.groups)]
+        k = rng.randint(1, min(self.max_steps, len(group)))
+        return [(r, rng.randint(1, min(self.max_units, self.instances[r])))
+                for r in rng.sample(group, k)]
+
+
+class OrderedModel:
+    """Lock ordering: another model's jobs acquired in ascending resource order, so no circular wait"""
+
+    def __init__(self, model):
+        self.model = model
+        self.instances = model.instances
+
+    def job(self, process, rng):
+        return sorted(self.model.job(process, rng))
+
+
+# === Simulation ===
+class Simulation:
+    """
+    Event-heap simulation of `processes` processes over resources with the
+    given instance counts. Blocked processes have no pending events; they are
+    woken when a release frees what they wait on. Statistics accumulate
+    across calls to run().
+    """
+
+    def __init__(self, instances, processes, model, policy="detect", seed=None,
+                 think_time=1.0, hold_time=5.0, idle_time=2.0, detect_interval=10.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy: {policy}")
+        self.instances = list(instances)
+        self.available = list(instances)
+        self.model = model
+        self.policy = policy
+        self.rng = random.Random(seed)
+        self.think_rate = 1.0 / think_time
+        self.hold_rate = 1.0 / hold_time
+        self.idle_rate = 1.0 / idle_time
+        self.detect_interval = detect_interval
+        self.now = 0.0
+
+        self.jobs = [None] * processes          # process -> [(resource, units)] of its current job
+        self.step = [0] * processes             # process -> index of the next step
+        self.held = [{} for _ in range(processes)]
+        self.claim = [None] * processes         # process -> {resource: units} of its current job
+        self.waiting = {}                       # blocked process -> (resource, units, since)
+        self.queues = [[] for _ in self.instances]
+        self.blocked_held = [0] * len(self.instances)   # resource -> units held by blocked processes
+        self.blocked_holders = [set() for _ in self.instances]  # detection: resource -> blocked holders
+        # Avoidance keeps a safe sequence of the processes with a job claim as
+        # sort keys, and for each resource the processes whose claim uses it
+        self.order_key = {}
+        self.claimants = [set() for _ in self.instances]
+        self._next_key = 0
+
+        self.events = 0
+        self.completed = 0
+        self.aborted = 0
+        self.deadlocks = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.grants = 0
+        self.wall_seconds = 0.0
+
+        self._heap = []
+        self._seq = itertools.count()
+        self._handlers = (self._start, self._acquire, self._release, self._detect)
+        for p in range(processes):
+            self._schedule(self.rng.expovariate(self.idle_rate), START, p)
+        if policy == "periodic":
+            self._schedule(detect_interval, DETECT, -1)
+
+    def _schedule(self, delay, kind, process):
+        heapq.heappush(self._heap, (self.now + delay, next(self._seq), kind, process))
+
+    def run(self, events=None, until=None):
+        """Process up to `events` events or until simulated time `until`; returns report()"""
+        heap = self._heap
+        pop = heapq.heappop
+        handlers = self._handlers
+        limit = self.events + events if events is not None else None
+        started = time.perf_counter()
+        while heap:
+            if limit is not None and self.events >= limit:
+                break
+            if until is not None and heap[0][0] > until:
+                break
+            self.now, _, kind, process = pop(heap)
+            self.events += 1
+            handlers[kind](process)
+        self.wall_seconds += time.perf_counter() - started
+        return self.report()
+
+    # === Event handlers ===
+    def _start(self, p):
+        job = self.model.job(p, self.rng)
+        self.jobs[p] = job
+        self.step[p] = 0
+        claim = {}
+        for r, units in job:
+            claim[r] = claim.get(r, 0) + units
+        self.claim[p] = claim
+        if self.policy == "avoid":
+            self._join(p)
+        self._acquire(p)
+
+    def _acquire(self, p):
+        r, units = self.jobs[p][self.step[p]]
+        granted = self._can_grant(p, r, units)
+        # Avoidance: no slack in the cached safe sequence, but another safe order may admit it
+        reordered = (not granted and self.policy == "avoid" and units <= self.available[r]
+                     and self._safe_after(p, r, units))
+        if granted or reordered:
+            self._grant(p, r, units)
+            self.grants += 1
+            self._advance(p)
+            if reordered:
+                # The new safe sequence can leave any waiter more slack
+                self._wake([q for q, queue in enumerate(self.queues) if queue])
+            return
+        self.waiting[p] = (r, units, self.now)
+        self.queues[r].append(p)
+        self._set_blocked(p, 1)
+        # Every running process will release what it holds, so a new deadlock
+        # needs the request to exceed what the blocked processes leave over,
+        # and it can only close among the processes p waits on
+        if self.policy == "detect" and units > self.instances[r] - self.blocked_held[r]:
+            if self.deadlocked(self._involved(p)):
+                self._resolve()
+
+    def _release(self, p):
+        freed = self.held[p]
+        claim = self._leave(p)
+        for r, units in freed.items():
+            self.available[r] += units
+        self.completed += 1
+        self._schedule(self.rng.expovariate(self.idle_rate), START, p)
+        self._wake(claim if self.policy == "avoid" else freed)
+
+    def _detect(self, _):
+        self._resolve()
+        self._schedule(self.detect_interval, DETECT, -1)
+
+    # === Granting and waking ===
+    def _set_blocked(self, p, sign):
+        blocked_held = self.blocked_held
+        for r, units in self.held[p].items():
+            blocked_held[r] += sign * units
+        if self.policy == "detect":
+            for r in self.held[p]:
+                if sign > 0:
+                    self.blocked_holders[r].add(p)
+                else:
+                    self.blocked_holders[r].discard(p)
+
+    def _can_grant(self, p, r, units):
+        """Whether the request fits now; under avoidance also within the cached safe sequence's slack"""
+        if units > self.available[r]:
+            return False
+        return self.policy != "avoid" or units <= self._slack(p, r)
+
+    def _grant(self, p, r, units):
+        self.available[r] -= units
+        held = self.held[p]
+        held[r] = held.get(r, 0) + units
+
+    def _advance(self, p):
+        self.step[p] += 1
+        if self.step[p] == len(self.jobs[p]):
+            self._schedule(self.rng.expovariate(self.hold_rate), RELEASE, p)
+        else:
+            self._schedule(self.rng.expovariate(self.think_rate), ACQUIRE, p)
+
+    def _wake(self, resources):
+        """
+        Grant waiting requests on the given resources that now fit, in
+        arrival order per resource. Under avoidance the caller passes every
+        resource whose slack may have grown: a finished process's whole
+        claim, since it no longer constrains anyone after it in the sequence.
+        """
+        for r in resources:
+            queue = self.queues[r]
+            i = 0
+            while i < len(queue) and self.available[r]:
+                p = queue[i]
+                _, units, since = self.waiting[p]
+                if not self._can_grant(p, r, units):
+                    i += 1
+                    continue
+                del queue[i]
+                del self.waiting[p]
+                self._set_blocked(p, -1)
+                self._grant(p, r, units)
+                wait = self.now - since
+                self.grants += 1
+                self.total_wait += wait
+                if wait > self.max_wait:
+                    self.max_wait = wait
+                self._advance(p)
+
+    # === Policies ===
+    def _join(self, p):
+        """
+        Append a process starting a job to the safe sequence: it holds
+        nothing and its claim fits the instances, so it can always run last
+        """
+        self.order_key[p] = self._next_key
+        self._next_key += 1
+        for r in self.claim[p]:
+            self.claimants[r].add(p)
+
+    def _leave(self, p):
+        """End p's job; returns its claim ({} if it had none)"""
+        claim = self.claim[p] or {}
+        self.held[p] = {}
+        self.claim[p] = None
+        if self.order_key.pop(p, None) is not None:
+            for r in claim:
+                self.claimants[r].discard(p)
+        return claim
+
+    def _slack(self, p, r):
+        """
+        How many units of r p could be granted keeping the cached safe
+        sequence valid: a grant only lowers work in column r before p, so it
+        is the smallest work - need over the claimants of r ahead of p, as in
+        DeadlockEngine._grant_slack.
+        """
+        key = self.order_key[p]
+        work = slack = self.available[r]
+        for q in sorted(self.claimants[r], key=self.order_key.__getitem__):
+            if self.order_key[q] >= key:
+                break
+            held = self.held[q].get(r, 0)
+            slack = min(slack, work - self.claim[q][r] + held)
+            work += held
+        return slack
+
+    def _safe_after(self, p, r, units):
+        """Banker's check on job claims with the grant applied tentatively; a safe result is cached"""
+        self.available[r] -= units
+        held = self.held[p]
+        held[r] = held.get(r, 0) + units
+        safe = self._reorder()
+        self.available[r] += units
+        held[r] -= units
+        if not held[r]:
+            del held[r]
+        return safe
+
+    def _reorder(self):
+        """
+        Worklist Banker's reduction over the processes with a claim: each
+        counts the resources whose remaining need exceeds work and waits in
+        per-resource queues sorted by need; a finishing process advances only
+        the queues of what it holds. If every process finishes, the finish
+        order becomes the cached safe sequence.
+        """
+        work = list(self.available)
+        short = {}
+        waiters = {}
+        ready = deque()
+        for q in self.order_key:
+            count = 0
+            held = self.held[q]
+            for s, total in self.claim[q].items():
+                need = total - held.get(s, 0)
+                if need > work[s]:
+                    count += 1
+                    waiters.setdefault(s, []).append((need, q))
+            short[q] = count
+            if not count:
+                ready.append(q)
+
+        for queue in waiters.values():
+            queue.sort()
+        heads = dict.fromkeys(waiters, 0)
+        order = []
+        while ready:
+            q = ready.popleft()
+            order.append(q)
+            for s, count in self.held[q].items():
+                work[s] += count
+                queue = waiters.get(s)
+                if not queue:
+                    continue
+                h = heads[s]
+                while h < len(queue) and queue[h][0] <= work[s]:
+                    waiter = queue[h][1]
+                    short[waiter] -= 1
+                    if not short[waiter]:
+                        ready.append(waiter)
+                    h += 1
+                heads[s] = h
+
+        if len(order) < len(self.order_key):
+            return False
+        self.order_key = {q: self._next_key + k for k, q in enumerate(order)}
+        self._next_key += len(order)
+        return True
+
+    def deadlocked(self, candidates=None):
+        """
+        Blocked processes that can never proceed, among candidates (default:
+        every blocked process). Running processes will release everything
+        they hold, so the work vector starts at instances minus what the
+        blocked processes hold. Two sweeps settle nearly every state; long
+        chains fall back to per-resource queues sorted by units, as in
+        find_deadlocked_worklist, so the reduction never goes quadratic.
+        """
+        waiting = self.waiting
+        held = self.held
+        pending = waiting if candidates is None else candidates
+        work = [total - held for total, held in zip(self.instances, self.blocked_held)]
+        # Sweeps in order finish most processes in one or two passes
+        for _ in range(2):
+            still = []
+            for q in pending:
+                r, units, _ = waiting[q]
+                if units <= work[r]:
+                    for s, count in held[q].items():
+                        work[s] += count
+                else:
+                    still.append(q)
+            if not still or len(still) == len(pending):
+                return still
+            pending = still
+
+        # Long chains: per-resource queues sorted by units
+        ready = []
+        waiters = {}
+        for q in pending:
+            r, units, _ = waiting[q]
+            if units <= work[r]:
+                ready.append(q)
+            elif r in waiters:
+                waiters[r].append((units, q))
+            else:
+                waiters[r] = [(units, q)]
+        for queue in waiters.values():
+            queue.sort()
+        heads = dict.fromkeys(waiters, 0)
+        for q in ready:
+            for s, count in held[q].items():
+                if s in waiters:
+                    queue = waiters[s]
+                    available = work[s] = work[s] + count
+                    h = heads[s]
+                    while h < len(queue) and queue[h][0] <= available:
+                        ready.append(queue[h][1])
+                        h += 1
+                    heads[s] = h
+        return [q for s, queue in waiters.items() for _, q in queue[heads[s]:]]
+
+    def _involved(self, p):
+        """
+        The blocked processes p transitively waits on: the blocked holders of
+        its resource, theirs, and so on. Only their progress can free what
+        they wait on, so checking them alone decides whether p is stuck.
+        """
+        involved = [p]
+        seen = {p}
+        for q in involved:
+            for holder in self.blocked_holders[self.waiting[q][0]]:
+                if holder not in seen:
+                    seen.add(holder)
+                    involved.append(holder)
+        return involved
+
+    def _resolve(self):
+        """Abort the deadlocked process freeing the most units until none remain"""
+        stuck = self.deadlocked()
+        if stuck:
+            self.deadlocks += 1
+        # Blocked processes hold still, so their sizes last the whole resolve
+        size = {q: (sum(self.held[q].values()), q) for q in stuck}
+        while stuck:
+            self._abort(max(stuck, key=size.__getitem__))
+            # An abort only frees units, so whoever could finish still can
+            stuck = self.deadlocked([q for q in stuck if q in self.waiting])
+
+    def _abort(self, p):
+        r, _, _ = self.waiting.pop(p)
+        self.queues[r].remove(p)
+        self._set_blocked(p, -1)
+        freed = self.held[p]
+        claim = self._leave(p)
+        for s, units in freed.items():
+            self.available[s] += units
+        self.aborted += 1
+        self._schedule(self.rng.expovariate(self.idle_rate), START, p)
+        self._wake(claim if self.policy == "avoid" else freed)
+
+    # === Reporting ===
+    def report(self):
+        return {
+            "time": self.now,
+            "events": self.events,
+            "wall_seconds": self.wall_seconds,
+            "events_per_second": self.events / self.wall_seconds if self.wall_seconds else 0.0,
+            "completed_jobs": self.completed,
+            "throughput": self.completed / self.now if self.now else 0.0,
+            "mean_wait": self.total_wait / self.grants if self.grants else 0.0,
+            "max_wait": self.max_wait,
+            "deadlocks": self.deadlocks,
+            "aborted": self.aborted,
+            "deadlocks_per_1000_jobs": 1000.0 * self.deadlocks / self.completed if self.completed else 0.0,
+            "blocked": len(self.waiting),
+            "stuck": len(self.deadlocked()),
+        }
+
+
+def make_model(name, instances, max_steps=3, max_units=1):
+    if name == "random":
+        return RandomModel(instances, max_steps, max_units)
+    if name == "phased":
+        return PhasedModel(instances, max_steps=max_steps, max_units=max_units)
+    if name == "ordered":
+        return OrderedModel(RandomModel(instances, max_steps, max_units))
+    raise ValueError(f"Unknown model: {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=200)
+    parser.add_argument("--resources", type=int, default=50)
+    parser.add_argument("--instances", type=int, default=2)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--units", type=int, default=1)
+    parser.add_argument("--model", choices=("random", "phased", "ordered"), default="random")
+    parser.add_argument("--policy", choices=POLICIES, default="detect")
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    instances = [args.instances] * args.resources
+    model = make_model(args.model, instances, args.steps, args.units)
+    simulation = Simulation(instances, args.processes, model, args.policy, seed=args.seed)
+    for key, value in simulation.run(events=args.events).items():
+        print(f"{key:>24}: {value:.4g}" if isinstance(value, float) else f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
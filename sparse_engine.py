@@ -0,0 +1,237 @@
+"""
+Sparse engine for systems where each process touches a handful of resources.
+
+Allocation and request live in per-process adjacency dicts of nonzero
+entries ({resource_id: count}), mirrored by per-resource dicts of the
+processes that touch each resource. Memory scales with the number of edges
+rather than processes x resources, adding a resource is O(1), and both
+algorithms only ever iterate over nonzero entries.
+"""
+from collections import deque
+
+import numpy as np
+
+
+class SparseEngine:
+    """
+    Sparse counterpart of DeadlockEngine. Rows are dicts keyed by resource id,
+    so ids stay stable and deletion only touches the removed node's edges.
+    As in DeadlockEngine, request always equals the remaining need
+    (max need - allocation), so the safety check and detection share it.
+    """
+
+    def __init__(self):
+        self._next_process = 0
+        self._next_resource = 0
+        self.allocation = {}        # process id -> {resource id: count}
+        self.max_need = {}          # process id -> {resource id: count}
+        self.request = {}           # process id -> {resource id: count}
+        self.users = {}             # resource id -> {process id: None}, processes touching it
+        self.resource_instances = {}
+        self.available = {}
+
+    @classmethod
+    def from_engine(cls, engine):
+        """Build a sparse engine from a dense DeadlockEngine"""
+        sparse = cls()
+        sparse._next_process = engine._next_process
+        sparse._next_resource = engine._next_resource
+        for resource_id in engine.resources:
+            sparse.resource_instances[resource_id] = engine.instances_of(resource_id)
+            sparse.available[resource_id] = engine.available_of(resource_id)
+            sparse.users[resource_id] = {}
+        for process_id in engine.processes:
+            for matrix in (sparse.allocation, sparse.max_need, sparse.request):
+                matrix[process_id] = {}
+        for source, target in ((engine.allocation, sparse.allocation),
+                               (engine.max_need, sparse.max_need),
+                               (engine.request, sparse.request)):
+            rows, cols = np.nonzero(source)
+            for row, col, count in zip(rows.tolist(), cols.tolist(), source[rows, cols].tolist()):
+                process_id = engine.processes[row]
+                resource_id = engine.resources[col]
+                target[process_id][resource_id] = count
+                sparse.users[resource_id][process_id] = None
+        return sparse
+
+    @property
+    def processes(self):
+        return list(self.allocation)
+
+    @property
+    def resources(self):
+        return list(self.resource_instances)
+
+    def edge_count(self):
+        return sum(len(row) for row in self.max_need.values())
+
+    # === Structure ===
+    def add_process(self):
+        process_id = f"P{self._next_process}"
+        self._next_process += 1
+        for matrix in (self.allocation, self.max_need, self.request):
+            matrix[process_id] = {}
+        return process_id
+
+    def add_resource(self, instances=1):
+        """O(1): no per-process column to append"""
+        resource_id = f"R{self._next_resource}"
+        self._next_resource += 1
+        self.resource_instances[resource_id] = instances
+        self.available[resource_id] = instances
+        self.users[resource_id] = {}
+        return resource_id
+
+    def remove_process(self, process_id):
+        for resource_id, count in self.allocation[process_id].items():
+            self.available[resource_id] += count
+        for resource_id in self.max_need[process_id]:
+            self.users[resource_id].pop(process_id, None)
+        for resource_id in self.allocation[process_id]:
+            self.users[resource_id].pop(process_id, None)
+        for matrix in (self.allocation, self.max_need, self.request):
+            del matrix[process_id]
+
+    def remove_resource(self, resource_id):
+        for process_id in self.users.pop(resource_id):
+            for matrix in (self.allocation, self.max_need, self.request):
+                matrix[process_id].pop(resource_id, None)
+        del self.resource_instances[resource_id]
+        del self.available[resource_id]
+
+    # === Accessors ===
+    def instances_of(self, resource_id):
+        return self.resource_instances[resource_id]
+
+    def available_of(self, resource_id):
+        return self.available[resource_id]
+
+    def allocation_edges(self):
+        for process_id, row in self.allocation.items():
+            for resource_id, count in row.items():
+                yield process_id, resource_id, count
+
+    def request_edges(self):
+        for process_id, row in self.request.items():
+            for resource_id, count in row.items():
+                yield process_id, resource_id, count
+
+    # === Configuration ===
+    def configure_process(self, process_id, allocation, max_need):
+        """Replace a process's rows, given as {resource_id: count} dicts of nonzeros"""
+        for resource_id, count in allocation.items():
+            if count > max_need.get(resource_id, 0):
+                raise ValueError(f"Allocation cannot exceed max need for {process_id} on {resource_id}")
+            if count > self.resource_instances[resource_id]:
+                raise ValueError(f"Allocation cannot exceed total instances for {process_id} on {resource_id}")
+
+        for resource_id, count in self.allocation[process_id].items():
+            self.available[resource_id] += count
+            self.users[resource_id].pop(process_id, None)
+        for resource_id in self.max_need[process_id]:
+            self.users[resource_id].pop(process_id, None)
+
+        self.allocation[process_id] = {r: c for r, c in allocation.items() if c}
+        self.max_need[process_id] = {r: c for r, c in max_need.items() if c}
+        self.request[process_id] = {r: c - allocation.get(r, 0) for r, c in max_need.items()
+                                    if c - allocation.get(r, 0) > 0}
+        for resource_id, count in self.allocation[process_id].items():
+            self.available[resource_id] -= count
+        for resource_id in self.max_need[process_id]:
+            self.users[resource_id][process_id] = None
+
+    # === Requests and releases ===
+    def request_resource(self, process_id, resource_id, instances):
+        """Grant a request if it fits in available (True) or deny it (False)"""
+        max_need = self.max_need[process_id].get(resource_id, 0)
+        held = self.allocation[process_id].get(resource_id, 0)
+        if instances < 0:
+            raise ValueError("Number of instances cannot be negative")
+        if held + instances > max_need:
+            raise ValueError(f"Cannot exceed max need of {max_need} for {resource_id}")
+        if instances > self.available[resource_id]:
+            return False
+
+        if instances:
+            self.allocation[process_id][resource_id] = held + instances
+        remaining = max_need - held - instances
+        if remaining:
+            self.request[process_id][resource_id] = remaining
+        else:
+            self.request[process_id].pop(resource_id, None)
+        self.available[resource_id] -= instances
+        return True
+
+    def release_resources(self, process_id):
+        """Release everything a process holds; returns [(resource_id, count)]"""
+        released = list(self.allocation[process_id].items())
+        for resource_id, count in released:
+            self.available[resource_id] += count
+            self.request[process_id][resource_id] = self.max_need[process_id][resource_id]
+        self.allocation[process_id] = {}
+        return released
+
+    def terminate_process(self, process_id):
+        for resource_id, count in self.allocation[process_id].items():
+            self.available[resource_id] += count
+        for resource_id in self.max_need[process_id]:
+            self.users[resource_id].pop(process_id, None)
+        for matrix in (self.allocation, self.max_need, self.request):
+            matrix[process_id] = {}
+
+    # === Algorithms ===
+    def _reduce(self, candidates):
+        """
+        Worklist reduction over nonzero entries only: each candidate counts
+        the resources whose request exceeds work and waits in per-resource
+        queues sorted by amount; a finishing process advances only the queues
+        of the resources it holds. Returns (finish order, stuck processes).
+        """
+        work = dict(self.available)
+        short = {}
+        waiters = {}
+        ready = deque()
+        for process_id in candidates:
+            count = 0
+            for resource_id, amount in self.request[process_id].items():
+                if amount > work[resource_id]:
+                    count += 1
+                    waiters.setdefault(resource_id, []).append((amount, process_id))
+            short[process_id] = count
+            if not count:
+                ready.append(process_id)
+
+        for queue in waiters.values():
+            queue.sort()
+        heads = dict.fromkeys(waiters, 0)
+        order = []
+        while ready:
+            process_id = ready.popleft()
+            order.append(process_id)
+            for resource_id, count in self.allocation[process_id].items():
+                work[resource_id] += count
+                queue = waiters.get(resource_id)
+                if not queue:
+                    continue
+                h = heads[resource_id]
+                while h < len(queue) and queue[h][0] <= work[resource_id]:
+                    waiter = queue[h][1]
+                    short[waiter] -= 1
+                    if not short[waiter]:
+                        ready.append(waiter)
+                    h += 1
+                heads[resource_id] = h
+
+        return order, [p for p in candidates if short[p]]
+
+    def detect_deadlock(self):
+        """Deadlocked process ids, considering only processes that hold something"""
+        candidates = [p for p, row in self.allocation.items() if row]
+        return self._reduce(candidates)[1]
+
+    def check_safe_state(self):
+        """Banker's safety check; returns (is_safe, safe_sequence)"""
+        order, stuck = self._reduce(list(self.allocation))
+        if stuck:
+            return False, []
+        return True, order
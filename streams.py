@@ -0,0 +1,27 @@
+"""
+Chunked line reading shared by the trace replayer and the CSV importer.
+
+Files (optionally gzip-compressed) are read a fixed number of bytes at a
+time and split into lines as they arrive, so memory stays bounded however
+large the file is.
+"""
+import gzip
+
+CHUNK_SIZE = 1 << 20
+
+
+def read_lines(path, chunk_size=CHUNK_SIZE):
+    """Yield decoded lines, reading the file chunk_size bytes at a time"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        tail = b""
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line.decode("utf-8").rstrip("\r")
+        if tail:
+            yield tail.decode("utf-8").rstrip("\r")
@@ -0,0 +1,269 @@
+"""
+Parameter sweep over scenario sizes with parallel cells and resumable output.
+
+Usage:
+    python sweep.py --output sweep.csv [--spec grid.json]
+                    [--processes 10 100] [--resources 5 20] [--instances 1 5]
+                    [--load 0.3 0.7] [--claim 0.3] [--demand 0.5] [--family uniform]
+                    [--trials 10] [--seed 0] [--workers N] [--columnar sweep.npz]
+
+Every combination of the grid values is a cell. A cell generates `trials`
+states with scenarios.generate (instances per resource drawn from
+1..instances) and draws current requests from the remaining need with
+probability `demand` (at 1.0 request equals need and the two fractions
+coincide). It runs the vectorized Banker's safety check and worklist
+deadlock detection on each and yields one row with the unsafe and
+deadlocked fractions plus per-phase timings. A cell whose parameters the
+family rejects is recorded with status "skipped: <reason>" instead of
+stopping the sweep. Cells run in a process pool and each row is appended
+to the CSV as soon as its cell finishes, so an interrupted sweep resumes by
+skipping the cells already in the file with the same trials and seed. A
+grid spec file is JSON with the same keys as the options; options given on
+the command line take precedence over it.
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+import numpy as np
+
+import scenarios
+from engine import bankers_safe_sequence_vectorized, find_deadlocked_worklist
+
+GRID_KEYS = ("family", "processes", "resources", "instances", "load", "claim", "demand")
+RUN_KEYS = ("trials", "seed")
+RESULT_KEYS = ("status", "unsafe_fraction", "deadlocked_fraction", "mean_deadlocked",
+               "generate_seconds", "safety_seconds", "detection_seconds", "cell_seconds")
+COLUMNS = GRID_KEYS + RUN_KEYS + RESULT_KEYS
+DEFAULT_GRID = {
+    "family": ["uniform"],
+    "processes": [10, 100],
+    "resources": [5, 20],
+    "instances": [1, 5],
+    "load": [0.3, 0.7],
+    "claim": [0.3],
+    "demand": [0.5],
+}
+DEFAULT_TRIALS = 10
+DEFAULT_SEED = 0
+
+
+def cells(grid):
+    """Every combination of the grid values as a dict, in a stable order"""
+    values = [grid[key] for key in GRID_KEYS]
+    return [dict(zip(GRID_KEYS, combination)) for combination in product(*values)]
+
+
+def cell_key(cell):
+    """Identity of a cell as stored in the CSV (all values as text)"""
+    return tuple(str(cell[key]) for key in GRID_KEYS)
+
+
+def resume_key(cell, trials, seed):
+    """Identity of a finished row: its cell plus the trials and seed it was run with"""
+    return cell_key(cell) + (str(trials), str(seed))
+
+
+def run_cell(job):
+    """
+    Evaluate one cell; top-level so it can run in a process pool. Returns
+    the cell's result row.
+    """
+    cell, trials, seed = job
+    started = time.perf_counter()
+    timings = {"generate": 0.0, "safety": 0.0, "detection": 0.0}
+    unsafe = deadlocked = stuck = 0
+    name = ":".join((str(seed),) + cell_key(cell))
+
+    row = dict(cell, trials=trials, seed=seed)
+    for trial in range(trials):
+        clock = time.perf_counter()
+        rng = scenarios.make_rng(f"{name}:{trial}")
+        instances = rng.integers(1, cell["instances"] + 1, size=cell["resources"])
+        try:
+            allocation, max_need = scenarios.generate(cell["family"], instances, cell["processes"],
+                                                      seed=int(rng.integers(2 ** 63)),
+                                                      load=cell["load"], claim=cell["claim"])
+        except ValueError as error:
+            row.update(dict.fromkeys(RESULT_KEYS, float("nan")), status=f"skipped: {error}")
+            return row
+        available = instances - allocation.sum(axis=0)
+        need = max_need - allocation
+        request = scenarios.sample_request(rng, need, cell["demand"])
+        timings["generate"] += time.perf_counter() - clock
+
+        clock = time.perf_counter()
+        if bankers_safe_sequence_vectorized(available, allocation, need) is None:
+            unsafe += 1
+        timings["safety"] += time.perf_counter() - clock
+
+        clock = time.perf_counter()
+        rows = find_deadlocked_worklist(available, allocation, request)
+        timings["detection"] += time.perf_counter() - clock
+        if rows:
+            deadlocked += 1
+            stuck += len(rows)
+
+    row.update({
+        "status": "ok",
+        "unsafe_fraction": unsafe / trials if trials else 0.0,
+        "deadlocked_fraction": deadlocked / trials if trials else 0.0,
+        "mean_deadlocked": stuck / trials if trials else 0.0,
+        "generate_seconds": timings["generate"],
+        "safety_seconds": timings["safety"],
+        "detection_seconds": timings["detection"],
+        "cell_seconds": time.perf_counter() - started,
+    })
+    return row
+
+
+def completed_cells(path):
+    """
+    Resume keys of the rows already in the CSV. A row cut short by an
+    interruption is dropped from the file so appending starts on a clean
+    line. Raises ValueError if the file has different columns, e.g. one
+    written before the seed was recorded.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    done = set()
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is not None and tuple(reader.fieldnames) != COLUMNS:
+            raise ValueError(f"{path} has different columns than this sweep writes; use a new output file")
+        for row in reader:
+            if None in row or any(row.get(key) is None for key in COLUMNS):
+                continue
+            done.add(tuple(row[key] for key in GRID_KEYS + RUN_KEYS))
+    return done
+
+
+def run_sweep(grid, output, trials=DEFAULT_TRIALS, seed=DEFAULT_SEED, workers=None, progress=None):
+    """
+    Run every cell of the grid not yet in `output`, appending rows as cells
+    finish. workers=1 runs in this process. Returns the number of cells run.
+    """
+    done = completed_cells(output)
+    pending = [cell for cell in cells(grid) if resume_key(cell, trials, seed) not in done]
+    new_file = not os.path.exists(output) or os.path.getsize(output) == 0
+    jobs = [(cell, trials, seed) for cell in pending]
+
+    with open(output, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        if new_file:
+            writer.writeheader()
+
+        def record(row):
+            writer.writerow(row)
+            f.flush()
+            if progress:
+                progress(row)
+
+        if workers == 1 or len(jobs) <= 1:
+            for job in jobs:
+                record(run_cell(job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for future in as_completed([executor.submit(run_cell, job) for job in jobs]):
+                    record(future.result())
+    return len(jobs)
+
+
+def write_columnar(csv_path, out_path):
+    """
+    Write the sweep results column by column: .npz with one array per column,
+    or .parquet when pyarrow is installed.
+    """
+    with open(csv_path, newline="") as f:
+        rows = [row for row in csv.DictReader(f)]
+    columns = {}
+    for key in COLUMNS:
+        values = [row[key] for row in rows]
+        try:
+            columns[key] = np.array(values, dtype=np.int64)
+        except ValueError:
+            try:
+                columns[key] = np.array(values, dtype=np.float64)
+            except ValueError:
+                columns[key] = np.array(values, dtype=str)
+
+    if out_path.endswith(".parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Writing .parquet needs pyarrow; use a .npz path instead")
+        pq.write_table(pa.table(columns), out_path)
+    else:
+        np.savez(out_path, **columns)
+
+
+def load_grid(args):
+    grid = dict(DEFAULT_GRID)
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+        unknown = set(spec) - set(GRID_KEYS) - {"trials", "seed"}
+        if unknown:
+            raise ValueError(f"Unknown grid keys: {', '.join(sorted(unknown))}")
+        grid.update({key: value if isinstance(value, list) else [value]
+                     for key, value in spec.items() if key in GRID_KEYS})
+        if args.trials is None:
+            args.trials = spec.get("trials")
+        if args.seed is None:
+            args.seed = spec.get("seed")
+    if args.trials is None:
+        args.trials = DEFAULT_TRIALS
+    if args.seed is None:
+        args.seed = DEFAULT_SEED
+    for key in GRID_KEYS:
+        value = getattr(args, key)
+        if value is not None:
+            grid[key] = value
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", required=True, help="CSV file, appended to and resumed from")
+    parser.add_argument("--spec", help="JSON grid spec")
+    parser.add_argument("--family", nargs="+", choices=scenarios.FAMILIES)
+    parser.add_argument("--processes", type=int, nargs="+")
+    parser.add_argument("--resources", type=int, nargs="+")
+    parser.add_argument("--instances", type=int, nargs="+", help="max instances per resource")
+    parser.add_argument("--load", type=float, nargs="+")
+    parser.add_argument("--claim", type=float, nargs="+")
+    parser.add_argument("--demand", type=float, nargs="+", help="chance each unit of need is requested")
+    parser.add_argument("--trials", type=int, help=f"states per cell (default {DEFAULT_TRIALS})")
+    parser.add_argument("--seed", type=int, help=f"base seed (default {DEFAULT_SEED})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--columnar", help="also write the results to a .npz or .parquet file")
+    args = parser.parse_args()
+
+    grid = load_grid(args)
+    total = len(cells(grid))
+
+    def progress(row):
+        cell = " ".join(f"{key}={row[key]}" for key in GRID_KEYS)
+        if row["status"] != "ok":
+            print(f"{cell}  {row['status']}")
+            return
+        print(cell + f"  unsafe={row['unsafe_fraction']:.3f} deadlocked={row['deadlocked_fraction']:.3f}"
+              + f"  {row['cell_seconds']:.3f}s")
+
+    ran = run_sweep(grid, args.output, args.trials, args.seed, args.workers, progress)
+    print(f"{ran} cell(s) run, {total - ran} already in {args.output}")
+    if args.columnar:
+        write_columnar(args.output, args.columnar)
+
+
+if __name__ == "__main__":
+    main()
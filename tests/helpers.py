@@ -0,0 +1,45 @@
+"""Random states and checks shared by the tests"""
+import numpy as np
+
+import scenarios
+from engine import DeadlockEngine
+
+TRIALS = 300
+
+
+def random_state(rng, single_instance=False):
+    """(instances, allocation, max_need) drawn from a random scenario family"""
+    n = int(rng.integers(1, 9))
+    m = int(rng.integers(1, 7))
+    instances = np.ones(m, dtype=np.int32) if single_instance else rng.integers(0, 5, m)
+    family = rng.choice(["uniform", "hot", "saturated", "safe"])
+    return (np.asarray(instances),) + scenarios.generate(family, instances, n, seed=int(rng.integers(1 << 30)))
+
+
+def random_request(rng, instances, allocation):
+    """A detection request matrix: arbitrary amounts, not tied to max need"""
+    n, m = allocation.shape
+    request = rng.integers(0, 3, (n, m)) * (rng.random((n, m)) < 0.4)
+    return np.minimum(request, instances).astype(np.int32)
+
+
+def is_safe_sequence(available, allocation, need, order):
+    """Whether order (rows) lets every process run to completion in turn"""
+    if sorted(order) != list(range(len(allocation))):
+        return False
+    work = np.array(available, dtype=np.int64)
+    for row in order:
+        if (need[row] > work).any():
+            return False
+        work += allocation[row]
+    return True
+
+
+def engine_of(instances, allocation, max_need, request=None):
+    """A debug-mode DeadlockEngine over copies of the given matrices"""
+    n, m = allocation.shape
+    if request is None:
+        request = max_need - allocation
+    return DeadlockEngine.from_arrays([f"P{k}" for k in range(n)], [f"R{k}" for k in range(m)],
+                                      instances, allocation.copy(), max_need.copy(), request.copy(),
+                                      debug=True)
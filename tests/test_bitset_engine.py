@@ -0,0 +1,65 @@
+"""BitsetEngine against the reference loops on single-instance states"""
+import numpy as np
+
+from bitset_engine import BitsetEngine
+from engine import bankers_safe_sequence, find_deadlocked
+from helpers import TRIALS, engine_of, is_safe_sequence, random_request, random_state
+
+
+def test_bitset_engine_matches_reference():
+    rng = np.random.default_rng(11)
+    for _ in range(TRIALS):
+        instances, allocation, max_need = random_state(rng, single_instance=True)
+        request = random_request(rng, instances, allocation)
+        engine = engine_of(instances, allocation, max_need, request)
+        bitset = BitsetEngine.from_engine(engine)
+        available = engine.available
+        expected = find_deadlocked(available.tolist(), allocation.tolist(), request.tolist())
+        assert bitset.detect_deadlock() == [f"P{row}" for row in expected]
+
+        need = max_need - allocation
+        order = bankers_safe_sequence(available.tolist(), allocation.tolist(), need.tolist())
+        safe, sequence = bitset.check_safe_state()
+        assert safe == (order is not None)
+        if safe:
+            assert is_safe_sequence(available, allocation, need, [engine.row_of(p) for p in sequence])
+
+
+def test_release_returns_held_resources():
+    rng = np.random.default_rng(13)
+    for _ in range(TRIALS):
+        instances, allocation, max_need = random_state(rng, single_instance=True)
+        engine = engine_of(instances, allocation, max_need)
+        bitset = BitsetEngine.from_engine(engine)
+        process_id = str(rng.choice(engine.processes))
+        held = [engine.resources[col] for col in np.flatnonzero(allocation[engine.row_of(process_id)])]
+        assert bitset.release_resources(process_id) == held
+
+
+def test_bitset_engine_stays_in_step_with_deadlock_engine():
+    rng = np.random.default_rng(14)
+    for _ in range(TRIALS // 3):
+        engine = engine_of(*random_state(rng, single_instance=True))
+        bitset = BitsetEngine.from_engine(engine)
+        for _ in range(20):
+            process_id = str(rng.choice(engine.processes))
+            roll = rng.random()
+            if roll < 0.25:
+                released = [resource_id for resource_id, _ in engine.release_resources(process_id)]
+                assert bitset.release_resources(process_id) == sorted(released, key=engine.column_of)
+            elif roll < 0.3:
+                engine.terminate_process(process_id)
+                bitset.terminate_process(process_id)
+            else:
+                claimed = np.flatnonzero(engine.request[engine.row_of(process_id)])
+                if not claimed.size:
+                    continue
+                resource_id = engine.resources[int(rng.choice(claimed))]
+                assert bitset.request_resource(process_id, resource_id) == \
+                    engine.request_resource(process_id, resource_id, 1)
+
+            packed = BitsetEngine.from_engine(engine)
+            assert bitset.held == packed.held and bitset.free == packed.free
+            assert bitset.requested == packed.requested and bitset.claim == packed.claim
+            assert bitset.detect_deadlock() == engine.detect_deadlock()
+            assert bitset.check_safe_state()[0] == engine.check_safe_state()[0]
@@ -0,0 +1,97 @@
+"""ComponentTracker against the reference loops while the engine is reconfigured"""
+import numpy as np
+
+import components
+from components import ComponentTracker, evaluate_component
+from engine import bankers_safe_sequence, find_deadlocked
+from helpers import TRIALS, engine_of, is_safe_sequence, random_state
+
+
+def reference(engine):
+    """(deadlocked ids, is_safe) of a DeadlockEngine by the reference loops"""
+    allocation = engine.allocation.tolist()
+    available = engine.available.tolist()
+    deadlocked = find_deadlocked(available, allocation, engine.request.tolist())
+    order = bankers_safe_sequence(available, allocation, (engine.max_need - engine.allocation).tolist())
+    return [engine.processes[row] for row in deadlocked], order is not None
+
+
+def mutate(rng, engine):
+    """One random reconfiguration, release, termination or grant"""
+    process_id = str(rng.choice(engine.processes))
+    row = engine.row_of(process_id)
+    roll = rng.random()
+    if roll < 0.4:
+        # Reconfigure within what is free, adding and dropping edges
+        free = engine.available + engine.allocation[row]
+        allocation = (rng.integers(0, 3, free.size) * (rng.random(free.size) < 0.5)).clip(0, free)
+        max_need = np.minimum(allocation + rng.integers(0, 2, free.size), engine.resource_instances)
+        engine.configure_process(process_id, allocation, np.maximum(max_need, allocation))
+    elif roll < 0.6:
+        engine.release_resources(process_id)
+    elif roll < 0.65:
+        engine.terminate_process(process_id)
+    else:
+        col = int(rng.integers(engine.available.size))
+        units = min(int(engine.request[row, col]), int(engine.available[col]))
+        engine.request_resource(process_id, engine.resources[col], units)
+
+
+def test_component_tracker_matches_reference():
+    rng = np.random.default_rng(12)
+    for _ in range(TRIALS // 3):
+        engine = engine_of(*random_state(rng))
+        tracker = ComponentTracker(engine)
+        for _ in range(15):
+            mutate(rng, engine)
+            deadlocked, is_safe = reference(engine)
+            assert tracker.detect_deadlock() == deadlocked
+            safe, sequence = tracker.check_safe_state()
+            assert safe == is_safe
+            if safe:
+                assert is_safe_sequence(engine.available, engine.allocation, engine.max_need - engine.allocation,
+                                        [engine.row_of(p) for p in sequence])
+        tracker.close()
+
+
+def test_clean_components_are_not_reevaluated():
+    engine = engine_of(np.array([1, 1, 1]), np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]]),
+                       np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]]))
+    tracker = ComponentTracker(engine)
+    assert len(tracker.components()) == 3
+    assert tracker.evaluate() == 3
+    assert tracker.evaluate() == 0
+    engine.release_resources("P1")
+    assert tracker.evaluate() == 1
+
+
+def test_engine_components_methods_match_reference():
+    rng = np.random.default_rng(13)
+    for _ in range(TRIALS // 3):
+        engine = engine_of(*random_state(rng))
+        for _ in range(10):
+            mutate(rng, engine)
+            deadlocked, is_safe = reference(engine)
+            assert engine.detect_deadlock("components") == deadlocked
+            safe, sequence = engine.check_safe_state("components")
+            assert safe == is_safe
+            if safe:
+                assert is_safe_sequence(engine.available, engine.allocation, engine.max_need - engine.allocation,
+                                        [engine.row_of(p) for p in sequence])
+            # The verdict is cached for the incremental check as well
+            assert engine.check_safe_state() == (safe, sequence)
+
+
+def test_engine_components_method_skips_clean_components(monkeypatch):
+    engine = engine_of(np.array([1, 1, 1]), np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]]),
+                       np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]]))
+    evaluated = []
+    monkeypatch.setattr(components, "evaluate_component",
+                        lambda payload: evaluated.append(payload) or evaluate_component(payload))
+    assert engine.detect_deadlock("components") == []
+    assert len(evaluated) == 3
+    engine.release_resources("P1")
+    assert engine.check_safe_state("components")[0]
+    assert engine.detect_deadlock("components") == []
+    assert len(evaluated) == 4
+    assert engine.snapshot()._components is None
@@ -0,0 +1,165 @@
+"""EdgeRenderer on a recording canvas: drawn lines always match the engine, visibility and detail level"""
+import itertools
+
+import numpy as np
+
+from edge_renderer import AGGREGATE, ALLOCATION, COLORS, HIGHLIGHT, REQUEST, TAG, EdgeRenderer, highlight_pair
+from helpers import engine_of, random_state
+
+
+class RecordingCanvas:
+    """The few Canvas calls EdgeRenderer makes, recorded as {item: (coords, fill)}"""
+
+    def __init__(self):
+        self.lines = {}
+        self.calls = 0
+        self._ids = itertools.count(1)
+
+    def create_line(self, *coords, fill, tags, **options):
+        assert tags == TAG
+        item = next(self._ids)
+        self.lines[item] = (coords, fill)
+        self.calls += 1
+        return item
+
+    def delete(self, item):
+        if item == TAG:
+            self.lines.clear()
+        else:
+            del self.lines[item]
+        self.calls += 1
+
+    def coords(self, item, *coords):
+        self.lines[item] = (coords, self.lines[item][1])
+        self.calls += 1
+
+    def itemconfigure(self, item, fill):
+        self.lines[item] = (self.lines[item][0], fill)
+        self.calls += 1
+
+
+def setup(seed):
+    engine = engine_of(*random_state(np.random.default_rng(seed)))
+    canvas = RecordingCanvas()
+    renderer = EdgeRenderer(canvas)
+    engine.add_listener(renderer.engine_changed)
+    for k, node in enumerate(engine.processes + engine.resources):
+        renderer.place_node(node, 10.0 * k, 5.0 * (k % 3))
+    return engine, canvas, renderer
+
+
+def expected_lines(engine, renderer, highlight=()):
+    """{(coords, fill)} the canvas should show for the engine's current state"""
+    lines = set()
+    visible = renderer.visible
+    for row, process in enumerate(engine.processes):
+        for col, resource in enumerate(engine.resources):
+            kinds = [kind for kind, matrix in ((ALLOCATION, engine.allocation), (REQUEST, engine.request))
+                     if matrix[row, col]]
+            if not kinds or (visible is not None and process not in visible and resource not in visible):
+                continue
+            hot = {kind for kind in kinds if highlight_pair((process, resource, kind)) in highlight}
+            if not renderer.viewport.detailed:
+                color = HIGHLIGHT if hot else COLORS[kinds[0] if len(kinds) == 1 else AGGREGATE]
+                lines.add((renderer._endpoints((process, resource, AGGREGATE)), color))
+                continue
+            for kind in kinds:
+                lines.add((renderer._endpoints((process, resource, kind)), HIGHLIGHT if kind in hot else COLORS[kind]))
+    return lines
+
+
+def drawn(canvas):
+    return set(canvas.lines.values())
+
+
+def mutate(rng, engine, renderer):
+    process_id = str(rng.choice(engine.processes))
+    roll = rng.random()
+    if roll < 0.3:
+        free = engine.available + engine.allocation_of(process_id)
+        allocation = (rng.integers(0, 3, free.size) * (rng.random(free.size) < 0.5)).clip(0, free)
+        engine.configure_process(process_id, allocation, np.maximum(allocation, engine.resource_instances))
+    elif roll < 0.5:
+        engine.release_resources(process_id)
+    elif roll < 0.6 and len(engine.processes) > 1:
+        engine.remove_process(process_id)
+    elif roll < 0.7:
+        new = engine.add_process()
+        renderer.place_node(new, float(rng.integers(500)), float(rng.integers(500)))
+    else:
+        col = int(rng.integers(engine.available.size))
+        units = min(int(engine.request_of(process_id)[col]), int(engine.available[col]))
+        engine.request_resource(process_id, engine.resources[col], units)
+
+
+def test_sync_keeps_the_canvas_in_step_with_the_engine():
+    for seed in range(20):
+        rng = np.random.default_rng(seed)
+        engine, canvas, renderer = setup(seed)
+        renderer.sync(engine)
+        assert drawn(canvas) == expected_lines(engine, renderer)
+        for _ in range(20):
+            mutate(rng, engine, renderer)
+            renderer.sync(engine)
+            assert drawn(canvas) == expected_lines(engine, renderer)
+            assert len(canvas.lines) == len(renderer.items)
+
+
+def test_sync_only_touches_changed_rows():
+    for seed in itertools.count():
+        engine, canvas, renderer = setup(seed)
+        holders = [p for p in engine.processes if any(engine.allocation_of(p))]
+        if holders:
+            break
+    renderer.sync(engine)
+    assert renderer.sync(engine) == 0
+    process_id = holders[0]
+    before = {key for key in renderer.items if key[0] == process_id}
+    engine.release_resources(process_id)
+    calls = renderer.sync(engine)
+    after = {key for key in renderer.items if key[0] == process_id}
+    # Released units are requested again, so each allocation line becomes a request line
+    assert 0 < calls <= len(before) + len(after)
+    assert drawn(canvas) == expected_lines(engine, renderer)
+
+
+def test_highlight_visibility_and_level_of_detail():
+    engine, canvas, renderer = setup(4)
+    renderer.sync(engine)
+    key = next(iter(renderer.keys))
+    highlight = {highlight_pair(key)}
+    renderer.sync(engine, highlight)
+    assert drawn(canvas) == expected_lines(engine, renderer, highlight)
+
+    visible = set(engine.processes[:2])
+    renderer.set_visible(visible)
+    assert drawn(canvas) == expected_lines(engine, renderer, highlight)
+    renderer.set_visible(None)
+    assert drawn(canvas) == expected_lines(engine, renderer, highlight)
+
+    renderer.viewport.scale = 0.1
+    renderer.redraw()
+    assert drawn(canvas) == expected_lines(engine, renderer, highlight)
+    assert all(kind == AGGREGATE for _, _, kind in renderer.items)
+
+
+def test_moving_a_node_moves_only_its_lines():
+    engine, canvas, renderer = setup(5)
+    renderer.sync(engine)
+    node = max(renderer.node_edges, key=lambda node: len(renderer.node_edges[node]))
+    attached = {key for key in renderer.items if node in key[:2]}
+    canvas.calls = 0
+    renderer.move_node(node, 7.0, -3.0)
+    assert canvas.calls == len(attached)
+    assert drawn(canvas) == expected_lines(engine, renderer)
+
+
+def test_removed_nodes_lose_their_lines():
+    engine, canvas, renderer = setup(6)
+    renderer.sync(engine)
+    resource_id = next(r for r in engine.resources if any(r == key[1] for key in renderer.items))
+    engine.remove_resource(resource_id)
+    renderer.sync(engine)
+    assert not any(resource_id in key[:2] for key in renderer.items)
+    assert resource_id not in renderer.centres
+    assert drawn(canvas) == expected_lines(engine, renderer)
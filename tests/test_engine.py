@@ -0,0 +1,221 @@
+"""DeadlockEngine and its algorithms against the reference loops on small random states"""
+import numpy as np
+import pytest
+
+from engine import (GRANTED, UNAVAILABLE, UNSAFE, DeadlockEngine, bankers_safe_sequence,
+                    bankers_safe_sequence_vectorized, find_deadlocked, find_deadlocked_worklist)
+from helpers import TRIALS, engine_of, is_safe_sequence, random_request, random_state
+
+
+def test_vectorized_bankers_matches_reference():
+    rng = np.random.default_rng(0)
+    for _ in range(TRIALS):
+        instances, allocation, max_need = random_state(rng)
+        available = instances - allocation.sum(axis=0)
+        need = max_need - allocation
+        expected = bankers_safe_sequence(available.tolist(), allocation.tolist(), need.tolist())
+        order = bankers_safe_sequence_vectorized(available, allocation, need)
+        assert (order is None) == (expected is None)
+        if order is not None:
+            assert is_safe_sequence(available, allocation, need, order)
+
+
+def test_vectorized_bankers_reports_progress_and_aborts():
+    instances = np.array([4, 4])
+    allocation = np.array([[1, 0], [0, 1], [1, 1]])
+    calls = []
+    bankers_safe_sequence_vectorized(instances - allocation.sum(axis=0), allocation, allocation,
+                                     lambda done, n: calls.append((done, n)))
+    assert calls and calls[-1] == (3, 3)
+
+    def abort(done, n):
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        bankers_safe_sequence_vectorized(instances - allocation.sum(axis=0), allocation, allocation, abort)
+
+
+def test_worklist_detection_matches_reference():
+    rng = np.random.default_rng(1)
+    for _ in range(TRIALS):
+        instances, allocation, _ = random_state(rng)
+        available = instances - allocation.sum(axis=0)
+        request = random_request(rng, instances, allocation)
+        expected = find_deadlocked(available.tolist(), allocation.tolist(), request.tolist())
+        assert find_deadlocked_worklist(available, allocation, request) == expected
+
+
+def test_worklist_detection_without_resources():
+    allocation = np.zeros((3, 0), dtype=np.int32)
+    assert find_deadlocked_worklist(np.zeros(0), allocation, allocation) == []
+
+
+@pytest.mark.parametrize("method", ["worklist", "loop"])
+def test_engine_detection_methods_agree(method):
+    rng = np.random.default_rng(5)
+    for _ in range(TRIALS // 3):
+        instances, allocation, max_need = random_state(rng)
+        request = random_request(rng, instances, allocation)
+        engine = engine_of(instances, allocation, max_need, request)
+        expected = find_deadlocked(engine.available.tolist(), allocation.tolist(), request.tolist())
+        assert engine.detect_deadlock(method) == [f"P{row}" for row in expected]
+
+
+@pytest.mark.parametrize("method", ["incremental", "vectorized", "loop"])
+def test_engine_safety_methods_agree(method):
+    rng = np.random.default_rng(4)
+    for _ in range(TRIALS // 3):
+        instances, allocation, max_need = random_state(rng)
+        engine = engine_of(instances, allocation, max_need)
+        available = engine.available
+        need = max_need - allocation
+        expected = bankers_safe_sequence(available.tolist(), allocation.tolist(), need.tolist())
+        is_safe, sequence = engine.check_safe_state(method)
+        assert is_safe == (expected is not None)
+        if is_safe:
+            assert is_safe_sequence(available, allocation, need, [engine.row_of(p) for p in sequence])
+
+
+def assert_safety_matches_reference(engine):
+    need = engine.max_need - engine.allocation
+    expected = bankers_safe_sequence(engine.available.tolist(), engine.allocation.tolist(), need.tolist())
+    is_safe, sequence = engine.check_safe_state()
+    assert is_safe == (expected is not None)
+    if is_safe:
+        assert is_safe_sequence(engine.available, engine.allocation, need, [engine.row_of(p) for p in sequence])
+
+
+def test_cached_safety_survives_grants_and_releases():
+    rng = np.random.default_rng(8)
+    for _ in range(TRIALS // 3):
+        engine = engine_of(*random_state(rng))
+        engine.check_safe_state()
+        for _ in range(30):
+            process_id = str(rng.choice(engine.processes))
+            roll = rng.random()
+            if roll < 0.15:
+                engine.release_resources(process_id)
+            elif roll < 0.2:
+                engine.terminate_process(process_id)
+            else:
+                col = int(rng.integers(len(engine.resources)))
+                units = int(rng.integers(0, engine.request[engine.row_of(process_id), col] + 1))
+                engine.request_resource(process_id, engine.resources[col], units)
+            assert_safety_matches_reference(engine)
+
+
+def test_snapshot_verdict_is_adopted_by_the_engine():
+    rng = np.random.default_rng(9)
+    for _ in range(TRIALS // 10):
+        engine = engine_of(*random_state(rng))
+        snapshot = engine.snapshot()
+        verdict = snapshot.check_safe_state("vectorized")
+        assert engine._safety_cache is None
+        engine.adopt_safety(snapshot)
+        assert engine.check_safe_state() == verdict
+        assert_safety_matches_reference(engine)
+
+
+def test_admit_request_matches_reference():
+    rng = np.random.default_rng(6)
+    for _ in range(TRIALS // 3):
+        instances, allocation, max_need = random_state(rng)
+        engine = engine_of(instances, allocation, max_need)
+        engine.check_safe_state()
+        for _ in range(30):
+            process_id = str(rng.choice(engine.processes))
+            if rng.random() < 0.15:
+                engine.release_resources(process_id)
+                continue
+            row, col = engine.row_of(process_id), int(rng.integers(len(engine.resources)))
+            units = int(rng.integers(0, engine.request[row, col] + 1))
+            before = engine.allocation.copy()
+            available = engine.available.copy()
+            outcome = engine.admit_request(process_id, engine.resources[col], units)
+            if units > available[col]:
+                assert outcome == UNAVAILABLE
+            else:
+                tentative = before.copy()
+                tentative[row, col] += units
+                safe = bankers_safe_sequence((instances - tentative.sum(axis=0)).tolist(), tentative.tolist(),
+                                             (engine.max_need - tentative).tolist()) is not None
+                assert outcome == (GRANTED if safe else UNSAFE)
+                assert (engine.allocation == (tentative if safe else before)).all()
+            assert_safety_matches_reference(engine)
+
+
+def test_admit_request_rejects_claims_beyond_max_need():
+    engine = engine_of(np.array([2]), np.array([[0]]), np.array([[1]]))
+    with pytest.raises(ValueError):
+        engine.admit_request("P0", "R0", 2)
+
+
+def test_dense_store_keeps_ids_stable_across_removals():
+    rng = np.random.default_rng(9)
+    engine = DeadlockEngine(debug=True)
+    model = {}          # process id -> {resource id: (allocation, max need)}
+    instances = {}
+    issued = set()
+    for _ in range(400):
+        roll = rng.random()
+        if roll < 0.2 or not engine.processes:
+            process_id = engine.add_process()
+            assert process_id not in issued
+            issued.add(process_id)
+            model[process_id] = {}
+        elif roll < 0.35 or not engine.resources:
+            resource_id = engine.add_resource(int(rng.integers(1, 6)))
+            assert resource_id not in issued
+            issued.add(resource_id)
+            instances[resource_id] = engine.instances_of(resource_id)
+        elif roll < 0.45:
+            process_id = str(rng.choice(engine.processes))
+            engine.remove_process(process_id)
+            del model[process_id]
+        elif roll < 0.5:
+            resource_id = str(rng.choice(engine.resources))
+            engine.remove_resource(resource_id)
+            del instances[resource_id]
+            for row in model.values():
+                row.pop(resource_id, None)
+        else:
+            process_id = str(rng.choice(engine.processes))
+            free = engine.available + np.array(engine.allocation_of(process_id))
+            allocation = rng.integers(0, free + 1)
+            max_need = allocation + rng.integers(0, 2, allocation.size)
+            engine.configure_process(process_id, allocation, max_need)
+            model[process_id] = {r: (int(a), int(x)) for r, a, x in zip(engine.resources, allocation, max_need)}
+
+        assert sorted(engine.processes) == sorted(model)
+        assert sorted(engine.resources) == sorted(instances)
+        for process_id, row in model.items():
+            expected = [row.get(r, (0, 0)) for r in engine.resources]
+            assert engine.allocation_of(process_id) == [a for a, _ in expected]
+            assert engine.max_need_of(process_id) == [x for _, x in expected]
+
+
+def test_available_counters_track_mutations():
+    rng = np.random.default_rng(10)
+    instances, allocation, max_need = random_state(rng)
+    engine = engine_of(instances, allocation, max_need)
+    engine.pop_available_changes()
+    for _ in range(200):
+        before = dict(zip(engine.resources, engine.available.tolist()))
+        process_id = str(rng.choice(engine.processes))
+        if rng.random() < 0.2:
+            engine.release_resources(process_id)
+        else:
+            col = int(rng.integers(len(engine.resources)))
+            units = int(rng.integers(0, engine.request[engine.row_of(process_id), col] + 1))
+            engine.request_resource(process_id, engine.resources[col], units)
+        # debug mode already re-derives the counters on every mutation
+        after = dict(zip(engine.resources, engine.available.tolist()))
+        changed = engine.pop_available_changes()
+        assert {r: after[r] for r in after if after[r] != before[r]}.items() <= changed.items()
+        assert all(after[r] == count for r, count in changed.items())
+
+
+def test_verify_counters_reports_drift():
+    engine = engine_of(np.array([3, 3]), np.array([[1, 0]]), np.array([[2, 1]]))
+    engine._available[0] += 1
+    with pytest.raises(RuntimeError, match="R0"):
+        engine.verify_counters()
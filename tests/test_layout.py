@@ -0,0 +1,66 @@
+"""Force-directed layout: graph extraction, neighbour pairs and the layout generator"""
+import numpy as np
+
+from helpers import engine_of, random_state
+from layout import CROWD, _near_pairs, engine_graph, force_layout
+
+
+def test_engine_graph_has_one_edge_per_connected_pair():
+    engine = engine_of(*random_state(np.random.default_rng(1)))
+    nodes, edges = engine_graph(engine)
+    n = len(engine.processes)
+    assert nodes == engine.processes + engine.resources
+    expected = {(row, col + n) for row, col in zip(*np.nonzero((engine.allocation > 0) | (engine.request > 0)))}
+    assert set(map(tuple, edges.tolist())) == expected
+    assert len(edges) == len(expected)
+
+
+def test_near_pairs_match_brute_force_in_sparse_cells():
+    rng = np.random.default_rng(2)
+    pos = rng.uniform(0, 1000, (150, 2))
+    radius = 40.0
+    a, b, weight = _near_pairs(pos, radius, rng)
+    cells = np.floor(pos / radius).astype(int)
+    assert np.bincount(np.unique(cells, axis=0, return_inverse=True)[1].reshape(-1)).max() <= CROWD
+    expected = {(i, j) for i in range(len(pos)) for j in range(len(pos))
+                if i != j and np.abs(cells[i] - cells[j]).max() <= 1}
+    assert sorted(zip(a.tolist(), b.tolist())) == sorted(expected)
+    assert np.all(weight == 1)
+
+
+def test_crowded_cells_are_sampled_and_weighted():
+    rng = np.random.default_rng(3)
+    pos = rng.uniform(0, 10, (40, 2))     # everyone in one cell
+    a, b, weight = _near_pairs(pos, 100.0, rng)
+    assert np.all(a != b)
+    per_node = np.bincount(a, minlength=len(pos))
+    assert per_node.max() <= CROWD
+    assert np.allclose(weight, len(pos) / CROWD)
+
+
+def test_force_layout_streams_frames_and_untangles():
+    rng = np.random.default_rng(4)
+    count = 60
+    edges = np.array([(k, k + 1) for k in range(count - 1)])
+    start = rng.uniform(0, 50, (count, 2))
+    original = start.copy()
+    frames = list(force_layout(edges, start, iterations=95, every=10))
+    assert [iteration for iteration, _ in frames] == list(range(10, 100, 10)) + [95]
+    final = frames[-1][1]
+    assert final.shape == (count, 2) and np.isfinite(final).all()
+    assert np.array_equal(start, original)     # the input is not modified
+    linked = np.linalg.norm(final[edges[:, 0]] - final[edges[:, 1]], axis=1).mean()
+    spread = np.linalg.norm(final[:, None] - final[None], axis=2).mean()
+    assert linked < spread
+
+    again = list(force_layout(edges, start, iterations=95, every=10))
+    assert np.array_equal(again[-1][1], final)
+
+
+def test_force_layout_separates_stacked_nodes_and_handles_tiny_inputs():
+    stacked = np.zeros((5, 2))
+    _, final = list(force_layout(np.zeros((0, 2)), stacked, iterations=20))[-1]
+    assert len(np.unique(final.round(6), axis=0)) == 5
+
+    assert [(iteration, pos.tolist()) for iteration, pos in force_layout([], [(3.0, 4.0)], iterations=7)] \
+        == [(7, [[3.0, 4.0]])]
@@ -0,0 +1,66 @@
+"""CSV import: a clean round trip and the violations it must report"""
+import warnings
+
+import numpy as np
+
+import scenarios
+from matrix_import import import_matrices
+
+
+def write(path, rows):
+    path.write_text("".join(",".join(map(str, row)) + "\n" for row in rows))
+    return str(path)
+
+
+def test_labelled_round_trip(tmp_path):
+    instances = np.array([3, 1, 4])
+    allocation, max_need = scenarios.generate("uniform", instances, 6, seed=5)
+    header = [""] + ["R0", "R1", "R2"]
+    labels = [f"P{2 * k}" for k in range(6)]
+    engine, violations = import_matrices(
+        write(tmp_path / "allocation.csv", [header] + [[p] + row for p, row in zip(labels, allocation.tolist())]),
+        write(tmp_path / "max.csv", [header] + [[p] + row for p, row in zip(labels, max_need.tolist())]),
+        write(tmp_path / "instances.csv", [instances.tolist()]),
+        vector_is_instances=True, chunk_rows=4)
+    assert violations == []
+    assert engine.processes == labels and engine.resources == ["R0", "R1", "R2"]
+    assert (engine.allocation == allocation).all() and (engine.max_need == max_need).all()
+    assert (engine.available == instances - allocation.sum(axis=0)).all()
+    engine.debug = True
+    engine.verify_counters()
+
+
+def test_ragged_rows_are_reported_not_reflowed(tmp_path):
+    # Three values plus one add up to two full rows, which must not be re-flowed into a 2x2 matrix
+    engine, violations = import_matrices(
+        write(tmp_path / "allocation.csv", [["", "R0", "R1"], ["P0", 1, 2, 3], ["P1", 4]]),
+        write(tmp_path / "max.csv", [["", "R0", "R1"], ["P0", 5, 5], ["P1", 5, 5]]),
+        write(tmp_path / "instances.csv", [[9, 9]]),
+        vector_is_instances=True)
+    assert engine is None
+    assert any("expected 2 values, got 3" in v for v in violations)
+    assert any("expected 2 values, got 1" in v for v in violations)
+
+
+def test_all_violations_reported_at_once(tmp_path):
+    engine, violations = import_matrices(
+        write(tmp_path / "allocation.csv", [[1, 2], [3, "x"], [4, 0]]),
+        write(tmp_path / "max.csv", [[1, 2], [3, 3], [3, 4]]),
+        write(tmp_path / "instances.csv", [[9, 9]]),
+        vector_is_instances=True)
+    assert engine is None
+    assert any("'x' is not an integer" in v for v in violations)
+
+
+def test_quoted_labels_may_contain_commas(tmp_path):
+    allocation = tmp_path / "allocation.csv"
+    allocation.write_text('"",R0,R1\n"db, primary",1,0\n"db, replica",0,1\n')
+    max_need = tmp_path / "max.csv"
+    max_need.write_text('"",R0,R1\n"db, primary",1,1\n"db, replica",1,1\n')
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        engine, violations = import_matrices(str(allocation), str(max_need),
+                                             write(tmp_path / "instances.csv", [[1, 1]]), vector_is_instances=True)
+    assert violations == []
+    assert engine.processes == ["db, primary", "db, replica"]
+    assert engine.allocation.tolist() == [[1, 0], [0, 1]]
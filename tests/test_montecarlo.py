@@ -0,0 +1,38 @@
+"""Batched Monte Carlo evaluation against the per-state reference loops"""
+import numpy as np
+
+import montecarlo
+from engine import bankers_safe_sequence, find_deadlocked
+
+
+def test_batched_evaluation_matches_reference():
+    rng = np.random.default_rng(20)
+    states = montecarlo.random_states(rng, 300, 4, 3, instances=(0, 4), load=0.7, claim=0.5, demand=0.5)
+    unsafe, deadlocked = montecarlo.evaluate_states(*states)
+    for k, (available, allocation, max_need, request) in enumerate(zip(*states)):
+        assert (allocation >= 0).all() and (max_need >= allocation).all()
+        assert (request >= 0).all() and (request <= max_need - allocation).all()
+        need = (max_need - allocation).tolist()
+        assert unsafe[k] == (bankers_safe_sequence(available.tolist(), allocation.tolist(), need) is None)
+        assert deadlocked[k] == bool(find_deadlocked(available.tolist(), allocation.tolist(), request.tolist()))
+
+
+def test_demand_below_one_separates_the_estimates():
+    partial = montecarlo.estimate(20000, 5, 3, batch=5000, workers=1, seed=0)
+    assert partial["deadlocked_fraction"] < partial["unsafe_fraction"]
+    full = montecarlo.estimate(20000, 5, 3, batch=5000, workers=1, seed=0, demand=1.0)
+    assert full["deadlocked"] == full["unsafe"]
+
+
+def test_estimate_does_not_depend_on_workers():
+    serial = montecarlo.estimate(8000, 4, 3, batch=2000, workers=1, seed=3)
+    parallel = montecarlo.estimate(8000, 4, 3, batch=2000, workers=2, seed=3)
+    assert serial == parallel
+
+
+def test_wilson_interval_brackets_the_fraction():
+    for successes, trials in ((0, 10), (3, 10), (10, 10), (500, 1000)):
+        low, high = montecarlo.wilson_interval(successes, trials)
+        fraction = successes / trials
+        assert 0.0 <= low <= fraction + 1e-12 and fraction - 1e-12 <= high <= 1.0
+    assert montecarlo.wilson_interval(0, 0) == (0.0, 1.0)
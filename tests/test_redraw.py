@@ -0,0 +1,93 @@
+"""RedrawScheduler with a fake widget: marks coalesce into one pass per frame"""
+import itertools
+
+from redraw import RedrawScheduler
+
+
+class FakeWidget:
+    """Records after/after_idle callbacks instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.delays = []
+        self._ids = itertools.count(1)
+
+    def after(self, ms, callback):
+        self.delays.append(ms)
+        return self._schedule(callback)
+
+    def after_idle(self, callback):
+        self.delays.append("idle")
+        return self._schedule(callback)
+
+    def _schedule(self, callback):
+        handle = f"after#{next(self._ids)}"
+        self.scheduled[handle] = callback
+        return handle
+
+    def after_cancel(self, handle):
+        self.scheduled.pop(handle, None)
+
+    def run_pending(self):
+        for handle, callback in list(self.scheduled.items()):
+            del self.scheduled[handle]
+            callback()
+
+
+def test_a_burst_of_marks_is_one_render_pass():
+    widget = FakeWidget()
+    scheduler = RedrawScheduler(widget, frame_ms=0)
+    passes = []
+    scheduler.add("edges", lambda items: passes.append(("edges", items)))
+    scheduler.add("labels", lambda items: passes.append(("labels", items)))
+    for k in range(1000):
+        scheduler.mark("edges", k % 10)
+    scheduler.mark("labels")
+    assert len(widget.scheduled) == 1
+    widget.run_pending()
+    assert passes == [("edges", set(range(10))), ("labels", set())]
+    assert scheduler.frames == 1
+
+    widget.run_pending()
+    assert len(passes) == 2
+
+
+def test_only_marked_renderers_run_in_registration_order():
+    widget = FakeWidget()
+    scheduler = RedrawScheduler(widget, frame_ms=0)
+    order = []
+    for name in ("a", "b", "c"):
+        scheduler.add(name, lambda items, name=name: order.append((name, items)))
+    scheduler.mark("c", 1)
+    scheduler.mark("a")
+    widget.run_pending()
+    assert order == [("a", set()), ("c", {1})]
+    scheduler.mark("b", 2)
+    widget.run_pending()
+    assert order[-1] == ("b", {2})
+    assert scheduler.frames == 2
+
+
+def test_marks_within_a_frame_wait_for_the_next_frame():
+    widget = FakeWidget()
+    scheduler = RedrawScheduler(widget, frame_ms=10000)
+    scheduler.add("edges", lambda items: None)
+    scheduler.mark("edges")
+    assert widget.delays == ["idle"]
+    widget.run_pending()
+    scheduler.mark("edges")
+    assert isinstance(widget.delays[-1], int) and 0 < widget.delays[-1] <= 10001
+
+
+def test_direct_render_cancels_the_pending_pass():
+    widget = FakeWidget()
+    scheduler = RedrawScheduler(widget)
+    rendered = []
+    scheduler.add("edges", rendered.append)
+    scheduler.mark("edges", "P1")
+    scheduler.render()
+    assert rendered == [{"P1"}]
+    assert not widget.scheduled
+    scheduler.render()
+    assert rendered == [{"P1"}]
+    assert scheduler.frames == 1
@@ -0,0 +1,97 @@
+"""ReplayState detection, with and without the wait-for graph, against find_deadlocked"""
+import random
+
+import pytest
+
+from engine import find_deadlocked
+from replay import ReplayState, replay
+
+
+def trace(rng, processes, resources, length, instances):
+    """
+    A well-formed trace: requests block until the units are free and are
+    acquired one unit at a time, so multi-unit requests see partial grants
+    """
+    free = {f"R{k}": instances for k in range(resources)}
+    held = {}
+    waiting = {}        # process -> [resource, units still to acquire]
+    for time in range(length):
+        process = rng.randrange(processes)
+        roll = rng.random()
+        if roll < 0.45 and process not in waiting:
+            resource = rng.choice(sorted(free))
+            count = rng.randint(1, instances)
+            waiting[process] = [resource, count]
+            yield {"event": "request", "process": process, "resource": resource, "count": count, "time": time}
+        elif roll < 0.85 and held.get(process):
+            resource = rng.choice(sorted(held[process]))
+            free[resource] += held[process].pop(resource)
+            yield {"event": "release", "process": process, "resource": resource, "count": None, "time": time}
+        elif roll > 0.97:
+            for resource, count in held.pop(process, {}).items():
+                free[resource] += count
+            waiting.pop(process, None)
+            yield {"event": "exit", "process": process, "resource": None, "count": None, "time": time}
+        # Hand out whatever freed up, first come first served
+        for waiter, wait in list(waiting.items()):
+            resource = wait[0]
+            if free[resource]:
+                free[resource] -= 1
+                wait[1] -= 1
+                if not wait[1]:
+                    del waiting[waiter]
+                counts = held.setdefault(waiter, {})
+                counts[resource] = counts.get(resource, 0) + 1
+                yield {"event": "acquire", "process": waiter, "resource": resource, "count": 1, "time": time}
+
+
+def reference(state):
+    """Deadlocked holders of a replay state by the reference loop"""
+    processes = sorted(set(state.held) | set(state.waiting))
+    resources = sorted({r for rows in (state.held, state.waiting) for p in rows for r in rows[p]})
+    allocation = [[state.held.get(p, {}).get(r, 0) for r in resources] for p in processes]
+    request = [[state.waiting.get(p, {}).get(r, 0) for r in resources] for p in processes]
+    available = [state.instances_of(r) - sum(row[k] for row in allocation) for k, r in enumerate(resources)]
+    return {processes[row] for row in find_deadlocked(available, allocation, request)}
+
+
+@pytest.mark.parametrize("instances", [1, 3])
+def test_replay_detection_matches_reference(instances):
+    rng = random.Random(instances)
+    for _ in range(150):
+        state = ReplayState(instances)
+        for event in trace(rng, rng.randint(2, 6), rng.randint(1, 5), 150, instances):
+            state.apply(event)
+            # Waiters holding nothing block no one, so the reference never counts them
+            stuck = {p for p in state.deadlocked() if state.held.get(p)}
+            assert stuck == reference(state)
+
+
+@pytest.mark.parametrize("instances", [1, 3])
+def test_every_event_replay_reports_on_the_closing_event(instances):
+    rng = random.Random(instances)
+    for _ in range(100):
+        events = list(trace(rng, 5, 4, 200, instances))
+        incidents = list(replay(iter(events), default_instances=instances))
+        state = ReplayState(instances)
+        stuck_at = []
+        for event in events:
+            state.apply(event)
+            stuck_at.append(state.deadlocked())
+        first = next((index for index, stuck in enumerate(stuck_at) if stuck), None)
+        assert (incidents[0]["event_index"] if incidents else None) == first
+        for incident in incidents:
+            assert incident["processes"] == stuck_at[incident["event_index"]]
+
+
+def test_partial_grant_closing_a_deadlock_is_reported():
+    events = [
+        {"event": "acquire", "process": "P1", "resource": "R0", "count": 1, "time": 0},
+        {"event": "request", "process": "P2", "resource": "R0", "count": 2, "time": 1},
+        {"event": "request", "process": "P1", "resource": "R0", "count": 1, "time": 2},
+        {"event": "acquire", "process": "P2", "resource": "R0", "count": 1, "time": 3},
+    ]
+    for every in (1, 3):
+        incidents = list(replay(iter([dict(event) for event in events]), every=every, default_instances=2))
+        assert [sorted(incident["processes"]) for incident in incidents] == [["P1", "P2"]]
+        assert incidents[0]["event_index"] == 3
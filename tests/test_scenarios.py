@@ -0,0 +1,44 @@
+"""Scenario families produce states with the property their name promises"""
+import numpy as np
+import pytest
+
+import scenarios
+from engine import bankers_safe_sequence, find_deadlocked
+from helpers import TRIALS
+
+
+def test_scenario_families_have_their_property():
+    rng = np.random.default_rng(7)
+    for trial in range(TRIALS):
+        n = int(rng.integers(2, 10))
+        instances = rng.integers(1, 5, int(rng.integers(2, 7)))
+        family = scenarios.FAMILIES[trial % len(scenarios.FAMILIES)]
+        allocation, max_need = scenarios.generate(family, instances, n, seed=trial)
+        assert (allocation >= 0).all() and (max_need >= allocation).all() and (max_need <= instances).all()
+        assert (allocation.sum(axis=0) <= instances).all()
+        available = (instances - allocation.sum(axis=0)).tolist()
+        need = (max_need - allocation).tolist()
+        if family == "safe":
+            assert bankers_safe_sequence(available, allocation.tolist(), need) is not None
+        if family in ("deadlocked", "chain"):
+            assert find_deadlocked(available, allocation.tolist(), need)
+
+
+def test_named_seeds_are_reproducible():
+    first = scenarios.generate("uniform", [3] * 5, 4, seed="demo")
+    second = scenarios.generate("uniform", [3] * 5, 4, seed="demo")
+    assert all((a == b).all() for a, b in zip(first, second))
+
+
+def test_chain_needs_enough_processes():
+    with pytest.raises(ValueError):
+        scenarios.generate("chain", [1, 1, 1], 1, seed=0)
+
+
+def test_zero_claim_adds_no_extra_need():
+    instances = np.array([3, 0, 5, 2])
+    for family in ("uniform", "saturated", "safe"):
+        allocation, max_need = scenarios.generate(family, instances, 20, seed=1, claim=0.0)
+        assert (max_need == allocation).all()
+    allocation, max_need = scenarios.generate("uniform", instances, 50, seed=1, claim=np.array([0, 0, 1, 1]))
+    assert (max_need[:, :2] == allocation[:, :2]).all()
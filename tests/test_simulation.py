@@ -0,0 +1,108 @@
+"""Simulation policies: avoidance stays safe, detection resolves, the report adds up"""
+import pytest
+
+from engine import bankers_safe_sequence, find_deadlocked
+from simulation import DETECT, RandomModel, Simulation
+
+INSTANCES = [2] * 8
+
+
+class CountingModel(RandomModel):
+    """RandomModel that counts the jobs it hands out"""
+
+    def __init__(self, instances, max_steps=3, max_units=2):
+        super().__init__(instances, max_steps, max_units)
+        self.started = 0
+
+    def job(self, process, rng):
+        self.started += 1
+        return super().job(process, rng)
+
+
+def reference(sim):
+    """Stuck blocked holders by find_deadlocked; running processes request nothing"""
+    m = len(sim.instances)
+    allocation = [[held.get(r, 0) for r in range(m)] for held in sim.held]
+    request = [[0] * m for _ in sim.held]
+    for p, (r, units, _) in sim.waiting.items():
+        request[p][r] = units
+    return set(find_deadlocked(sim.available, allocation, request))
+
+
+def check_consistent(sim):
+    """Units are conserved and the blocked bookkeeping matches the process state"""
+    for r, total in enumerate(sim.instances):
+        assert sim.available[r] + sum(held.get(r, 0) for held in sim.held) == total
+        assert sim.blocked_held[r] == sum(sim.held[p].get(r, 0) for p in sim.waiting)
+    assert sorted(sim.waiting) == sorted(p for queue in sim.queues for p in queue)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_deadlocked_matches_reference(seed):
+    sim = Simulation(INSTANCES, 30, CountingModel(INSTANCES), "none", seed=seed)
+    for _ in range(100):
+        sim.run(events=20)
+        stuck = sim.deadlocked()
+        assert len(stuck) == len(set(stuck))
+        assert {p for p in stuck if sim.held[p]} == reference(sim)
+        # Blocked processes outside the candidates count as never finishing
+        candidates = sorted(sim.waiting)[::2]
+        assert set(stuck) & set(candidates) <= set(sim.deadlocked(candidates)) <= set(candidates)
+
+
+def test_avoid_never_enters_an_unsafe_state():
+    sim = Simulation(INSTANCES, 30, CountingModel(INSTANCES), "avoid", seed=1)
+    for _ in range(3000):
+        sim.run(events=1)
+        check_consistent(sim)
+        rows = [p for p, claim in enumerate(sim.claim) if claim is not None]
+        allocation = [[sim.held[p].get(r, 0) for r in range(len(INSTANCES))] for p in rows]
+        need = [[sim.claim[p].get(r, 0) - sim.held[p].get(r, 0) for r in range(len(INSTANCES))] for p in rows]
+        assert bankers_safe_sequence(sim.available, allocation, need) is not None
+    assert sim.deadlocks == sim.aborted == 0
+    assert sim.completed > 0
+
+
+def test_detect_resolves_every_deadlock_on_the_spot():
+    sim = Simulation(INSTANCES, 30, CountingModel(INSTANCES), "detect", seed=2)
+    for _ in range(3000):
+        sim.run(events=1)
+        check_consistent(sim)
+        assert not sim.deadlocked()
+    assert sim.deadlocks > 0
+    assert sim.aborted >= sim.deadlocks
+
+
+def test_periodic_resolves_deadlocks_at_each_check():
+    sim = Simulation(INSTANCES, 30, CountingModel(INSTANCES), "periodic", seed=3)
+    checks = 0
+    for _ in range(3000):
+        detecting = sim._heap[0][2] == DETECT
+        sim.run(events=1)
+        check_consistent(sim)
+        if detecting:
+            checks += 1
+            assert not sim.deadlocked()
+    assert checks > 0
+    assert sim.deadlocks > 0
+    assert sim.aborted >= sim.deadlocks
+
+
+@pytest.mark.parametrize("policy", ["detect", "periodic", "avoid", "none"])
+def test_report_counts_add_up(policy):
+    model = CountingModel(INSTANCES)
+    sim = Simulation(INSTANCES, 30, model, policy, seed=4)
+    sim.run(events=2000)
+    report = sim.run(events=2000)
+    running = sum(claim is not None for claim in sim.claim)
+    # Without a policy everyone can end up stuck with no events left
+    assert report["events"] == 4000 or (policy == "none" and not sim._heap)
+    assert model.started == report["completed_jobs"] + report["aborted"] + running
+    assert report["blocked"] == len(sim.waiting) <= running
+    assert report["stuck"] == len(sim.deadlocked())
+    assert report["deadlocks"] <= report["aborted"]
+    if policy in ("avoid", "none"):
+        assert report["aborted"] == 0
+    if policy in ("detect", "avoid"):
+        assert report["stuck"] == 0
+    assert report["mean_wait"] <= report["max_wait"]
@@ -0,0 +1,34 @@
+"""SparseEngine against DeadlockEngine and the reference loops"""
+import numpy as np
+
+from engine import bankers_safe_sequence, find_deadlocked
+from helpers import TRIALS, engine_of, is_safe_sequence, random_state
+from sparse_engine import SparseEngine
+
+
+def test_sparse_engine_matches_reference():
+    rng = np.random.default_rng(10)
+    for _ in range(TRIALS):
+        engine = engine_of(*random_state(rng))
+        sparse = SparseEngine.from_engine(engine)
+        for _ in range(int(rng.integers(0, 10))):
+            process_id = str(rng.choice(engine.processes))
+            resource_id = str(rng.choice(engine.resources))
+            if rng.random() < 0.2:
+                assert sorted(sparse.release_resources(process_id)) == sorted(engine.release_resources(process_id))
+            else:
+                row, col = engine.row_of(process_id), engine.column_of(resource_id)
+                units = int(rng.integers(0, engine.request[row, col] + 1))
+                assert sparse.request_resource(process_id, resource_id, units) == \
+                    engine.request_resource(process_id, resource_id, units)
+
+        allocation = engine.allocation.tolist()
+        available = engine.available.tolist()
+        need = engine.max_need - engine.allocation
+        expected = find_deadlocked(available, allocation, engine.request.tolist())
+        assert sorted(sparse.detect_deadlock()) == sorted(engine.processes[row] for row in expected)
+        order = bankers_safe_sequence(available, allocation, need.tolist())
+        safe, sequence = sparse.check_safe_state()
+        assert safe == (order is not None)
+        if safe:
+            assert is_safe_sequence(engine.available, engine.allocation, need, [engine.row_of(p) for p in sequence])
@@ -0,0 +1,75 @@
+"""SpatialHash queries and picks against a brute-force scan of the boxes"""
+import random
+
+from spatial import SpatialHash
+
+
+def brute_query(boxes, x0, y0, x1, y1):
+    return {node for node, (bx0, by0, bx1, by1) in boxes.items()
+            if bx0 <= x1 and x0 <= bx1 and by0 <= y1 and y0 <= by1}
+
+
+def check_cells(spatial):
+    """Every node is in exactly the cells its box overlaps and no cell is empty"""
+    expected = {}
+    for node, box in spatial.boxes.items():
+        for cell in spatial._cells(spatial._span(*box)):
+            expected.setdefault(cell, set()).add(node)
+    assert spatial.cells == expected
+
+
+def test_random_operations_match_brute_force():
+    rng = random.Random(0)
+    spatial = SpatialHash(cell_size=32)
+    boxes = {}
+    for step in range(2000):
+        roll = rng.random()
+        if roll < 0.4 or not boxes:
+            node = f"N{rng.randrange(200)}"
+            x, y, half = rng.uniform(-500, 500), rng.uniform(-500, 500), rng.uniform(1, 40)
+            spatial.insert(node, x, y, half)
+            boxes[node] = (x - half, y - half, x + half, y + half)
+        elif roll < 0.8:
+            node = rng.choice(sorted(boxes))
+            dx, dy = rng.uniform(-50, 50), rng.uniform(-50, 50)
+            spatial.move(node, dx, dy)
+            x0, y0, x1, y1 = boxes[node]
+            boxes[node] = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+        else:
+            node = rng.choice(sorted(boxes))
+            spatial.remove(node)
+            del boxes[node]
+        if step % 50 == 0:
+            check_cells(spatial)
+        x0, y0 = rng.uniform(-600, 600), rng.uniform(-600, 600)
+        size = rng.choice([1, 30, 300, 3000])
+        assert spatial.query(x0, y0, x0 + size, y0 + size) == brute_query(boxes, x0, y0, x0 + size, y0 + size)
+    assert len(spatial) == len(boxes)
+    for node, (x0, y0, x1, y1) in boxes.items():
+        cx, cy = spatial.centre(node)
+        assert abs(cx - (x0 + x1) / 2) < 1e-9 and abs(cy - (y0 + y1) / 2) < 1e-9
+
+
+def test_pick_prefers_the_latest_node_and_respects_tolerance():
+    spatial = SpatialHash()
+    spatial.insert("P1", 0, 0, 20)
+    spatial.insert("R1", 10, 10, 20)
+    assert spatial.pick(5, 5) == "R1"
+    assert spatial.pick(-18, -18) == "P1"
+    assert spatial.pick(34, 34) == "R1"
+    assert spatial.pick(40, 40) is None
+    assert spatial.pick(40, 40, tolerance=15) == "R1"
+    # Re-inserting brings a node to the top, as raising a canvas item does
+    spatial.insert("P1", 0, 0, 20)
+    assert spatial.pick(5, 5) == "P1"
+
+
+def test_remove_and_clear():
+    spatial = SpatialHash()
+    spatial.insert("P1", 0, 0, 100)
+    spatial.remove("P1")
+    spatial.remove("P1")
+    assert "P1" not in spatial and not spatial.cells
+    spatial.insert("P2", 0, 0, 5)
+    spatial.clear()
+    assert len(spatial) == 0 and spatial.pick(0, 0) is None
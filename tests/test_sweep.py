@@ -0,0 +1,81 @@
+"""Parameter sweep: resumable output, skipped cells, request sampling and option precedence"""
+import argparse
+import csv
+import json
+import math
+
+import numpy as np
+import pytest
+
+import sweep
+
+GRID = {
+    "family": ["uniform", "chain"],
+    "processes": [1, 6],
+    "resources": [4],
+    "instances": [3],
+    "load": [0.7],
+    "claim": [0.5],
+    "demand": [0.3, 1.0],
+}
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_sweep_records_skipped_cells_and_resumes(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    assert sweep.run_sweep(GRID, output, trials=20, seed=1, workers=1) == 8
+    rows = read_rows(output)
+    assert len(rows) == 8
+    skipped = [row for row in rows if row["status"] != "ok"]
+    # A chain needs at least two processes
+    assert {(row["family"], row["processes"]) for row in skipped} == {("chain", "1")}
+    assert all(row["status"].startswith("skipped: ") and math.isnan(float(row["unsafe_fraction"]))
+               for row in skipped)
+
+    assert sweep.run_sweep(GRID, output, trials=20, seed=1, workers=1) == 0
+    assert sweep.run_sweep(GRID, output, trials=20, seed=2, workers=1) == 8
+
+
+def test_requests_are_sampled_from_need(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    grid = dict(GRID, family=["uniform"], processes=[6])
+    sweep.run_sweep(grid, output, trials=200, seed=0, workers=1)
+    rows = {row["demand"]: row for row in read_rows(output)}
+    full, partial = rows["1.0"], rows["0.3"]
+    assert full["unsafe_fraction"] == full["deadlocked_fraction"]
+    assert float(partial["deadlocked_fraction"]) < float(partial["unsafe_fraction"])
+
+
+def test_other_columns_are_refused(tmp_path):
+    output = tmp_path / "sweep.csv"
+    output.write_text("family,processes\nuniform,10\n")
+    with pytest.raises(ValueError):
+        sweep.run_sweep(GRID, str(output), workers=1)
+
+
+def test_command_line_overrides_spec(tmp_path):
+    spec = tmp_path / "grid.json"
+    spec.write_text(json.dumps({"trials": 5, "seed": 7, "load": 0.9}))
+    options = dict.fromkeys(sweep.GRID_KEYS)
+    args = argparse.Namespace(spec=str(spec), trials=3, seed=None, **options)
+    grid = sweep.load_grid(args)
+    assert (args.trials, args.seed) == (3, 7)
+    assert grid["load"] == [0.9]
+
+    args = argparse.Namespace(spec=None, trials=None, seed=None, **dict(options, load=[0.2]))
+    grid = sweep.load_grid(args)
+    assert (args.trials, args.seed) == (sweep.DEFAULT_TRIALS, sweep.DEFAULT_SEED)
+    assert grid["load"] == [0.2]
+
+
+def test_columnar_output(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    sweep.run_sweep(dict(GRID, family=["uniform"]), output, trials=3, workers=1)
+    sweep.write_columnar(output, str(tmp_path / "sweep.npz"))
+    with np.load(tmp_path / "sweep.npz") as columns:
+        assert set(columns.files) == set(sweep.COLUMNS)
+        assert columns["processes"].dtype == np.int64 and len(columns["processes"]) == 4
@@ -0,0 +1,71 @@
+"""Viewport transforms: round trips, zoom about a point, clamping, pan and fit"""
+import math
+
+import pytest
+
+from viewport import DETAIL_SCALE, MARGIN, MAX_SCALE, MIN_SCALE, Viewport
+
+
+def close(a, b):
+    return all(math.isclose(p, q, abs_tol=1e-9) for p, q in zip(a, b))
+
+
+def test_screen_and_world_round_trip():
+    viewport = Viewport(800, 600)
+    viewport.zoom(1.7, 100, 50)
+    viewport.pan(30, -12)
+    for point in [(0, 0), (123.5, -42.25), (1e4, 3e3)]:
+        assert close(viewport.to_world(*viewport.to_screen(*point)), point)
+
+
+@pytest.mark.parametrize("factor", [0.5, 1.25, 3.0])
+def test_zoom_keeps_the_point_under_the_cursor(factor):
+    viewport = Viewport(800, 600)
+    viewport.pan(-40, 25)
+    before = viewport.to_world(300, 200)
+    assert viewport.zoom(factor, 300, 200)
+    assert close(viewport.to_world(300, 200), before)
+    assert math.isclose(viewport.scale, factor)
+
+
+def test_zoom_is_clamped_and_reports_no_change():
+    viewport = Viewport(800, 600)
+    assert viewport.zoom(1e6, 0, 0)
+    assert viewport.scale == MAX_SCALE
+    assert not viewport.zoom(2, 0, 0)
+    assert viewport.zoom(1e-9, 0, 0)
+    assert viewport.scale == MIN_SCALE
+    assert not viewport.detailed
+    viewport.scale = DETAIL_SCALE
+    assert viewport.detailed
+
+
+def test_pan_moves_content_by_screen_pixels():
+    viewport = Viewport(800, 600)
+    viewport.zoom(2, 0, 0)
+    before = viewport.to_screen(10, 10)
+    viewport.pan(15, -5)
+    assert close(viewport.to_screen(10, 10), (before[0] + 15, before[1] - 5))
+
+
+def test_visible_box_includes_the_margin():
+    viewport = Viewport(800, 600)
+    viewport.zoom(2, 0, 0)
+    x0, y0, x1, y1 = viewport.visible_box()
+    assert close(viewport.to_screen(x0, y0), (-MARGIN, -MARGIN))
+    assert close(viewport.to_screen(x1, y1), (800 + MARGIN, 600 + MARGIN))
+
+
+def test_fit_shows_the_whole_box_centred():
+    viewport = Viewport(800, 600)
+    box = (1000, 2000, 5000, 3000)
+    viewport.fit(box)
+    sx0, sy0 = viewport.to_screen(box[0], box[1])
+    sx1, sy1 = viewport.to_screen(box[2], box[3])
+    assert sx0 >= MARGIN - 1e-9 and sy0 >= MARGIN - 1e-9
+    assert sx1 <= 800 - MARGIN + 1e-9 and sy1 <= 600 - MARGIN + 1e-9
+    assert math.isclose((sx0 + sx1) / 2, 400) and math.isclose((sy0 + sy1) / 2, 300)
+
+    # A tiny box is not blown up past max_scale
+    viewport.fit((0, 0, 1, 1))
+    assert viewport.scale == 1.0
@@ -0,0 +1,76 @@
+"""Wait-for graph detection against find_deadlocked on single-instance states"""
+import numpy as np
+
+import waitfor
+from engine import find_deadlocked
+from helpers import TRIALS, engine_of, random_request, random_state
+
+
+def test_wait_for_detection_matches_reference():
+    rng = np.random.default_rng(2)
+    for _ in range(TRIALS):
+        instances, allocation, _ = random_state(rng, single_instance=True)
+        available = instances - allocation.sum(axis=0)
+        request = random_request(rng, instances, allocation)
+        expected = find_deadlocked(available.tolist(), allocation.tolist(), request.tolist())
+        assert waitfor.deadlocked_processes(available, allocation, request) == expected
+        cycles = waitfor.deadlock_cycles(available, allocation, request)
+        assert bool(cycles) == bool(expected)
+        for cycle in cycles:
+            # Each process waits on a resource the next one holds
+            for k, (row, col) in enumerate(cycle):
+                assert request[row, col] and allocation[cycle[(k + 1) % len(cycle)][0], col]
+
+
+def test_engine_wait_for_method_matches_reference():
+    rng = np.random.default_rng(5)
+    for _ in range(TRIALS // 3):
+        instances, allocation, max_need = random_state(rng, single_instance=True)
+        request = random_request(rng, instances, allocation)
+        engine = engine_of(instances, allocation, max_need, request)
+        expected = find_deadlocked(engine.available.tolist(), allocation.tolist(), request.tolist())
+        assert engine.detect_deadlock("wait_for") == [f"P{row}" for row in expected]
+        assert bool(engine.find_deadlock_cycles()) == bool(expected)
+
+
+def test_wait_for_without_resources():
+    allocation = np.zeros((2, 0), dtype=np.int32)
+    assert waitfor.deadlocked_processes(np.zeros(0), allocation, allocation) == []
+
+
+def reaches(edges, source, target):
+    seen, stack = set(), [source]
+    while stack:
+        node = stack.pop()
+        if node == target:
+            return True
+        if node not in seen:
+            seen.add(node)
+            stack.extend(h for w, h in edges if w == node)
+    return False
+
+
+def test_incremental_graph_reports_exactly_the_closing_edges():
+    rng = np.random.default_rng(3)
+    for _ in range(TRIALS):
+        n = int(rng.integers(2, 8))
+        graph = waitfor.IncrementalWaitForGraph()
+        edges = set()
+        for _ in range(int(rng.integers(1, 25))):
+            waiter, holder = (int(v) for v in rng.integers(0, n, 2))
+            if edges and rng.random() < 0.25:
+                waiter, holder = sorted(edges)[int(rng.integers(len(edges)))]
+                graph.remove_edge(waiter, holder)
+                edges.discard((waiter, holder))
+                continue
+            if (waiter, holder) in edges:
+                continue
+            cycle = graph.add_edge(waiter, holder)
+            assert (cycle is not None) == reaches(edges, holder, waiter)
+            if cycle is None:
+                edges.add((waiter, holder))
+            else:
+                assert cycle[0] == holder and cycle[-1] == waiter
+                assert all(pair in edges for pair in zip(cycle, cycle[1:]))
+            # Edges always point from lower to higher order
+            assert all(graph._order[w] < graph._order[h] for w, h in edges)
@@ -0,0 +1,94 @@
+"""AlgorithmWorker: results, progress, cancellation and failures reach poll() as documented"""
+import threading
+import time
+
+from worker import DONE, FAILED, PROGRESS, AlgorithmWorker
+
+
+def drain(worker, timeout=5.0):
+    """Poll until no run is active; returns every message"""
+    messages = []
+    deadline = time.monotonic() + timeout
+    while worker.busy() and time.monotonic() < deadline:
+        messages.extend(worker.poll())
+        time.sleep(0.005)
+    return messages
+
+
+def test_result_and_progress_are_delivered_in_order():
+    worker = AlgorithmWorker()
+
+    def count(run):
+        for k in range(3):
+            run.progress(k + 1, 3, k)
+        return "finished"
+
+    run = worker.submit("count", count, generation=7)
+    messages = drain(worker)
+    assert [(kind, payload) for kind, _, payload in messages] == [
+        (PROGRESS, (1, 3, 0)), (PROGRESS, (2, 3, 1)), (PROGRESS, (3, 3, 2)), (DONE, "finished")]
+    assert all(message_run is run for _, message_run, _ in messages)
+    assert run.generation == 7
+    assert not worker.busy()
+
+
+def test_failure_is_reported():
+    worker = AlgorithmWorker()
+    worker.submit("broken", lambda run: 1 // 0, generation=0)
+    [(kind, _, error)] = drain(worker)
+    assert kind == FAILED and isinstance(error, ZeroDivisionError)
+
+
+def test_cancelled_run_stops_at_its_checkpoint_and_posts_nothing():
+    worker = AlgorithmWorker()
+    started = threading.Event()
+    release = threading.Event()
+    stopped = threading.Event()
+
+    def slow(run):
+        started.set()
+        release.wait(5)
+        try:
+            run.check()
+        finally:
+            stopped.set()
+        return "too late"
+
+    worker.submit("slow", slow, generation=0)
+    assert started.wait(5)
+    assert worker.cancel("slow")
+    assert not worker.busy()
+    release.set()
+    assert stopped.wait(5)
+    assert worker.poll() == []
+
+
+def test_resubmitting_a_name_replaces_the_active_run():
+    worker = AlgorithmWorker()
+    release = threading.Event()
+
+    def first(run):
+        release.wait(5)
+        return "first"
+
+    old = worker.submit("job", first, generation=0)
+    new = worker.submit("job", lambda run: "second", generation=1)
+    assert old.cancelled.is_set()
+    release.set()
+    messages = drain(worker)
+    # The replaced run finishes anyway but its result is dropped
+    time.sleep(0.05)
+    messages.extend(worker.poll())
+    assert [(kind, run, payload) for kind, run, payload in messages] == [(DONE, new, "second")]
+
+
+def test_cancel_all():
+    worker = AlgorithmWorker()
+    release = threading.Event()
+    for name in ("a", "b"):
+        worker.submit(name, lambda run: release.wait(5), generation=0)
+    assert worker.busy("a") and worker.busy("b")
+    worker.cancel_all()
+    assert not worker.busy()
+    assert not worker.cancel("a")
+    release.set()
@@ -0,0 +1,91 @@
+"""Workspace save/load round trips, including saving over the mapped workspace"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+import workspace
+from helpers import engine_of, random_state
+from workspace import load_workspace, save_workspace
+
+
+def assert_same_engine(a, b):
+    assert a.processes == b.processes
+    assert a.resources == b.resources
+    assert (a._next_process, a._next_resource) == (b._next_process, b._next_resource)
+    for name in ("allocation", "max_need", "request", "resource_instances", "available"):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip(tmp_path, mmap):
+    rng = np.random.default_rng(5)
+    engine = engine_of(*random_state(rng))
+    engine.remove_process(engine.processes[0])
+    engine.add_process()
+    positions = {node: (float(k), 2.5 * k) for k, node in enumerate(engine.processes + engine.resources)}
+    descriptions = {p: f"job {p}" for p in engine.processes}
+    path = str(tmp_path / "state.lockspace")
+    save_workspace(path, engine, positions, descriptions)
+
+    loaded, header = load_workspace(path, mmap=mmap)
+    assert_same_engine(engine, loaded)
+    assert header["positions"] == positions
+    assert header["descriptions"] == descriptions
+    assert workspace._mapped_from(loaded._allocation, path) == mmap
+    loaded.verify_counters()
+    assert not [name for name in os.listdir(path) if name.endswith(".tmp")]
+
+
+def test_saving_over_the_mapped_workspace_unmaps_first(tmp_path):
+    rng = np.random.default_rng(6)
+    engine = engine_of(*random_state(rng))
+    path = str(tmp_path / "state.lockspace")
+    save_workspace(path, engine)
+
+    loaded, _ = load_workspace(path)
+    assert all(workspace._mapped_from(getattr(loaded, f"_{name}"), path) for name in workspace.MATRICES)
+    loaded.release_resources(loaded.processes[0])
+    loaded.add_resource(3)
+    save_workspace(path, loaded)
+    # The engine now owns its matrices, so the files could be replaced
+    assert not any(workspace._mapped_from(getattr(loaded, f"_{name}"), path) for name in workspace.MATRICES)
+
+    reloaded, _ = load_workspace(path)
+    assert_same_engine(loaded, reloaded)
+    # Copy-on-write: edits to a mapped engine never reach the files
+    reloaded.release_resources(reloaded.processes[-1])
+    again, _ = load_workspace(path)
+    assert_same_engine(loaded, again)
+
+
+def test_saving_elsewhere_keeps_the_mapping(tmp_path):
+    engine = engine_of(*random_state(np.random.default_rng(7)))
+    first = str(tmp_path / "first")
+    save_workspace(first, engine)
+    loaded, _ = load_workspace(first)
+    save_workspace(str(tmp_path / "second"), loaded)
+    assert workspace._mapped_from(loaded._allocation, first)
+
+
+def test_load_rejects_incomplete_or_foreign_directories(tmp_path):
+    with pytest.raises(ValueError, match="not a workspace"):
+        load_workspace(str(tmp_path))
+
+    engine = engine_of(*random_state(np.random.default_rng(8)))
+    path = str(tmp_path / "ws")
+    save_workspace(path, engine)
+    header_path = os.path.join(path, workspace.HEADER)
+    with open(header_path) as f:
+        header = json.load(f)
+
+    with open(header_path, "w") as f:
+        json.dump(dict(header, version=99), f)
+    with pytest.raises(ValueError, match="version"):
+        load_workspace(path)
+
+    with open(header_path, "w") as f:
+        json.dump(dict(header, resources=header["resources"] + ["extra"]), f)
+    with pytest.raises(ValueError, match="shape"):
+        load_workspace(path)
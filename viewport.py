@@ -0,0 +1,69 @@
+"""
+Zoom and pan state of the workspace canvas.
+
+Node positions live in world coordinates. The canvas shows the world scaled
+by `scale`, with world point (x, y) at its top-left corner. Below
+DETAIL_SCALE the GUI drops to its low level of detail: no text labels or
+"Available" captions, and one plain line per process/resource pair instead
+of separate allocation and request arrows.
+"""
+MIN_SCALE = 0.02
+MAX_SCALE = 4.0
+DETAIL_SCALE = 0.5
+MARGIN = 40  # screen pixels around the canvas that still count as visible
+
+
+class Viewport:
+    """World <-> screen transform of one canvas"""
+
+    def __init__(self, width=1, height=1):
+        self.scale = 1.0
+        self.x = 0.0
+        self.y = 0.0
+        self.width = width
+        self.height = height
+
+    @property
+    def detailed(self):
+        return self.scale >= DETAIL_SCALE
+
+    def to_screen(self, x, y):
+        return (x - self.x) * self.scale, (y - self.y) * self.scale
+
+    def to_world(self, sx, sy):
+        return sx / self.scale + self.x, sy / self.scale + self.y
+
+    def visible_box(self, margin=MARGIN):
+        """World box (x0, y0, x1, y1) of the canvas widened by margin pixels"""
+        x0, y0 = self.to_world(-margin, -margin)
+        x1, y1 = self.to_world(self.width + margin, self.height + margin)
+        return x0, y0, x1, y1
+
+    def pan(self, dx, dy):
+        """Move the content by (dx, dy) screen pixels"""
+        self.x -= dx / self.scale
+        self.y -= dy / self.scale
+
+    def zoom(self, factor, sx, sy):
+        """
+        Zoom by factor keeping the world point under screen (sx, sy) fixed.
+        Returns True when the scale changed (it is clamped to MIN..MAX_SCALE).
+        """
+        scale = min(MAX_SCALE, max(MIN_SCALE, self.scale * factor))
+        if scale == self.scale:
+            return False
+        wx, wy = self.to_world(sx, sy)
+        self.scale = scale
+        self.x = wx - sx / scale
+        self.y = wy - sy / scale
+        return True
+
+    def fit(self, box, padding=MARGIN, max_scale=1.0):
+        """Show the whole world box (x0, y0, x1, y1), never zooming in past max_scale"""
+        x0, y0, x1, y1 = box
+        width = max(x1 - x0, 1e-9)
+        height = max(y1 - y0, 1e-9)
+        scale = min((self.width - 2 * padding) / width, (self.height - 2 * padding) / height, max_scale)
+        self.scale = min(MAX_SCALE, max(MIN_SCALE, scale))
+        self.x = (x0 + x1) / 2 - self.width / 2 / self.scale
+        self.y = (y0 + y1) / 2 - self.height / 2 / self.scale
@@ -0,0 +1,340 @@
+"""
+Wait-for graph analysis for single-instance resources.
+
+When every resource has one instance, the resource-allocation graph
+collapses into a process wait-for graph: P waits for Q when P requests a
+resource that Q holds. A deadlock is then exactly a cycle, and the
+deadlocked sets are the strongly connected components that contain one.
+Everything here is iterative so graphs with hundreds of thousands of edges
+never touch the recursion limit.
+"""
+from collections import deque
+
+import numpy as np
+
+
+def build_wait_for_graph(available, allocation, request):
+    """
+    Collapse a single-instance allocation state into a wait-for graph.
+
+    Returns (indptr, targets, via) in CSR form: the edges leaving process row
+    p are targets[indptr[p]:indptr[p + 1]], and via[k] is the resource column
+    that edge k waits on.
+    """
+    m = len(available)
+    allocation = np.asarray(allocation).reshape(len(allocation), m)
+    request = np.asarray(request).reshape(len(request), m)
+    n = allocation.shape[0]
+    available = np.asarray(available).reshape(m)
+
+    # Holder of each resource (single instance: at most one row per column)
+    held = allocation > 0
+    holder = np.where(held.any(axis=0), held.argmax(axis=0), -1)
+
+    # A request only blocks when the resource cannot cover it right now
+    waiters, cols = np.nonzero((request > available) & (holder >= 0))
+    targets = holder[cols]
+
+    order = np.argsort(waiters, kind="stable")
+    waiters, targets, cols = waiters[order], targets[order], cols[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(waiters, minlength=n), out=indptr[1:])
+    return indptr.tolist(), targets.tolist(), cols.tolist()
+
+
+def strongly_connected_components(indptr, targets):
+    """Iterative Tarjan's algorithm over a CSR graph; returns a list of components"""
+    n = len(indptr) - 1
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        # Each frame is [node, next edge to explore]
+        frames = [[root, indptr[root]]]
+
+        while frames:
+            frame = frames[-1]
+            v, k = frame
+            if k < indptr[v + 1]:
+                frame[1] = k + 1
+                w = targets[k]
+                if index[w] == -1:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    frames.append([w, indptr[w]])
+                elif on_stack[w] and index[w] < low[v]:
+                    low[v] = index[w]
+                continue
+
+            frames.pop()
+            if frames:
+                parent = frames[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+
+    return components
+
+
+def _has_self_loop(indptr, targets, v):
+    return v in targets[indptr[v]:indptr[v + 1]]
+
+
+def find_cycle(indptr, targets, via, component):
+    """
+    Return one cycle inside a strongly connected component as a list of
+    (process_row, resource_col) steps: each process waits on the resource,
+    which is held by the next process in the list (wrapping around).
+    """
+    members = set(component)
+    start = component[0]
+    # BFS from start inside the component until an edge leads back to start
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        v = queue.popleft()
+        for k in range(indptr[v], indptr[v + 1]):
+            w = targets[k]
+            if w == start:
+                steps = [(v, via[k])]
+                while parent[v] is not None:
+                    u, edge = parent[v]
+                    steps.append((u, via[edge]))
+                    v = u
+                steps.reverse()
+                return steps
+            if w in members and w not in parent:
+                parent[w] = (v, k)
+                queue.append(w)
+    return []
+
+
+def deadlock_cycles(available, allocation, request):
+    """Return one cycle (see find_cycle) for every deadlocked component"""
+    indptr, targets, via = build_wait_for_graph(available, allocation, request)
+    cycles = []
+    for component in strongly_connected_components(indptr, targets):
+        if len(component) > 1 or _has_self_loop(indptr, targets, component[0]):
+            cycles.append(find_cycle(indptr, targets, via, component))
+    return cycles
+
+
+def deadlocked_processes(available, allocation, request):
+    """
+    Rows of all deadlocked processes: those on a wait-for cycle plus every
+    resource holder that transitively waits on one of them.
+    """
+    m = len(available)
+    holds = np.asarray(allocation).reshape(len(allocation), m).any(axis=1).tolist()
+    indptr, targets, via = build_wait_for_graph(available, allocation, request)
+    n = len(indptr) - 1
+
+    stuck = [False] * n
+    for component in strongly_connected_components(indptr, targets):
+        if len(component) > 1 or _has_self_loop(indptr, targets, component[0]):
+            for v in component:
+                stuck[v] = True
+
+    # Walk the reversed graph from the cycles to everyone waiting on them
+    reverse = [[] for _ in range(n)]
+    for v in range(n):
+        for k in range(indptr[v], indptr[v + 1]):
+            reverse[targets[k]].append(v)
+    queue = deque(v for v in range(n) if stuck[v])
+    while queue:
+        w = queue.popleft()
+        for v in reverse[w]:
+            if not stuck[v]:
+                stuck[v] = True
+                queue.append(v)
+
+    # Processes holding nothing are never counted as deadlocked
+    return [v for v in range(n) if stuck[v] and holds[v]]
+
+
+def cycle_edges(cycle):
+    """
+    Turn a cycle of (process_id, resource_id) steps into the edge pairs used
+    by draw_resource_graph's highlight_path: (process, resource) for the
+    request and (resource, next process) for the allocation.
+    """
+    edges = []
+    for k, (process_id, resource_id) in enumerate(cycle):
+        next_process = cycle[(k + 1) % len(cycle)][0]
+        edges.append((process_id, resource_id))
+        edges.append((resource_id, next_process))
+    return edges
+
+
+class IncrementalWaitForGraph:
+    """
+    Online wait-for graph that reports a deadlock the moment the edge closing
+    a cycle is added, using the Pearce-Kelly dynamic topological order.
+
+    The graph is kept acyclic: every node has an order value such that edges
+    only point from lower to higher values. An edge that already respects the
+    order costs O(1). Otherwise only the nodes whose order lies between the
+    two endpoints are searched and renumbered, which is what makes per-event
+    checking cheap compared with periodic full scans.
+    """
+
+    def __init__(self):
+        self._order = {}    # node -> topological order value
+        self._out = {}      # node -> {successor: edge multiplicity}
+        self._in = {}       # node -> {predecessor: edge multiplicity}
+        self._next_order = 0
+        self._first_order = 0
+
+    def __contains__(self, node):
+        return node in self._order
+
+    def __len__(self):
+        return len(self._order)
+
+    def add_node(self, node):
+        if node not in self._order:
+            self._order[node] = self._next_order
+            self._next_order += 1
+            self._out[node] = {}
+            self._in[node] = {}
+
+    def remove_node(self, node):
+        if node not in self._order:
+            return
+        for successor in self._out.pop(node):
+            del self._in[successor][node]
+        for predecessor in self._in.pop(node):
+            del self._out[predecessor][node]
+        del self._order[node]
+
+    def prune(self, node):
+        """Drop a node left without edges, so long-running callers stay bounded"""
+        if node in self._order and not self._out[node] and not self._in[node]:
+            self.remove_node(node)
+
+    def successors(self, node):
+        return list(self._out.get(node, ()))
+
+    def add_edge(self, waiter, holder):
+        """
+        Record that waiter waits for holder. Returns None if the graph stays
+        acyclic, otherwise the cycle [holder, ..., waiter] the edge would
+        close; in that case the edge is not inserted, so the caller can
+        resolve the deadlock (e.g. abort a process) and retry.
+        """
+        if waiter not in self._order:
+            # A new node can take any position; putting the waiter first means
+            # chains built from their far end never need a search
+            self._first_order -= 1
+            self.add_node(waiter)
+            self._order[waiter] = self._first_order
+        self.add_node(holder)
+        out = self._out[waiter]
+        if holder in out:
+            out[holder] += 1
+            self._in[holder][waiter] += 1
+            return None
+        if waiter == holder:
+            return [waiter]
+
+        lower = self._order[holder]
+        upper = self._order[waiter]
+        if lower > upper:
+            self._link(waiter, holder)
+            return None
+
+        # Affected region: nodes with order in [lower, upper]
+        forward, parent = self._search_forward(holder, waiter, upper)
+        if forward is None:
+            cycle = [waiter]
+            node = parent[waiter]
+            while node is not None:
+                cycle.append(node)
+                node = parent[node]
+            cycle.reverse()
+            return cycle
+        backward = self._search_backward(waiter, lower)
+        self._reorder(backward, forward)
+        self._link(waiter, holder)
+        return None
+
+    def remove_edge(self, waiter, holder):
+        """Drop one waiter -> holder edge; removals never invalidate the order"""
+        out = self._out.get(waiter)
+        if not out or holder not in out:
+            return
+        out[holder] -= 1
+        self._in[holder][waiter] -= 1
+        if out[holder] == 0:
+            del out[holder]
+            del self._in[holder][waiter]
+
+    def _link(self, waiter, holder):
+        self._out[waiter][holder] = 1
+        self._in[holder][waiter] = 1
+
+    def _search_forward(self, start, target, upper):
+        """
+        DFS from start over nodes ordered at or below upper. Returns
+        (visited, parent) or (None, parent) if target was reached.
+        """
+        order = self._order
+        parent = {start: None}
+        stack = [start]
+        visited = []
+        while stack:
+            node = stack.pop()
+            visited.append(node)
+            for successor in self._out[node]:
+                if successor == target:
+                    parent[target] = node
+                    return None, parent
+                if successor not in parent and order[successor] < upper:
+                    parent[successor] = node
+                    stack.append(successor)
+        return visited, parent
+
+    def _search_backward(self, start, lower):
+        """DFS backwards from start over nodes ordered above lower"""
+        order = self._order
+        seen = {start}
+        stack = [start]
+        visited = []
+        while stack:
+            node = stack.pop()
+            visited.append(node)
+            for predecessor in self._in[node]:
+                if predecessor not in seen and order[predecessor] > lower:
+                    seen.add(predecessor)
+                    stack.append(predecessor)
+        return visited
+
+    def _reorder(self, backward, forward):
+        """Give the backward set the lowest of the combined order slots, then the forward set"""
+        order = self._order
+        backward.sort(key=order.get)
+        forward.sort(key=order.get)
+        nodes = backward + forward
+        slots = sorted(order[node] for node in nodes)
+        for node, slot in zip(nodes, slots):
+            order[node] = slot
@@ -0,0 +1,108 @@
+"""
+Background runs of the engine's algorithms for the GUI.
+
+A run executes on its own daemon thread, normally on an engine snapshot it
+takes itself so the copy does not hold up the Tk thread; the GUI cancels
+runs on every mutation, so a snapshot torn by one is never used. Progress
+and results are posted to a queue that the GUI drains with after();
+nothing touches Tk from a worker thread. Every run records the state
+generation it started from, so a result that arrives after a newer
+mutation can be recognized as stale. Cancelling sets the run's flag: the
+run stops at its next checkpoint and anything it still posts is dropped.
+"""
+import queue
+import threading
+
+PROGRESS = "progress"
+DONE = "done"
+FAILED = "failed"
+
+
+class Cancelled(Exception):
+    """Raised at a progress checkpoint of a cancelled run"""
+
+
+class Run:
+    """One background run: a name, the generation it started from and a cancel flag"""
+
+    def __init__(self, name, generation, outbox):
+        self.name = name
+        self.generation = generation
+        self.cancelled = threading.Event()
+        self._outbox = outbox
+
+    def progress(self, done, total, data=None):
+        """
+        Checkpoint for the running function: report progress, optionally with
+        an intermediate result such as a layout frame, or stop if cancelled
+        """
+        self.check()
+        self._outbox.put((PROGRESS, self, (done, total, data)))
+
+    def check(self):
+        """Checkpoint without a report: stop if cancelled"""
+        if self.cancelled.is_set():
+            raise Cancelled()
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class AlgorithmWorker:
+    """Starts runs on daemon threads and hands their messages back to the Tk thread"""
+
+    def __init__(self):
+        self.outbox = queue.Queue()
+        self.runs = {}  # name -> active Run
+
+    def submit(self, name, function, generation):
+        """
+        Start function(run) in the background; its return value becomes the
+        DONE payload. An active run with the same name is cancelled first.
+        """
+        self.cancel(name)
+        run = Run(name, generation, self.outbox)
+        self.runs[name] = run
+
+        def work():
+            try:
+                result = function(run)
+            except Cancelled:
+                return
+            except Exception as e:
+                self.outbox.put((FAILED, run, e))
+            else:
+                self.outbox.put((DONE, run, result))
+
+        threading.Thread(target=work, name=f"algorithm-{name}", daemon=True).start()
+        return run
+
+    def cancel(self, name):
+        run = self.runs.pop(name, None)
+        if run is not None:
+            run.cancel()
+        return run is not None
+
+    def cancel_all(self):
+        for name in list(self.runs):
+            self.cancel(name)
+
+    def busy(self, name=None):
+        return bool(self.runs) if name is None else name in self.runs
+
+    def poll(self):
+        """
+        Drain the queue on the Tk thread. Returns [(kind, run, payload)] for
+        runs that are still current; a DONE or FAILED message ends its run.
+        """
+        messages = []
+        while True:
+            try:
+                kind, run, payload = self.outbox.get_nowait()
+            except queue.Empty:
+                return messages
+            if self.runs.get(run.name) is not run:
+                continue
+            if kind != PROGRESS:
+                del self.runs[run.name]
+            messages.append((kind, run, payload))
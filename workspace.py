@@ -0,0 +1,117 @@
+"""
+Workspace persistence: matrices as memory-mappable .npy files plus a small
+JSON sidecar header.
+
+A workspace is a directory:
+    header.json      ids, id counters, canvas positions, descriptions
+    allocation.npy   (processes, resources) int32
+    max_need.npy     (processes, resources) int32
+    request.npy      (processes, resources) int32
+    instances.npy    (resources,) int32
+    allocated.npy    (resources,) int32 running totals, so loading never
+                     has to sum a column
+
+Loading maps the matrices copy-on-write: nothing is read until a page is
+touched and edits never reach the files, so opening a 50k x 5k scenario
+does not copy it into memory, let alone into Python lists. Saving back
+over the workspace an engine was opened from first reads its mapped
+matrices into memory, since Windows cannot replace a file that is mapped.
+"""
+import json
+import os
+
+import numpy as np
+
+from engine import DeadlockEngine
+
+FORMAT_VERSION = 1
+HEADER = "header.json"
+MATRICES = ("allocation", "max_need", "request")
+VECTORS = ("instances", "allocated")
+
+
+def _replace(path, name, write):
+    """Write to a temporary file first so an interrupted save never leaves a torn file"""
+    final = os.path.join(path, name)
+    temporary = final + ".tmp"
+    with open(temporary, "wb") as f:
+        write(f)
+    os.replace(temporary, final)
+
+
+def _mapped_from(array, path):
+    """Whether array's memory is a mapping of a file in directory path"""
+    directory = os.path.realpath(path)
+    while array is not None:
+        filename = getattr(array, "filename", None)
+        if isinstance(array, np.memmap) and filename:
+            return os.path.dirname(os.path.realpath(filename)) == directory
+        array = getattr(array, "base", None)
+    return False
+
+
+def save_workspace(path, engine, positions=None, descriptions=None):
+    """
+    Save an engine plus optional canvas positions ({id: (x, y)}) and process
+    descriptions ({id: text}) to the workspace directory at path.
+    """
+    os.makedirs(path, exist_ok=True)
+    for name in MATRICES:
+        backing = getattr(engine, f"_{name}")
+        if _mapped_from(backing, path):
+            setattr(engine, f"_{name}", np.array(backing))
+    arrays = {
+        "allocation": engine.allocation,
+        "max_need": engine.max_need,
+        "request": engine.request,
+        "instances": engine.resource_instances,
+        "allocated": engine._allocated[:len(engine.resources)],
+    }
+    for name, array in arrays.items():
+        _replace(path, f"{name}.npy", lambda f, array=array: np.save(f, np.asarray(array, dtype=np.int32)))
+
+    header = {
+        "version": FORMAT_VERSION,
+        "processes": engine.processes,
+        "resources": engine.resources,
+        "next_process": engine._next_process,
+        "next_resource": engine._next_resource,
+        "positions": {node: [float(x), float(y)] for node, (x, y) in (positions or {}).items()},
+        "descriptions": dict(descriptions or {}),
+    }
+    # The header goes last: a directory with a header is a complete workspace
+    _replace(path, HEADER, lambda f: f.write(json.dumps(header).encode("utf-8")))
+
+
+def load_workspace(path, mmap=True):
+    """
+    Load a workspace. Returns (engine, header); header["positions"] and
+    header["descriptions"] hold the GUI sidecar data. With mmap=False the
+    matrices are read into memory instead of being mapped.
+    """
+    header_path = os.path.join(path, HEADER)
+    if not os.path.exists(header_path):
+        raise ValueError(f"{path} is not a workspace (no {HEADER})")
+    with open(header_path, encoding="utf-8") as f:
+        header = json.load(f)
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported workspace version: {header.get('version')}")
+
+    n, m = len(header["processes"]), len(header["resources"])
+    mode = "c" if mmap else None
+    arrays = {}
+    for name in MATRICES + VECTORS:
+        array = np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+        expected = (n, m) if name in MATRICES else (m,)
+        if array.shape != expected:
+            raise ValueError(f"{name}.npy has shape {array.shape}, expected {expected}")
+        arrays[name] = array
+
+    engine = DeadlockEngine.from_arrays(
+        header["processes"], header["resources"], arrays["instances"],
+        arrays["allocation"], arrays["max_need"], arrays["request"],
+        allocated=arrays["allocated"], next_process=header["next_process"],
+        next_resource=header["next_resource"])
+    header["positions"] = {node: tuple(xy) for node, xy in header.get("positions", {}).items()}
+    header.setdefault("descriptions", {})
+    return engine, header